@@ -1,37 +1,26 @@
-
 import asyncio
 import logging
-from cli.hydra_client import HydraClient
+from cli.head_supervisor import HeadSupervisor, FINAL
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 async def abort_head():
-    client = HydraClient()
+    head = HeadSupervisor(auto_collect=False, auto_fanout=False)
     try:
-        await client.connect()
-        # Read Greeting
-        greeting = await client.receive_event()
-        logger.info(f"Connected. Greeting: {greeting.get('tag')}")
+        await head.start()
+        await asyncio.wait_for(head.ready.wait(), timeout=10)
+        logger.info(f"Connected. Head status: {head.state}")
         
         logger.info("Sending Abort...")
-        await client.send_command({"tag": "Abort"})
-        
-        logger.info("Waiting for HeadIsAborted...")
-        while True:
-            msg = await client.receive_event()
-            # logger.info(f"Received: {msg.get('tag')}")
-            if msg.get("tag") == "HeadIsAborted":
-                logger.info("Head is ABORTED!")
-                break
-            elif msg.get("tag") == "CommandFailed":
-                logger.error(f"Command Failed: {msg}")
-                break
-                
+        await head.command("Abort", until=FINAL, timeout=120)
+        logger.info("Head is ABORTED!")
+    except asyncio.TimeoutError:
+        logger.error("Timed out waiting for HeadIsAborted")
     except Exception as e:
         logger.error(f"Error: {e}")
     finally:
-        await client.close()
+        await head.stop()
 
 if __name__ == "__main__":
     asyncio.run(abort_head())
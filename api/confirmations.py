@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger("api_confirmations")
+
+
+class Subscription:
+    """One client's interest: everything for a user_id and/or specific tx ids."""
+    def __init__(self, hub: "ConfirmationHub", user_id: Optional[str], queue_size: int):
+        self.hub = hub
+        self.user_id = user_id
+        self.tx_ids: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def watch(self, tx_ids: Iterable[str]):
+        self.hub._watch(self, tx_ids)
+
+    def confirmed(self, tx_id: str, record: Dict[str, Any]):
+        """Catch-up for a watched tx that was settled before (or outside) this subscription."""
+        if tx_id in self.tx_ids:
+            self.tx_ids.discard(tx_id)
+            _discard(self.hub._by_tx, tx_id, self)
+            self.deliver({"type": "confirmed", "tx_id": tx_id, **record})
+
+    def deliver(self, event: Dict[str, Any]):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stalled client must not hold up confirmations for everyone else
+            self.dropped += 1
+
+    async def next(self, timeout: float = None) -> Dict[str, Any]:
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.hub._unsubscribe(self)
+
+
+class ConfirmationHub:
+    """
+    In-process fan-out of payment confirmations to subscribed clients.
+
+    The payment engine publishes every settled tx; head supervisors publish
+    the txs of each SnapshotConfirmed. Subscribers are indexed by user_id
+    and tx id, so a publish touches only the clients that asked for it.
+    Tx-id interest is one-shot: it is dropped once that tx is confirmed.
+    """
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._by_user: Dict[str, Set[Subscription]] = {}
+        self._by_tx: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, user_id: str = None, tx_ids: Iterable[str] = ()) -> Subscription:
+        subscription = Subscription(self, user_id, self.queue_size)
+        if user_id:
+            self._by_user.setdefault(user_id, set()).add(subscription)
+        subscription.watch(tx_ids)
+        return subscription
+
+    def _watch(self, subscription: Subscription, tx_ids: Iterable[str]):
+        for tx_id in tx_ids:
+            subscription.tx_ids.add(tx_id)
+            self._by_tx.setdefault(tx_id, set()).add(subscription)
+
+    def _unsubscribe(self, subscription: Subscription):
+        if subscription.user_id:
+            _discard(self._by_user, subscription.user_id, subscription)
+        for tx_id in subscription.tx_ids:
+            _discard(self._by_tx, tx_id, subscription)
+        subscription.tx_ids.clear()
+
+    def publish(self, tx_id: str, record: Dict[str, Any]):
+        """Delivers a confirmation of `tx_id` (record: user_id, amount_lovelace, snapshot, ...)."""
+        event = {"type": "confirmed", "tx_id": tx_id, **record}
+        targets = self._by_tx.pop(tx_id, set())
+        for subscription in targets:
+            subscription.tx_ids.discard(tx_id)
+        user_id = record.get("user_id")
+        if user_id:
+            targets |= self._by_user.get(user_id, set())
+        for subscription in targets:
+            subscription.deliver(event)
+
+    def on_head_event(self, head: str, event: Dict[str, Any]):
+        """HeadSupervisor listener: every tx in a SnapshotConfirmed is final."""
+        if event.get("tag") != "SnapshotConfirmed":
+            return
+        snapshot = event.get("snapshot", {})
+        for tx in snapshot.get("confirmed", snapshot.get("confirmedTransactions", [])):
+            # Older nodes list tx ids, newer ones the txs themselves
+            tx_id = tx if isinstance(tx, str) else tx.get("txId") or tx.get("id")
+            if tx_id:
+                self.publish(tx_id, {"head": head, "snapshot": snapshot.get("number")})
+
+    @property
+    def subscribers(self) -> int:
+        return len({s for subs in (*self._by_user.values(), *self._by_tx.values()) for s in subs})
+
+
+def _discard(index: Dict[str, Set[Subscription]], key: str, subscription: Subscription):
+    subs = index.get(key)
+    if subs is not None:
+        subs.discard(subscription)
+        if not subs:
+            del index[key]
+
+
+hub = ConfirmationHub()
@@ -1,27 +1,81 @@
 import asyncio
 import uuid
 import random
+from typing import List, Optional, Tuple
+from api.state import backend as default_backend, TX_COUNT, TX_LATENCY_MS
+from api.confirmations import hub as default_hub
+from api.ledger import ledger as default_ledger
 
 class PaymentEngine:
     """
     Manages microtransactions via the Hydra Head.
     For Phase 1 high-speed load testing (1,000 txs/sec), we use a simulated
     delay representing the L2 confirmation time (typically 50-150ms).
+    Payment records and counters live in the shared state backend so that
+    several API workers see the same transactions. Settled payments are
+    pushed to confirmation subscribers as soon as they are recorded.
+    With a ledger, each payment is debited from the user's prepaid credit
+    first and refunded if it does not settle.
     """
-    def __init__(self):
-        self.tx_store = set()
-        self.metrics = {"tx_count": 0, "total_latency_ms": 0.0}
+    def __init__(self, state=None, hub=None, ledger=None):
+        self.state = state or default_backend
+        self.hub = hub or default_hub
+        self.ledger = ledger if ledger is not None else default_ledger
         
     async def process_microtransaction(self, user_id: str, amount_lovelace: int) -> str:
+        if self.ledger is None:
+            return await self._settle(user_id, amount_lovelace)
+        await self.ledger.debit(user_id, amount_lovelace)  # raises InsufficientFunds
+        try:
+            return await self._settle(user_id, amount_lovelace)
+        except BaseException:
+            await self.ledger.credit_many([(user_id, amount_lovelace)])
+            raise
+
+    async def _settle(self, user_id: str, amount_lovelace: int) -> str:
         # Simulate network and L2 processing delay (Hydra TPS allows extremely low latency)
         # Average latency is expected to be well under 1 second.
         delay = random.uniform(0.05, 0.15)
         await asyncio.sleep(delay)
         tx_id = f"tx_hydra_{uuid.uuid4().hex[:12]}"
-        self.tx_store.add(tx_id)
-        self.metrics["tx_count"] += 1
-        self.metrics["total_latency_ms"] += (delay * 1000)
+        record = {"user_id": user_id, "amount_lovelace": amount_lovelace}
+        await self.state.record_payment(tx_id, record)
+        self.hub.publish(tx_id, record)
+        await self.state.incr({TX_COUNT: 1, TX_LATENCY_MS: delay * 1000})
         return tx_id
         
+    async def process_batch(self, items: List[Tuple[str, int]]) -> List[Optional[str]]:
+        """
+        Settles (user_id, amount_lovelace) items together: one L2 round-trip,
+        one bulk write of the payment records and one counter update for
+        the whole batch. Returns the tx ids in item order, None for items
+        the user's credit did not cover.
+        """
+        if self.ledger is None:
+            return await self._settle_batch(items)
+        accepted = await self.ledger.debit_many(items)
+        paid = [item for item, ok in zip(items, accepted) if ok]
+        try:
+            tx_ids = iter(await self._settle_batch(paid))
+        except BaseException:
+            await self.ledger.credit_many(paid)
+            raise
+        return [next(tx_ids) if ok else None for ok in accepted]
+
+    async def _settle_batch(self, items: List[Tuple[str, int]]) -> List[str]:
+        if not items:
+            return []
+        delay = random.uniform(0.05, 0.15)
+        await asyncio.sleep(delay)
+        records = {}
+        for user_id, amount_lovelace in items:
+            records[f"tx_hydra_{uuid.uuid4().hex[:12]}"] = {"user_id": user_id, "amount_lovelace": amount_lovelace}
+        await self.state.record_payments(records)
+        for tx_id, record in records.items():
+            self.hub.publish(tx_id, record)
+        # Every item waited the same round-trip; keeps the metrics' average latency per tx
+        await self.state.incr({TX_COUNT: len(items), TX_LATENCY_MS: delay * 1000 * len(items)})
+        return list(records)
+
     async def verify_transaction(self, tx_id: str) -> bool:
-        return tx_id in self.tx_store
+        return await self.state.get_payment(tx_id) is not None
@@ -0,0 +1,102 @@
+import json
+import cbor2
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Binary subprotocol negotiated via Sec-WebSocket-Protocol.
+# Clients that don't ask for it keep talking JSON text frames.
+CBOR_SUBPROTOCOL = "hydra-gaming.cbor.v1"
+
+# Compact action codes used on the binary wire
+ACTION_CODES = {"move": 1, "micro_action": 2}
+ACTION_NAMES = {code: name for name, code in ACTION_CODES.items()}
+
+# CBOR tag marking server-pushed state dumps so clients can tell them from acks
+STATE_SYNC_TAG = 40000
+
+# Positions travel as fixed-point integers (1/100 of a world unit)
+POSITION_SCALE = 100
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+def quantize(value: float) -> int:
+    return int(round(value * POSITION_SCALE))
+
+
+def dequantize(value: int) -> float:
+    return value / POSITION_SCALE
+
+
+class JsonCodec:
+    """Default codec: verbose JSON text frames (the original wire format)."""
+    subprotocol: Optional[str] = None
+    binary = False
+
+    def decode(self, message: str) -> Dict[str, Any]:
+        return json.loads(message)
+
+    def encode_ack(self, response: Dict[str, Any]) -> str:
+        return json.dumps(response, separators=(",", ":"))
+
+    def encode_state(self, players: Iterable[Tuple[str, int, float, float]]) -> str:
+        return json.dumps({
+            "type": "state_sync",
+            "players": {
+                pid: {"balance": balance, "position": [x, y]}
+                for pid, balance, x, y in players
+            }
+        }, separators=(",", ":"))
+
+
+class CborCodec:
+    """
+    Compact binary codec.
+
+    Client -> server frames are CBOR arrays:
+        [1, qx, qy]   move to (qx, qy) in fixed-point units
+        [2, cost]     micro_action
+    Server -> client frames:
+        [0, ack_code, balance]                    ack (ok)
+        [1, error]                                ack (error)
+        tag 40000: [[player_id, balance, qx, qy], ...]  state_sync
+    """
+    subprotocol = CBOR_SUBPROTOCOL
+    binary = True
+
+    def decode(self, message: bytes) -> Dict[str, Any]:
+        frame = cbor2.loads(message)
+        if not isinstance(frame, list) or not frame:
+            raise ValueError("Malformed frame")
+        action = ACTION_NAMES.get(frame[0])
+        if action == "move":
+            return {"action": "move", "position": [dequantize(frame[1]), dequantize(frame[2])]}
+        if action == "micro_action":
+            data = {"action": "micro_action"}
+            if len(frame) > 1:
+                data["cost"] = frame[1]
+            return data
+        # Unknown codes still get acked, mirroring JSON behaviour for unknown actions
+        return {"action": frame[0]}
+
+    def encode_ack(self, response: Dict[str, Any]) -> bytes:
+        if response.get("status") != "ok":
+            return cbor2.dumps([STATUS_ERROR, response.get("error", "")])
+        action = response.get("ack_action")
+        return cbor2.dumps([STATUS_OK, ACTION_CODES.get(action, action), response.get("balance")])
+
+    def encode_state(self, players: Iterable[Tuple[str, int, float, float]]) -> bytes:
+        return cbor2.dumps(cbor2.CBORTag(STATE_SYNC_TAG, [
+            [pid, balance, quantize(x), quantize(y)] for pid, balance, x, y in players
+        ]))
+
+
+JSON_CODEC = JsonCodec()
+CBOR_CODEC = CborCodec()
+
+
+def negotiate(requested_subprotocols: Iterable[str]):
+    """Picks the codec for a connection from the client's offered subprotocols."""
+    if CBOR_SUBPROTOCOL in (requested_subprotocols or ()):
+        return CBOR_CODEC
+    return JSON_CODEC
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("api_idempotency")
+
+# The SQLite table is trimmed every this many writes rather than on each one
+TRIM_EVERY = 100
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request body."""
+
+
+def _retrieve(task: asyncio.Future):
+    """Marks a shared call's failure as seen, so one nobody waits on is not reported as unhandled."""
+    if not task.cancelled():
+        task.exception()
+
+
+def fingerprint(payload: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class IdempotencyCache:
+    """
+    Idempotency-Key handling for write endpoints.
+
+    Concurrent requests with the same key share one in-flight task, so a
+    retry storm costs the engine a single call; completed results are kept
+    in a bounded LRU (max_entries, ttl) and replayed. Failures are not
+    cached, so a retry after an error runs again. With `path` the completed
+    results are also written to SQLite, which lets several workers (and
+    restarts) replay each other's results.
+    """
+    def __init__(self, max_entries: int = 10_000, ttl: float = 24 * 3600, path: str = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._done: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes = 0
+
+    @classmethod
+    def from_env(cls) -> "IdempotencyCache":
+        """HYDRA_IDEMPOTENCY_DB=/path/to.sqlite shares results across workers; unset keeps them in-process."""
+        return cls(max_entries=int(os.getenv("HYDRA_IDEMPOTENCY_MAX", "10000")),
+                   ttl=float(os.getenv("HYDRA_IDEMPOTENCY_TTL", str(24 * 3600))),
+                   path=os.getenv("HYDRA_IDEMPOTENCY_DB") or None)
+
+    async def run(self, key: str, request_fingerprint: str,
+                  call: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], bool]:
+        """Returns (result, replayed): the cached/in-flight result for `key`, or call()'s."""
+        cached = self._cached(key)
+        if cached is None and key not in self._inflight and self.path:
+            cached = await self._load(key)
+        if cached is not None:
+            stored_fingerprint, result = cached
+            self._check(key, stored_fingerprint, request_fingerprint)
+            return result, True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._check(key, inflight[0], request_fingerprint)
+            # shield: one impatient client disconnecting must not cancel the shared call
+            return await asyncio.shield(inflight[1]), True
+
+        # The shared call runs in its own task: cancelling whichever request started it
+        # (a client disconnect) must not cancel it for the requests coalesced onto it
+        task = asyncio.ensure_future(self._execute(key, request_fingerprint, call))
+        task.add_done_callback(_retrieve)
+        self._inflight[key] = (request_fingerprint, task)
+        return await asyncio.shield(task), False
+
+    async def _execute(self, key: str, request_fingerprint: str,
+                       call: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            result = await call()
+        finally:
+            self._inflight.pop(key, None)
+        await self._store(key, request_fingerprint, result)
+        return result
+
+    @staticmethod
+    def _check(key: str, stored: str, requested: str):
+        if stored != requested:
+            raise IdempotencyConflict(f"Idempotency-Key {key!r} was already used with a different request")
+
+    # --- storage ---
+
+    def _cached(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        entry = self._done.get(key)
+        if entry is None:
+            return None
+        stored_at, stored_fingerprint, result = entry
+        if time.time() - stored_at > self.ttl:
+            del self._done[key]
+            return None
+        self._done.move_to_end(key)
+        return stored_fingerprint, result
+
+    async def _load(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        try:
+            row = await asyncio.to_thread(self._db_get, key)
+        except sqlite3.Error as e:
+            logger.error(f"Idempotency lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        self._remember(key, *row)
+        return row[1], row[2]
+
+    async def _store(self, key: str, request_fingerprint: str, result: Dict[str, Any]):
+        now = time.time()
+        self._remember(key, now, request_fingerprint, result)
+        if self.path:
+            try:
+                await asyncio.to_thread(self._db_put, key, now, request_fingerprint, result)
+            except sqlite3.Error as e:
+                # The in-process cache still covers this worker
+                logger.error(f"Idempotency store failed: {e}")
+
+    def _remember(self, key: str, stored_at: float, request_fingerprint: str, result: Dict[str, Any]):
+        self._done[key] = (stored_at, request_fingerprint, result)
+        self._done.move_to_end(key)
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS idempotency ("
+                             "key TEXT PRIMARY KEY, stored_at REAL, fingerprint TEXT, result TEXT)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idempotency_age ON idempotency (stored_at)")
+        return self._db
+
+    def _db_get(self, key: str):
+        with self._db_lock:
+            row = self._connection().execute(
+                "SELECT stored_at, fingerprint, result FROM idempotency WHERE key = ? AND stored_at >= ?",
+                (key, time.time() - self.ttl)).fetchone()
+        return (row[0], row[1], json.loads(row[2])) if row else None
+
+    def _db_put(self, key: str, stored_at: float, request_fingerprint: str, result: Dict[str, Any]):
+        with self._db_lock:
+            db = self._connection()
+            with db:
+                db.execute("INSERT OR REPLACE INTO idempotency VALUES (?, ?, ?, ?)",
+                           (key, stored_at, request_fingerprint, json.dumps(result)))
+                self._writes += 1
+                if self._writes % TRIM_EVERY:
+                    return
+                # Keep the table bounded: expire by age, then trim the oldest beyond max_entries
+                db.execute("DELETE FROM idempotency WHERE stored_at < ?", (stored_at - self.ttl,))
+                db.execute("DELETE FROM idempotency WHERE key IN (SELECT key FROM idempotency "
+                           "ORDER BY stored_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
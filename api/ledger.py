@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("api_ledger")
+
+JOURNAL_FILE = "journal.ndjson"
+SNAPSHOT_FILE = "snapshot.json"
+
+
+class InsufficientFunds(Exception):
+    """The user's prepaid credit does not cover the debit."""
+
+
+class Ledger:
+    """
+    Prepaid user credit, checked before a payment is settled.
+
+    Every balance check-and-update is synchronous on the event loop, which
+    makes the loop the single writer: two concurrent debits of the same
+    user cannot both pass the check, and no lock (global or per user) is
+    held across I/O. Debits reserve the amount first and are refunded if
+    the journal write fails; credits only apply once they are durable, so
+    a balance never includes money that could still vanish.
+
+    With `path`, each change is appended to an NDJSON journal (writes that
+    arrive together share one write+fsync) and every `snapshot_every`
+    entries the balances are snapshotted and the journal truncated, so a
+    restart loads the snapshot and replays only the tail.
+    """
+    def __init__(self, path: str = None, snapshot_every: int = 100_000):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.balances: Dict[str, int] = {}
+        self.seq = 0  # last journal sequence number handed out
+        self._snapshot_seq = 0
+        self._snapshot_tried = 0  # seq of the last snapshot attempt, so a failing one waits a full interval
+        self._journal = None
+        self._pending: List[Tuple[int, str, int]] = []
+        self._pending_done: Optional[asyncio.Future] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["Ledger"]:
+        """HYDRA_LEDGER_DIR=/var/lib/hydra/ledger enables balance checks; unset leaves payments unchecked."""
+        path = os.getenv("HYDRA_LEDGER_DIR")
+        if not path:
+            return None
+        return cls(path, snapshot_every=int(os.getenv("HYDRA_LEDGER_SNAPSHOT_EVERY", "100000")))
+
+    # --- balances ---
+
+    def balance(self, user_id: str) -> int:
+        return self.balances.get(user_id, 0)
+
+    async def credit(self, user_id: str, amount: int) -> int:
+        """Tops up `user_id`; returns the new balance once the credit is durable."""
+        if amount <= 0:
+            raise ValueError("Credit amount must be positive")
+        await self.credit_many([(user_id, amount)])
+        return self.balance(user_id)
+
+    async def credit_many(self, items: List[Tuple[str, int]]):
+        """Credits (user_id, amount) items; also how reserved debits are refunded."""
+        await self._append(items)
+
+    async def debit(self, user_id: str, amount: int) -> int:
+        """Spends `amount` or raises InsufficientFunds; returns the new balance."""
+        if not (await self.debit_many([(user_id, amount)]))[0]:
+            raise InsufficientFunds(f"Balance {self.balance(user_id)} of {user_id} does not cover {amount}")
+        return self.balance(user_id)
+
+    async def debit_many(self, items: Iterable[Tuple[str, int]]) -> List[bool]:
+        """
+        Spends each (user_id, amount) that its balance covers, in order, and
+        returns which ones were accepted. All checks run before the first
+        await, and the accepted debits are journaled with one flush.
+        """
+        accepted, reserved = [], []
+        for user_id, amount in items:
+            balance = self.balances.get(user_id, 0)
+            ok = 0 <= amount <= balance
+            if ok:
+                self.balances[user_id] = balance - amount
+                reserved.append((user_id, -amount))
+            accepted.append(ok)
+        try:
+            await self._append(reserved)
+        except Exception:
+            for user_id, delta in reserved:
+                self.balances[user_id] = self.balance(user_id) - delta
+            raise
+        return accepted
+
+    # --- journal ---
+
+    def _apply_credits(self, changes: Iterable[Tuple[str, int]]):
+        for user_id, delta in changes:
+            if delta > 0:
+                self.balances[user_id] = self.balance(user_id) + delta
+
+    async def _append(self, changes: List[Tuple[str, int]]):
+        """Journals the changes; credits are applied here once durable (debits were reserved already)."""
+        if not self.path:
+            self._apply_credits(changes)
+            return
+        if not changes:
+            return
+        for user_id, delta in changes:
+            self.seq += 1
+            self._pending.append((self.seq, user_id, delta))
+        if self._pending_done is None:
+            self._pending_done = asyncio.get_running_loop().create_future()
+        done = self._pending_done
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+        await asyncio.shield(done)
+
+    async def _flush(self):
+        # One writer: whatever piled up while the previous write ran goes out together
+        while self._pending:
+            batch, self._pending = self._pending, []
+            done, self._pending_done = self._pending_done, None
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                logger.error(f"Ledger journal write failed: {e}")
+                done.set_exception(e)
+                done.exception()
+                continue
+            # Durable from here on: only a failed journal write fails (and refunds) a batch
+            self._apply_credits((user_id, delta) for _, user_id, delta in batch)
+            done.set_result(None)
+            seq = batch[-1][0]
+            if seq - max(self._snapshot_seq, self._snapshot_tried) >= self.snapshot_every:
+                self._snapshot_tried = seq
+                try:
+                    await self._snapshot(seq)
+                except Exception as e:
+                    # The journal still has everything; retry at the next threshold
+                    logger.error(f"Ledger snapshot failed, keeping the journal: {e}")
+
+    def _write(self, batch: List[Tuple[int, str, int]]):
+        if self._journal is None:
+            self._journal = open(os.path.join(self.path, JOURNAL_FILE), "a")
+        position = self._journal.tell()
+        try:
+            self._journal.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in batch))
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        except OSError:
+            # Don't leave a torn batch in front of later entries
+            self._journal.truncate(position)
+            raise
+
+    async def _snapshot(self, seq: int):
+        # Debits still queued are already reserved in memory; add them back for the durable view
+        durable = dict(self.balances)
+        for _, user_id, delta in self._pending:
+            if delta < 0:
+                durable[user_id] = durable.get(user_id, 0) - delta
+        await asyncio.to_thread(self._write_snapshot, seq, durable)
+        self._snapshot_seq = seq
+
+    def _write_snapshot(self, seq: int, balances: Dict[str, int]):
+        target = os.path.join(self.path, SNAPSHOT_FILE)
+        with open(target + ".tmp", "w") as f:
+            json.dump({"seq": seq, "balances": balances}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(target + ".tmp", target)
+        # Everything up to seq is in the snapshot now
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self._journal = open(os.path.join(self.path, JOURNAL_FILE), "w")
+
+    # --- lifecycle ---
+
+    async def open(self):
+        """Loads the latest snapshot and replays the journal tail."""
+        if self.path:
+            await asyncio.to_thread(self._load)
+            logger.info(f"Ledger loaded from {self.path}: {len(self.balances)} users at seq {self.seq}")
+
+    def _load(self):
+        os.makedirs(self.path, exist_ok=True)
+        balances: Dict[str, int] = defaultdict(int)
+        seq = 0
+        try:
+            with open(os.path.join(self.path, SNAPSHOT_FILE)) as f:
+                snapshot = json.load(f)
+            balances.update(snapshot["balances"])
+            seq = snapshot["seq"]
+        except FileNotFoundError:
+            pass
+        self._snapshot_seq = self._snapshot_tried = seq
+        try:
+            with open(os.path.join(self.path, JOURNAL_FILE)) as f:
+                for line in f:
+                    try:
+                        entry_seq, user_id, delta = json.loads(line)
+                    except ValueError:
+                        logger.warning("Skipping a torn ledger journal line")
+                        continue
+                    if entry_seq > seq:
+                        balances[user_id] += delta
+                        seq = entry_seq
+        except FileNotFoundError:
+            pass
+        self.balances = dict(balances)
+        self.seq = seq
+
+    async def close(self):
+        if self._flusher is not None:
+            await asyncio.gather(self._flusher, return_exceptions=True)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+ledger = Ledger.from_env()
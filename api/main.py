@@ -1,16 +1,55 @@
-import yaml
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from api.routes import payments, gaming, metrics
+from api.routes import payments, gaming, metrics, heads, confirmations
+from api.confirmations import hub
+from api.ledger import ledger
+from api.state import backend
+from api.pricing import load_pricing, watch_pricing
+from cli.protocol_params import get_provider
+from cli.head_supervisor import HeadSupervisor, parse_heads
 
-app = FastAPI(title="Hydra Micro-PaaS API", version="0.2.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Hot-reload pricing.yaml without restarting workers
+    watchers = [asyncio.create_task(watch_pricing(app))]
+    # Payments settled by other workers (Redis pub/sub) reach this worker's confirmation subscribers
+    watchers.append(asyncio.create_task(backend.watch_payments(hub.publish)))
+    # Prepaid balances: snapshot + journal tail, before the first payment is taken
+    if ledger is not None:
+        await ledger.open()
+    # Keep the process-wide protocol parameters current when an Ogmios endpoint is configured
+    if os.getenv("OGMIOS_API_URL"):
+        watchers.append(asyncio.create_task(get_provider().watch()))
+    # One long-lived supervisor per head in HYDRA_HEADS ("name=ws://host:port,...")
+    for name, url in parse_heads(os.getenv("HYDRA_HEADS", "")).items():
+        app.state.heads[name] = HeadSupervisor(url, name=name)
+        # Txs in each SnapshotConfirmed go straight to confirmation subscribers
+        app.state.heads[name].listeners.append(hub.on_head_event)
+        await app.state.heads[name].start()
+    yield
+    for watcher in watchers:
+        watcher.cancel()
+    for head in app.state.heads.values():
+        await head.stop()
+    # Flush buffered counters / close the shared store connection
+    await backend.close()
+    payments.idempotency.close()
+    if ledger is not None:
+        await ledger.close()
 
-# Load configuration
-with open("api/pricing.yaml", "r") as f:
-    app.state.pricing = yaml.safe_load(f)
+app = FastAPI(title="Hydra Micro-PaaS API", version="0.2.0", lifespan=lifespan)
+
+# Load configuration (compiled once; swapped atomically on change)
+app.state.pricing = load_pricing()
+app.state.heads = {}
 
 app.include_router(payments.router, prefix="/api/v1")
 app.include_router(gaming.router, prefix="/api/v1")
 app.include_router(metrics.router, prefix="/api/v1")
+app.include_router(heads.router, prefix="/api/v1")
+app.include_router(confirmations.router, prefix="/api/v1")
 
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,105 @@
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class PlayerStore:
+    """
+    Columnar player state for the gaming manager.
+
+    Instead of one dict (plus a position list) per player, balances and x/y
+    positions live in preallocated typed arrays indexed by slot, with a
+    player_id -> slot map in front. Slots freed on disconnect are reused, so
+    the arrays only grow to the peak number of concurrent players.
+    Whole-room passes (`rows`, or the raw `balances`/`xs`/`ys` columns) walk
+    contiguous memory instead of chasing per-player objects.
+    """
+    def __init__(self, capacity: int = 1024, default_balance: int = 1000):
+        self.default_balance = default_balance
+        self.balances = array("q", [0]) * capacity
+        self.xs = array("d", [0.0]) * capacity
+        self.ys = array("d", [0.0]) * capacity
+        self.ids: List[Optional[str]] = [None] * capacity
+        self.slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._high_water = 0  # slots [0, high_water) have been handed out at least once
+
+    @property
+    def capacity(self) -> int:
+        return len(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self.slots
+
+    def _grow(self):
+        extra = self.capacity
+        self.balances.extend(array("q", [0]) * extra)
+        self.xs.extend(array("d", [0.0]) * extra)
+        self.ys.extend(array("d", [0.0]) * extra)
+        self.ids.extend([None] * extra)
+
+    def add(self, player_id: str, balance: int = None, x: float = 0.0, y: float = 0.0) -> int:
+        """Allocates (or reuses) a slot for the player and returns it."""
+        slot = self.slots.get(player_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._high_water == self.capacity:
+                    self._grow()
+                slot = self._high_water
+                self._high_water += 1
+            self.slots[player_id] = slot
+            self.ids[slot] = player_id
+        self.balances[slot] = self.default_balance if balance is None else balance
+        self.xs[slot] = x
+        self.ys[slot] = y
+        return slot
+
+    def remove(self, player_id: str) -> bool:
+        slot = self.slots.pop(player_id, None)
+        if slot is None:
+            return False
+        self.ids[slot] = None
+        self._free.append(slot)
+        return True
+
+    def balance(self, player_id: str) -> int:
+        return self.balances[self.slots[player_id]]
+
+    def set_balance(self, player_id: str, balance: int):
+        self.balances[self.slots[player_id]] = balance
+
+    def debit(self, player_id: str, cost: int) -> bool:
+        """Spends `cost` if the balance covers it. Returns whether it was spent."""
+        slot = self.slots[player_id]
+        if self.balances[slot] >= cost:
+            self.balances[slot] -= cost
+            return True
+        return False
+
+    def set_position(self, player_id: str, x: float, y: float):
+        slot = self.slots[player_id]
+        self.xs[slot] = x
+        self.ys[slot] = y
+
+    def position(self, player_id: str) -> Tuple[float, float]:
+        slot = self.slots[player_id]
+        return self.xs[slot], self.ys[slot]
+
+    def get(self, player_id: str) -> Optional[dict]:
+        """Dict view of one player (the pre-columnar shape), for debugging and APIs."""
+        slot = self.slots.get(player_id)
+        if slot is None:
+            return None
+        return {"balance": self.balances[slot], "position": [self.xs[slot], self.ys[slot]]}
+
+    def rows(self) -> Iterator[Tuple[str, int, float, float]]:
+        """Yields (player_id, balance, x, y) for every connected player, in slot order."""
+        ids, balances, xs, ys = self.ids, self.balances, self.xs, self.ys
+        for slot in range(self._high_water):
+            pid = ids[slot]
+            if pid is not None:
+                yield pid, balances[slot], xs[slot], ys[slot]
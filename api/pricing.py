@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import os
+from typing import Dict
+import yaml
+
+logger = logging.getLogger("pricing")
+
+DEFAULT_PRICING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pricing.yaml")
+
+
+class PricingTable:
+    """
+    Compiled view of pricing.yaml.
+
+    Tiers are validated against the policy bounds once, at load time, so the
+    request path is a single dict lookup. Instances are never mutated; a
+    reload builds a new table and swaps the reference.
+    """
+    __slots__ = ("amounts", "min_payment", "max_payment", "mtime")
+
+    def __init__(self, amounts: Dict[str, int], min_payment: int, max_payment: int, mtime: float = 0.0):
+        self.amounts = amounts
+        self.min_payment = min_payment
+        self.max_payment = max_payment
+        self.mtime = mtime
+
+    @classmethod
+    def from_config(cls, config: dict, mtime: float = 0.0) -> "PricingTable":
+        tiers = config.get("tiers") or {}
+        policies = config.get("policies") or {}
+        min_payment = int(policies.get("min_payment", 1))
+        max_payment = int(policies.get("max_payment", 2**63 - 1))
+        if min_payment > max_payment:
+            raise ValueError(f"min_payment ({min_payment}) exceeds max_payment ({max_payment})")
+
+        amounts = {}
+        for action, amount in tiers.items():
+            if not isinstance(amount, int) or isinstance(amount, bool):
+                raise ValueError(f"Tier '{action}' must be an integer amount of lovelace, got {amount!r}")
+            if not min_payment <= amount <= max_payment:
+                raise ValueError(
+                    f"Tier '{action}' ({amount}) is outside policy bounds [{min_payment}, {max_payment}]"
+                )
+            amounts[str(action)] = amount
+        return cls(amounts, min_payment, max_payment, mtime)
+
+
+def load_pricing(path: str = None) -> PricingTable:
+    """Reads and compiles the pricing file (HYDRA_PRICING_FILE or api/pricing.yaml)."""
+    path = path or os.getenv("HYDRA_PRICING_FILE", DEFAULT_PRICING_FILE)
+    mtime = os.stat(path).st_mtime
+    with open(path, "r") as f:
+        config = yaml.safe_load(f) or {}
+    return PricingTable.from_config(config, mtime)
+
+
+async def watch_pricing(app, path: str = None, interval: float = 1.0):
+    """
+    Polls the pricing file and hot-swaps app.state.pricing when it changes.
+    A file that fails validation is logged and ignored; the previous table
+    stays live.
+    """
+    path = path or os.getenv("HYDRA_PRICING_FILE", DEFAULT_PRICING_FILE)
+    last_seen = app.state.pricing.mtime
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError as e:
+            logger.error(f"Cannot stat pricing file {path}: {e}")
+            continue
+        if mtime == last_seen:
+            continue
+        # Remember the attempt so a broken file isn't re-parsed every tick
+        last_seen = mtime
+        try:
+            table = load_pricing(path)
+        except Exception as e:
+            logger.error(f"Pricing reload failed, keeping previous table: {e}")
+            continue
+        app.state.pricing = table
+        logger.info(f"Pricing reloaded from {path}: {len(table.amounts)} tiers")
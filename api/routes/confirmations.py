@@ -0,0 +1,124 @@
+import asyncio
+import json
+from typing import Iterable, List, Optional
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from api.routes.payments import engine
+
+router = APIRouter()
+
+KEEPALIVE_INTERVAL = 15.0
+MAX_WATCHED_TX = 1000
+
+
+async def _catch_up(subscription, tx_ids: Iterable[str] = None):
+    """Confirms watched txs that were already settled before (or outside) this subscription."""
+    for tx_id in list(tx_ids if tx_ids is not None else subscription.tx_ids):
+        record = await engine.state.get_payment(tx_id)
+        if record is not None:
+            subscription.confirmed(tx_id, record)
+
+
+def _watch(subscription, tx_ids: List[str]):
+    if len(subscription.tx_ids) + len(tx_ids) > MAX_WATCHED_TX:
+        raise ValueError(f"At most {MAX_WATCHED_TX} tx ids per subscription")
+    subscription.watch(tx_ids)
+
+
+async def _events(subscription):
+    """
+    Confirmation events as they happen; None after every idle KEEPALIVE_INTERVAL.
+    Payments settled by other workers arrive through the state backend's
+    channel, so nothing is re-polled after the initial catch-up.
+    """
+    await _catch_up(subscription)
+    while True:
+        try:
+            yield await subscription.next(KEEPALIVE_INTERVAL)
+        except asyncio.TimeoutError:
+            yield None
+
+
+def _subscribe(user_id: Optional[str], tx_ids: List[str]):
+    if not user_id and not tx_ids:
+        raise ValueError("Subscribe to a user_id and/or tx_id")
+    subscription = engine.hub.subscribe(user_id)
+    _watch(subscription, tx_ids)
+    return subscription
+
+
+@router.get("/confirmations/stream")
+async def confirmation_stream(user_id: Optional[str] = None, tx_id: List[str] = Query([])):
+    """Server-sent events: one `confirmed` event per settled payment of user_id / tx_id."""
+    try:
+        subscription = _subscribe(user_id, tx_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def stream():
+        try:
+            async for event in _events(subscription):
+                if event is not None:
+                    yield f"event: confirmed\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+                else:
+                    # Comment line: keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.websocket("/ws/confirmations")
+async def confirmation_socket(websocket: WebSocket, user_id: Optional[str] = None,
+                              tx_id: List[str] = Query([])):
+    """
+    Same events over a WebSocket. Clients may watch more tx ids later by
+    sending {"tx_ids": [...]}, e.g. right after each /pay response.
+    """
+    await websocket.accept()
+    subscription = engine.hub.subscribe(user_id)
+    try:
+        _watch(subscription, tx_id)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        subscription.close()
+        return
+
+    async def read_subscriptions():
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except WebSocketDisconnect:
+                return
+            except ValueError:
+                await websocket.send_json({"type": "error", "error": "invalid JSON"})
+                continue
+            tx_ids = message.get("tx_ids") if isinstance(message, dict) else None
+            if not isinstance(tx_ids, list) or not all(isinstance(t, str) for t in tx_ids):
+                await websocket.send_json({"type": "error", "error": "Expected {\"tx_ids\": [...]}"})
+                continue
+            try:
+                _watch(subscription, tx_ids)
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "error": str(e)})
+                continue
+            await _catch_up(subscription, tx_ids)
+
+    async def send_events():
+        try:
+            async for event in _events(subscription):
+                if event is not None:
+                    await websocket.send_json(event)
+        except WebSocketDisconnect:
+            pass
+
+    # Whichever side ends first (usually the client disconnecting) ends both
+    tasks = {asyncio.create_task(read_subscriptions()), asyncio.create_task(send_events())}
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
@@ -1,85 +1,144 @@
+import os
 import time
-import json
 import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict, Set
+from typing import Dict, List, Set, Tuple
+from api.gaming_protocol import JSON_CODEC, negotiate
+from api.player_store import PlayerStore
+from api.spatial import SpatialGrid
+from api.state import backend as default_backend, GAMING_MESSAGES, GAMING_LATENCY_MS
+from api.ledger import InsufficientFunds, ledger as default_ledger
 
 router = APIRouter()
 logger = logging.getLogger("gaming_ws")
 logger.setLevel(logging.INFO)
 
-# In-memory session state manager
+# Players only receive entities within this distance of themselves
+AOI_RADIUS = float(os.getenv("GAMING_AOI_RADIUS", "50"))
+
+# Session state manager. A socket lives in exactly one worker process, so the
+# per-tick player state stays in memory here; the shared backend only tracks
+# which players are connected (and where) plus the metric counters. With a
+# ledger, balances are the players' prepaid credit (shared with /pay) and the
+# store only mirrors them for the area-of-interest rows.
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, state=None, aoi_radius: float = AOI_RADIUS, ledger=None):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.player_states: Dict[str, dict] = {}
-        self.metrics = {"messages_processed": 0, "total_latency_ms": 0.0}
+        self.players = PlayerStore()
+        self.aoi_radius = aoi_radius
+        self.grid = SpatialGrid(cell_size=aoi_radius)
+        self.codecs: Dict[str, object] = {}
+        self.state = state or default_backend
+        self.ledger = ledger if ledger is not None else default_ledger
 
-    async def connect(self, player_id: str, websocket: WebSocket):
-        await websocket.accept()
+    async def connect(self, player_id: str, websocket: WebSocket, codec=JSON_CODEC):
+        await websocket.accept(subprotocol=codec.subprotocol)
         self.active_connections[player_id] = websocket
-        self.player_states[player_id] = {"balance": 1000, "position": [0,0]} # Mock state
+        self.codecs[player_id] = codec
+        # Mock state without a ledger: default balance at the origin
+        slot = self.players.add(player_id, balance=self.ledger.balance(player_id) if self.ledger else None)
+        # move, not insert: a reconnecting player's slot may still sit in its old cell
+        self.grid.move(slot, 0.0, 0.0)
+        await self.state.set_session(player_id, {"worker": os.getpid(), "connected_at": time.time()})
         logger.info(f"Player {player_id} connected. Total: {len(self.active_connections)}")
 
-    def disconnect(self, player_id: str):
+    async def disconnect(self, player_id: str):
         if player_id in self.active_connections:
             del self.active_connections[player_id]
-        if player_id in self.player_states:
-            del self.player_states[player_id]
+        self.codecs.pop(player_id, None)
+        slot = self.players.slots.get(player_id)
+        if slot is not None:
+            self.grid.remove(slot)
+            self.players.remove(player_id)
+        await self.state.delete_session(player_id)
         logger.info(f"Player {player_id} disconnected.")
 
+    def visible_rows(self, player_id: str) -> List[Tuple[str, int, float, float]]:
+        """(player_id, balance, x, y) for every player inside this player's area of interest."""
+        store = self.players
+        slot = store.slots[player_id]
+        x, y = store.xs[slot], store.ys[slot]
+        r2 = self.aoi_radius * self.aoi_radius
+        rows = []
+        for other in self.grid.candidates(x, y, self.aoi_radius):
+            dx = store.xs[other] - x
+            dy = store.ys[other] - y
+            if dx * dx + dy * dy <= r2:
+                rows.append((store.ids[other], store.balances[other], store.xs[other], store.ys[other]))
+        return rows
+
     async def broadcast_state(self, exclude: str = None):
-        # In a real game, only broadcast to players in same instance/room
-        state_dump = json.dumps({"type": "state_sync", "players": self.player_states})
+        # Each player only gets the entities near them, so the work per
+        # recipient follows local density instead of total population
         for pid, ws in list(self.active_connections.items()):
-            if pid != exclude:
+            if pid != exclude and pid in self.players:
+                codec = self.codecs.get(pid, JSON_CODEC)
                 try:
-                    await ws.send_text(state_dump)
+                    await _send(ws, codec, codec.encode_state(self.visible_rows(pid)))
                 except Exception:
                     pass
 
-    async def process_message(self, player_id: str, message: str) -> dict:
+    async def process_message(self, player_id: str, message, codec=JSON_CODEC) -> dict:
         start_time = time.time()
         try:
-            data = json.loads(message)
+            data = codec.decode(message)
             action = data.get("action")
             
             # Simple game loop action
             if action == "move":
                 pos = data.get("position", [0, 0])
-                self.player_states[player_id]["position"] = pos
+                self.players.set_position(player_id, pos[0], pos[1])
+                self.grid.move(self.players.slots[player_id], pos[0], pos[1])
             elif action == "micro_action":
                 # Simulated microtransaction execution linked to game action (e.g. buying ammo)
                 cost = data.get("cost", 10)
-                if self.player_states[player_id]["balance"] >= cost:
-                    self.player_states[player_id]["balance"] -= cost
+                if type(cost) is not int or cost <= 0:
+                    raise ValueError("cost must be a positive integer")
+                if self.ledger is None:
+                    self.players.debit(player_id, cost)
+                else:
+                    try:
+                        await self.ledger.debit(player_id, cost)
+                    except InsufficientFunds:
+                        pass  # same as the store: an uncovered action is simply not charged
+                    self.players.set_balance(player_id, self.ledger.balance(player_id))
                 
-            response = {"status": "ok", "ack_action": action, "balance": self.player_states[player_id]["balance"]}
+            response = {"status": "ok", "ack_action": action, "balance": self.players.balance(player_id)}
         except Exception as e:
             response = {"status": "error", "error": str(e)}
             
         latency_ms = (time.time() - start_time) * 1000
-        self.metrics["messages_processed"] += 1
-        self.metrics["total_latency_ms"] += latency_ms
+        await self.state.incr({GAMING_MESSAGES: 1, GAMING_LATENCY_MS: latency_ms})
         
         return response
 
+async def _send(websocket: WebSocket, codec, frame):
+    if codec.binary:
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
+
 manager = ConnectionManager()
 
 @router.websocket("/ws/gaming/{player_id}")
 async def gaming_endpoint(websocket: WebSocket, player_id: str):
-    await manager.connect(player_id, websocket)
+    # JSON stays the default; binary only if the client offers the subprotocol
+    codec = negotiate(websocket.scope.get("subprotocols", []))
+    await manager.connect(player_id, websocket, codec)
     try:
         while True:
             # Wait for client message
-            data = await websocket.receive_text()
+            if codec.binary:
+                data = await websocket.receive_bytes()
+            else:
+                data = await websocket.receive_text()
             # Process and calculate turnaround time
-            response = await manager.process_message(player_id, data)
+            response = await manager.process_message(player_id, data, codec)
             # Send ACK back
-            await websocket.send_json(response)
+            await _send(websocket, codec, codec.encode_ack(response))
             
             # Optionally broadcast new state to all (rate limited in real life)
             # await manager.broadcast_state(exclude=player_id)
             
     except WebSocketDisconnect:
-        manager.disconnect(player_id)
+        await manager.disconnect(player_id)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, HTTPException, Request
+
+router = APIRouter()
+
+# Supervisors are started by the app lifespan (HYDRA_HEADS) and live in app.state.heads;
+# every read below is answered from their in-memory state, no node round-trip.
+
+@router.get("/heads")
+async def list_heads(request: Request):
+    return [head.snapshot() for head in request.app.state.heads.values()]
+
+@router.get("/heads/{name}")
+async def get_head(request: Request, name: str):
+    head = request.app.state.heads.get(name)
+    if head is None:
+        raise HTTPException(status_code=404, detail=f"Unknown head: {name}")
+    return head.snapshot()
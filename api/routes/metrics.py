@@ -1,8 +1,7 @@
 import asyncio
 import time
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from api.routes.payments import engine
-from api.routes.gaming import manager
+from api.state import backend, TX_COUNT, TX_LATENCY_MS, GAMING_MESSAGES, GAMING_LATENCY_MS
 
 router = APIRouter()
 
@@ -10,8 +9,10 @@ router = APIRouter()
 async def metrics_endpoint(websocket: WebSocket):
     await websocket.accept()
     
-    last_tx_count = engine.metrics["tx_count"]
-    last_msg_count = manager.metrics["messages_processed"]
+    # Counters come from the shared backend so the numbers cover every worker
+    counters = await backend.counters()
+    last_tx_count = counters.get(TX_COUNT, 0)
+    last_msg_count = counters.get(GAMING_MESSAGES, 0)
     last_time = time.time()
     
     try:
@@ -23,8 +24,9 @@ async def metrics_endpoint(websocket: WebSocket):
             if dt <= 0:
                 continue
                 
-            current_tx = engine.metrics["tx_count"]
-            current_msg = manager.metrics["messages_processed"]
+            counters = await backend.counters()
+            current_tx = counters.get(TX_COUNT, 0)
+            current_msg = counters.get(GAMING_MESSAGES, 0)
             
             tx_diff = current_tx - last_tx_count
             msg_diff = current_msg - last_msg_count
@@ -35,14 +37,15 @@ async def metrics_endpoint(websocket: WebSocket):
             total_events = current_tx + current_msg
             avg_latency = 0
             if total_events > 0:
-                avg_latency = (engine.metrics["total_latency_ms"] + manager.metrics["total_latency_ms"]) / total_events
+                avg_latency = (counters.get(TX_LATENCY_MS, 0.0) + counters.get(GAMING_LATENCY_MS, 0.0)) / total_events
                 
             payload = {
                 "timestamp": now,
                 "tps": total_tps,
                 "latency_ms": avg_latency,
-                "tx_total": current_tx,
-                "gaming_total": current_msg
+                "tx_total": int(current_tx),
+                "gaming_total": int(current_msg),
+                "players_online": await backend.session_count()
             }
             
             await websocket.send_json(payload)
@@ -1,11 +1,23 @@
 import asyncio
+import hmac
+import json
+import os
 import time
-from fastapi import APIRouter, HTTPException, Request
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from api.engine import PaymentEngine
+from api.idempotency import IdempotencyCache, IdempotencyConflict, fingerprint
+from api.ledger import InsufficientFunds
 
 router = APIRouter()
 engine = PaymentEngine()
+idempotency = IdempotencyCache.from_env()
+
+# Bulk submission: items per request, and items per engine batch on the streaming variant
+BATCH_MAX_ITEMS = 10_000
+BATCH_CHUNK = 500
 
 class PaymentRequest(BaseModel):
     user_id: str
@@ -18,28 +30,204 @@ class PaymentResponse(BaseModel):
     amount_lovelace: int
 
 @router.post("/pay", response_model=PaymentResponse)
-async def process_payment(request: Request, payload: PaymentRequest):
+async def process_payment(request: Request, response: Response, payload: PaymentRequest,
+                          idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     start_time = time.time()
-    pricing = request.app.state.pricing
-    
-    # Determine amount based on action
-    amount = pricing["tiers"].get(payload.action)
+    # Determine amount based on action (bounds already checked when the table was compiled)
+    amount = request.app.state.pricing.amounts.get(payload.action)
     if not amount:
         raise HTTPException(status_code=400, detail=f"Invalid action: {payload.action}")
-        
-    # Process payment via Engine (Hydra)
-    try:
+
+    async def pay() -> dict:
+        # Process payment via Engine (Hydra)
         tx_id = await engine.process_microtransaction(payload.user_id, amount)
+        return PaymentResponse(
+            status="success",
+            tx_id=tx_id,
+            latency_ms=(time.time() - start_time) * 1000,
+            amount_lovelace=amount
+        ).model_dump()
+
+    try:
+        if not idempotency_key:
+            return await pay()
+        # Retries with the same key join the in-flight payment or replay its result
+        result, replayed = await idempotency.run(idempotency_key, fingerprint(payload.model_dump()), pay)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except InsufficientFunds as e:
+        raise HTTPException(status_code=402, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-        
-    latency_ms = (time.time() - start_time) * 1000
-    return PaymentResponse(
-        status="success",
-        tx_id=tx_id,
-        latency_ms=latency_ms,
-        amount_lovelace=amount
-    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+def _validate_items(items: List[Any], amounts: Dict[str, int], offset: int = 0):
+    """
+    One pass over raw {user_id, action} dicts (no per-item model objects).
+    Returns ([(index, user_id, amount)], [error results]).
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items, offset):
+        if not isinstance(item, dict) or not isinstance(item.get("user_id"), str) \
+                or not isinstance(item.get("action"), str):
+            errors.append({"index": index, "status": "error", "error": "Expected {user_id, action} strings"})
+            continue
+        amount = amounts.get(item["action"])
+        if not amount:
+            errors.append({"index": index, "status": "error", "error": f"Invalid action: {item['action']}"})
+            continue
+        valid.append((index, item["user_id"], amount))
+    return valid, errors
+
+
+async def _settle(valid: List[Tuple[int, str, int]], errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Hands the valid items to the engine as one batch; per-item results in index order."""
+    try:
+        tx_ids = await engine.process_batch([(user_id, amount) for _, user_id, amount in valid])
+        results = [{"index": index, "status": "success", "tx_id": tx_id, "amount_lovelace": amount}
+                   if tx_id else {"index": index, "status": "error", "error": "Insufficient funds"}
+                   for (index, _, amount), tx_id in zip(valid, tx_ids)]
+    except Exception as e:
+        results = [{"index": index, "status": "error", "error": str(e)} for index, _, _ in valid]
+    return sorted(results + errors, key=lambda r: r["index"])
+
+
+@router.post("/pay/batch")
+async def process_payment_batch(request: Request):
+    """JSON array (or {"items": [...]}) of {user_id, action}; one engine batch, per-item results."""
+    start_time = time.time()
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    items = body.get("items") if isinstance(body, dict) else body
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="Expected a list of {user_id, action} items")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ITEMS} items per batch")
+
+    results = await _settle(*_validate_items(items, request.app.state.pricing.amounts))
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    return JSONResponse({
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "latency_ms": (time.time() - start_time) * 1000,
+        "results": results,
+    })
+
+
+class _UploadStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse that may answer while the request body is still
+    arriving. Starlette's own one waits on `receive` for a disconnect
+    (ASGI < 2.4, e.g. uvicorn's HTTP), which would swallow the rest of the
+    upload; here a dropped client shows up in request.stream() instead.
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/pay/batch/stream")
+async def process_payment_stream(request: Request):
+    """
+    NDJSON in, NDJSON out: every BATCH_CHUNK lines go to the engine as soon
+    as they have been read, so settling overlaps the upload, and each
+    chunk's results are streamed back as it completes, while the rest of
+    the body is still being read.
+    """
+    amounts = request.app.state.pricing.amounts
+    chunks: asyncio.Queue = asyncio.Queue()  # settling chunks in order; None once the body is read
+    pending: List[Any] = []
+    index = 0
+    truncated = False
+
+    def dispatch():
+        nonlocal pending
+        if pending:
+            chunks.put_nowait(asyncio.create_task(_settle(*_validate_items(pending, amounts, index - len(pending)))))
+            pending = []
+
+    def add(line: bytes) -> bool:
+        nonlocal index
+        if index >= BATCH_MAX_ITEMS:
+            return False
+        try:
+            pending.append(json.loads(line))
+        except ValueError:
+            pending.append(None)  # reported as an invalid item at its index
+        index += 1
+        if len(pending) >= BATCH_CHUNK:
+            dispatch()
+        return True
+
+    async def read_body():
+        nonlocal truncated
+        try:
+            buffer = b""
+            async for data in request.stream():
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip() and not add(line):
+                        truncated = True
+            if buffer.strip() and not add(buffer):
+                truncated = True
+            dispatch()
+        finally:
+            chunks.put_nowait(None)
+
+    async def results():
+        reader = asyncio.create_task(read_body())
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                for result in await chunk:
+                    yield json.dumps(result, separators=(",", ":")) + "\n"
+            await reader  # re-raises if the upload broke off
+            if truncated:
+                yield json.dumps({"index": BATCH_MAX_ITEMS, "status": "error",
+                                  "error": f"At most {BATCH_MAX_ITEMS} items per batch; the rest were ignored"}) + "\n"
+        finally:
+            reader.cancel()
+
+    return _UploadStreamingResponse(results(), media_type="application/x-ndjson")
+
+
+class CreditRequest(BaseModel):
+    user_id: str
+    amount_lovelace: int
+
+def _ledger():
+    if engine.ledger is None:
+        raise HTTPException(status_code=404, detail="Balances are not tracked (set HYDRA_LEDGER_DIR)")
+    return engine.ledger
+
+def _require_operator(admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """Top-ups mint spendable credit, so only the operator (HYDRA_ADMIN_TOKEN) may make them."""
+    expected = os.getenv("HYDRA_ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Top-ups are disabled (set HYDRA_ADMIN_TOKEN)")
+    if not admin_token or not hmac.compare_digest(admin_token, expected):
+        raise HTTPException(status_code=401, detail="Missing or wrong X-Admin-Token")
+
+@router.post("/credit", dependencies=[Depends(_require_operator)])
+async def credit_user(payload: CreditRequest):
+    try:
+        balance = await _ledger().credit(payload.user_id, payload.amount_lovelace)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"user_id": payload.user_id, "balance_lovelace": balance}
+
+@router.get("/balance/{user_id}")
+async def user_balance(user_id: str):
+    return {"user_id": user_id, "balance_lovelace": _ledger().balance(user_id)}
+
 
 @router.get("/verify/{tx_id}")
 async def verify_payment(tx_id: str):
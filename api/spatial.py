@@ -0,0 +1,60 @@
+import math
+from typing import Dict, Iterator, Set, Tuple
+
+Cell = Tuple[int, int]
+
+
+class SpatialGrid:
+    """
+    Uniform grid over player positions for area-of-interest queries.
+
+    Entries are PlayerStore slots. Membership is updated incrementally: a
+    move only touches the grid when the entry crosses into another cell.
+    With cell_size equal to the interest radius, a query scans at most the
+    3x3 block of cells around the viewer, so its cost follows local density
+    rather than world population.
+    """
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, Set[int]] = {}
+        self.cell_of: Dict[int, Cell] = {}
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, slot: int, x: float, y: float):
+        cell = self._cell(x, y)
+        self.cell_of[slot] = cell
+        self.cells.setdefault(cell, set()).add(slot)
+
+    def remove(self, slot: int):
+        cell = self.cell_of.pop(slot, None)
+        if cell is None:
+            return
+        members = self.cells[cell]
+        members.discard(slot)
+        if not members:
+            del self.cells[cell]
+
+    def move(self, slot: int, x: float, y: float):
+        cell = self._cell(x, y)
+        old = self.cell_of.get(slot)
+        if old == cell:
+            return
+        if old is not None:
+            self.remove(slot)
+        self.cell_of[slot] = cell
+        self.cells.setdefault(cell, set()).add(slot)
+
+    def candidates(self, x: float, y: float, radius: float) -> Iterator[int]:
+        """Slots in every cell overlapping the square around (x, y); callers refine by distance."""
+        cx0, cy0 = self._cell(x - radius, y - radius)
+        cx1, cy1 = self._cell(x + radius, y + radius)
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                members = cells.get((cx, cy))
+                if members:
+                    yield from members
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("api_state")
+
+# Counter names shared by the payment engine, gaming manager and metrics socket
+TX_COUNT = "tx_count"
+TX_LATENCY_MS = "tx_latency_ms"
+GAMING_MESSAGES = "messages_processed"
+GAMING_LATENCY_MS = "gaming_latency_ms"
+
+# on_payment(tx_id, record) callback fed by watch_payments()
+PaymentCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class MemoryStateBackend:
+    """
+    Process-local state (the default).
+    Fine for a single uvicorn worker; every worker would see its own copy.
+    """
+    def __init__(self):
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._payments: Dict[str, dict] = {}
+        self._sessions: Dict[str, dict] = {}
+
+    async def incr(self, counters: Dict[str, float]):
+        for name, amount in counters.items():
+            self._counters[name] += amount
+
+    async def counters(self) -> Dict[str, float]:
+        return dict(self._counters)
+
+    async def record_payment(self, tx_id: str, record: Dict[str, Any]):
+        self._payments[tx_id] = record
+
+    async def record_payments(self, records: Dict[str, Dict[str, Any]]):
+        self._payments.update(records)
+
+    async def get_payment(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        return self._payments.get(tx_id)
+
+    async def watch_payments(self, on_payment: PaymentCallback):
+        """No other workers to hear from: the engine publishes its own payments."""
+
+    async def set_session(self, player_id: str, session: Dict[str, Any]):
+        self._sessions[player_id] = session
+
+    async def get_session(self, player_id: str) -> Optional[Dict[str, Any]]:
+        return self._sessions.get(player_id)
+
+    async def delete_session(self, player_id: str):
+        self._sessions.pop(player_id, None)
+
+    async def session_count(self) -> int:
+        return len(self._sessions)
+
+    async def close(self):
+        pass
+
+
+class RedisStateBackend:
+    """
+    Shared state in a local Redis so several uvicorn workers can serve one port.
+
+    Counter increments are the hot path (one per payment / gaming message), so
+    they are buffered in-process and flushed as a single pipeline every
+    `flush_interval` seconds instead of costing a round-trip each.
+
+    Recorded payments are also published on a pub/sub channel, so each
+    worker's confirmation hub hears about payments settled by the others.
+    """
+    def __init__(self, url: str, prefix: str = "hydra", flush_interval: float = 0.2, client=None):
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                raise RuntimeError("HYDRA_STATE_URL points at Redis but the 'redis' package is not installed")
+            client = aioredis.from_url(url, decode_responses=True)
+        self.redis = client
+        self.prefix = prefix
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, float] = defaultdict(float)
+        self._flusher: Optional[asyncio.Task] = None
+        self._origin = uuid.uuid4().hex  # our own messages come back on the channel; skip them
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    async def incr(self, counters: Dict[str, float]):
+        for name, amount in counters.items():
+            self._pending[name] += amount
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(float)
+        pipe = self.redis.pipeline(transaction=False)
+        for name, amount in pending.items():
+            pipe.hincrbyfloat(self._key("counters"), name, amount)
+        try:
+            await pipe.execute()
+        except Exception as e:
+            # Put the deltas back so they are retried on the next flush
+            logger.error(f"Counter flush failed: {e}")
+            for name, amount in pending.items():
+                self._pending[name] += amount
+
+    async def counters(self) -> Dict[str, float]:
+        await self.flush()
+        raw = await self.redis.hgetall(self._key("counters"))
+        return {name: float(value) for name, value in raw.items()}
+
+    async def record_payment(self, tx_id: str, record: Dict[str, Any]):
+        await self.record_payments({tx_id: record})
+
+    async def record_payments(self, records: Dict[str, Dict[str, Any]]):
+        # One HSET with a mapping plus one PUBLISH: a whole batch costs a single round-trip
+        if records:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(self._key("payments"), mapping={
+                tx_id: json.dumps(record) for tx_id, record in records.items()})
+            pipe.publish(self._key("payments:settled"), json.dumps({"origin": self._origin, "payments": records}))
+            await pipe.execute()
+
+    async def watch_payments(self, on_payment: PaymentCallback, retry_delay: float = 1.0):
+        """Feeds payments recorded by other workers to on_payment until cancelled."""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self._key("payments:settled"))
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    if data.get("origin") == self._origin:
+                        continue
+                    for tx_id, record in data.get("payments", {}).items():
+                        on_payment(tx_id, record)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Payment channel lost ({e}); resubscribing in {retry_delay}s")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(retry_delay)
+
+    async def get_payment(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.hget(self._key("payments"), tx_id)
+        return json.loads(raw) if raw else None
+
+    async def set_session(self, player_id: str, session: Dict[str, Any]):
+        await self.redis.hset(self._key("sessions"), player_id, json.dumps(session))
+
+    async def get_session(self, player_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.hget(self._key("sessions"), player_id)
+        return json.loads(raw) if raw else None
+
+    async def delete_session(self, player_id: str):
+        await self.redis.hdel(self._key("sessions"), player_id)
+
+    async def session_count(self) -> int:
+        return await self.redis.hlen(self._key("sessions"))
+
+    async def close(self):
+        await self.flush()
+        await self.redis.aclose()
+
+
+def create_backend(url: str = None):
+    """
+    Builds the state backend from HYDRA_STATE_URL.
+    Unset or memory:// keeps everything in-process; redis://host:port/db shares it.
+    """
+    url = url or os.getenv("HYDRA_STATE_URL", "memory://")
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        logger.info(f"Using shared Redis state backend at {url}")
+        return RedisStateBackend(url)
+    return MemoryStateBackend()
+
+
+backend = create_backend()
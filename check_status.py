@@ -1,25 +1,26 @@
-
 import asyncio
 import json
 import logging
 from cli.hydra_client import HydraClient
+from cli.head_supervisor import HeadSupervisor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 async def get_status():
-    client = HydraClient()
+    head = HeadSupervisor(client=HydraClient.lean(), auto_collect=False, auto_fanout=False)
     try:
-        await client.connect()
-        # The greeting is the first message sent by the server.
-        greeting = await client.receive_event()
-        logger.info(f"Head Status: {greeting.get('headStatus')}")
+        await head.start()
+        # Lean connection: no history replay, Greetings carries the current status
+        await asyncio.wait_for(head.ready.wait(), timeout=10)
+        logger.info(f"Head Status: {head.state}")
+        logger.info(json.dumps(head.snapshot(), indent=2))
         
     except Exception as e:
         logger.error(f"Error: {e}")
     finally:
-        await client.close()
+        await head.stop()
 
 if __name__ == "__main__":
     asyncio.run(get_status())
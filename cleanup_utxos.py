@@ -1,9 +1,7 @@
 
-import subprocess
-import json
+import asyncio
 import logging
 import sys
-import time
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 logger = logging.getLogger(__name__)
@@ -14,26 +12,27 @@ logger = logging.getLogger(__name__)
 COMMIT_AMT = 3_000_000_000    # 3000 ADA commit (single round 10k)
 FEE_AMT = 10_000_000       # 10 ADA per fee/fuel UTXO
 NUM_FEE_UTXOS = 5           # 5 small UTXOs for Hydra node fuel
+CONFIRM_TIMEOUT = 300       # seconds to wait for the cleanup tx to land in a block
 
-def query_utxos(address):
-    """Query UTXOs via cardano-cli."""
-    cmd = [
-        "docker", "compose", "exec", "cardano-node",
-        "cardano-cli", "query", "utxo",
-        "--address", address,
-        "--testnet-magic", "1",
-        "--socket-path", "/ipc/node.socket",
-        "--out-file", "/dev/stdout"
-    ]
-    res = subprocess.run(cmd, capture_output=True, text=True)
-    if res.returncode != 0:
-        logger.error(f"Query failed: {res.stderr}")
-        return None
+async def query_utxos_async(address, wallet=None):
+    """Query UTXOs via Ogmios (cardano-cli JSON shape: "TxId#Ix" -> {address, value, ...})."""
+    from cli.ogmios_client import OgmiosClient
+    from cli.wallet_state import WalletState, to_cli_utxo_map
+    if wallet is not None:
+        return to_cli_utxo_map(await wallet.utxos_for(address))
+    ogmios = OgmiosClient()
     try:
-        return json.loads(res.stdout)
+        await ogmios.connect()
+        return to_cli_utxo_map(await WalletState(ogmios).utxos_for(address))
     except Exception as e:
-        logger.error(f"JSON Decode failed: {e}")
+        logger.error(f"Query failed: {e}")
         return None
+    finally:
+        await ogmios.close()
+
+def query_utxos(address):
+    """Query UTXOs via Ogmios (sync wrapper for scripts without an event loop)."""
+    return asyncio.run(query_utxos_async(address))
 
 def count_utxos_above(utxos, threshold_lovelace):
     """Count UTXOs with value above threshold."""
@@ -56,13 +55,31 @@ def is_already_setup(utxos):
     small_clean = sum(1 for u in clean if 5_000_000 <= u['value']['lovelace'] < 400_000_000)
     return commit_sized >= 1 and small_clean >= 2
 
-def cleanup_utxos():
+async def cleanup_utxos_async():
     """Consolidate UTXOs and create commit + fee UTXOs."""
+    from cli.ogmios_client import OgmiosClient
+    from cli.wallet_state import WalletState
+    ogmios = OgmiosClient()
+    await ogmios.connect()
+    wallet = WalletState(ogmios)
+    try:
+        return await _cleanup(wallet)
+    finally:
+        await wallet.stop()
+        await ogmios.close()
+
+def cleanup_utxos():
+    """Sync entry point (for __main__ and callers without an event loop)."""
+    return asyncio.run(cleanup_utxos_async())
+
+async def _cleanup(wallet):
+    from cli.l1_tx import build_payment_tx
+    from cli.protocol_params import get_provider
     with open("keys/payment.addr", "r") as f:
         address = f.read().strip()
     logger.info(f"Cleaning funds for: {address}")
     
-    utxos = query_utxos(address)
+    utxos = await query_utxos_async(address, wallet)
     if not utxos:
         logger.error("No UTXOs found.")
         return False
@@ -85,82 +102,47 @@ def cleanup_utxos():
         logger.error(f"Insufficient funds! Have {total_lovelace/1e6:.1f} ADA, need {min_needed/1e6:.1f} ADA")
         return False
 
-    # Build: 1 commit output + N fee outputs + change
+    # Build: 1 commit output + N fee outputs + change, balanced and signed in memory
     # No datum on any output (Hydra 1.2.0 doesn't need it)
-    cmd_build = [
-        "docker", "compose", "exec", "cardano-node",
-        "cardano-cli", "conway", "transaction", "build",
-        "--testnet-magic", "1",
-        "--socket-path", "/ipc/node.socket",
-        "--change-address", address,
-    ]
-    
-    # Add commit output (500 ADA, no datum)
-    cmd_build.extend(["--tx-out", f"{address}+{COMMIT_AMT}"])
-    
-    # Add fee/fuel outputs (10 ADA each, no datum)
-    for i in range(NUM_FEE_UTXOS):
-        cmd_build.extend(["--tx-out", f"{address}+{FEE_AMT}"])
-    
-    cmd_build.extend(["--out-file", "/keys/cleanup.raw"])
-    
-    # Add all inputs
-    for txi in tx_ins:
-        cmd_build.extend(["--tx-in", txi])
-        
+    try:
+        await get_provider().refresh(wallet.ogmios)
+    except Exception as e:
+        logger.warning(f"Using cached protocol parameters: {e}")
+    outputs = [(address, COMMIT_AMT)] + [(address, FEE_AMT)] * NUM_FEE_UTXOS
     logger.info(f"Building: 1×{COMMIT_AMT/1e6:.0f} ADA commit + {NUM_FEE_UTXOS}×{FEE_AMT/1e6:.0f} ADA fee + change")
-    res_build = subprocess.run(cmd_build, capture_output=True, text=True)
-    if res_build.returncode != 0:
-        logger.error(f"Build failed: {res_build.stderr}")
+    try:
+        tx = build_payment_tx(utxos, outputs, address)
+    except Exception as e:
+        logger.error(f"Build failed: {e}")
         return False
-        
-    # Sign
-    cmd_sign = [
-        "docker", "compose", "exec", "cardano-node",
-        "cardano-cli", "conway", "transaction", "sign",
-        "--tx-body-file", "/keys/cleanup.raw",
-        "--signing-key-file", "/keys/cardano.sk",
-        "--testnet-magic", "1",
-        "--out-file", "/keys/cleanup.signed"
-    ]
-    subprocess.run(cmd_sign, check=True)
     
-    # Submit
-    cmd_submit = [
-        "docker", "compose", "exec", "cardano-node",
-        "cardano-cli", "conway", "transaction", "submit",
-        "--tx-file", "/keys/cleanup.signed",
-        "--testnet-magic", "1",
-        "--socket-path", "/ipc/node.socket"
-    ]
-    res_submit = subprocess.run(cmd_submit, capture_output=True, text=True)
-    if res_submit.returncode != 0:
-        logger.error(f"Submit failed: {res_submit.stderr}")
+    # Follow the chain from the current tip before submitting, so the block
+    # carrying our tx can't slip past unseen
+    await wallet.start()
+
+    # Submit through Ogmios (single round-trip)
+    try:
+        cleanup_txid = await wallet.ogmios.submit_transaction(tx.to_cbor_hex())
+    except Exception as e:
+        logger.error(f"Submit failed: {e}")
         return False
     
-    # Calculate Tx Hash
-    cmd_txid = [
-        "docker", "compose", "exec", "cardano-node",
-        "cardano-cli", "conway", "transaction", "txid",
-        "--tx-file", "/keys/cleanup.signed"
-    ]
-    res_txid = subprocess.run(cmd_txid, capture_output=True, text=True)
-    cleanup_txid = res_txid.stdout.strip()
-    
     logger.info(f"Cleanup transaction submitted! Hash: {cleanup_txid}")
     
-    # Wait for confirmation by polling UTXOs
+    # Wait for the block that includes it (chain-sync event, no polling slack)
     logger.info("Waiting for L1 confirmation...")
-    for i in range(30):  # 30 × 10s = 300s max
-        time.sleep(10)
-        utxos = query_utxos(address)
-        if utxos and is_already_setup(utxos):
-            logger.info(f"  ✓ Confirmed! Found {len(utxos)} UTXOs after {i+1} polls.")
-            return cleanup_txid
-        logger.info(f"  Poll {i+1}: Waiting for confirmation...")
+    try:
+        point = await wallet.follower.wait_for_tx(cleanup_txid, timeout=CONFIRM_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.error("Cleanup timed out!")
+        return False
     
-    logger.error("Cleanup timed out!")
-    return False
+    utxos = await query_utxos_async(address, wallet)
+    if not utxos or not is_already_setup(utxos):
+        logger.error("Cleanup tx confirmed but UTXO layout is not as expected!")
+        return False
+    logger.info(f"  ✓ Confirmed at slot {point['slot']}! Found {len(utxos)} UTXOs.")
+    return cleanup_txid
 
 if __name__ == "__main__":
     if not cleanup_utxos():
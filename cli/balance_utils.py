@@ -1,6 +1,10 @@
 
 import pycardano
 import binascii
+from .protocol_params import fee_model
+
+# Serialized size of the one vkey witness sign_tx_cbor adds after balancing
+VKEY_WITNESS_SIZE = 101
 
 def balance_commit_tx(draft_cbor_hex, fee_utxo, collateral_utxo, change_address_str):
     """
@@ -42,29 +46,23 @@ def balance_commit_tx(draft_cbor_hex, fee_utxo, collateral_utxo, change_address_
         )
         tx.transaction_body.collateral = [col_input]
     
-    # 4. Calculate Fee and Change
-    # Hardcoded fee for now (generous)
-    FEE = 300000 # 0.3 ADA
-    
+    # 4. Calculate Fee and Change from the shared fee model
+    # The fee depends on the tx size, which depends on the fee and change; two or three passes settle it
+    fees = fee_model()
     fee_amount = fee_utxo['value']['ada']['lovelace']
-    change_amount = fee_amount - FEE
-    
-    if change_amount < 1000000: # MinUTXO 1 ADA
-        raise Exception(f"Insufficient funds for fees/minUTXO. Fee UTXO: {fee_amount}, Fee: {FEE}")
-
-    # Create Change Output
-    # Need to convert address string to Address object
-    # pycardano.Address.from_primitive(str)
     change_addr = pycardano.Address.from_primitive(change_address_str)
-    
-    change_output = pycardano.TransactionOutput(
-        change_addr,
-        pycardano.Value(change_amount)
-    )
-    tx.transaction_body.outputs.append(change_output)
-    
-    # Set Fee
-    tx.transaction_body.fee = FEE
-    
-    # 5. Serialize
-    return tx.to_cbor_hex()
+    outputs = list(tx.transaction_body.outputs)
+    fee = 0
+    for _ in range(4):
+        change_amount = fee_amount - fee
+        change_output = pycardano.TransactionOutput(change_addr, pycardano.Value(change_amount))
+        if change_amount < fees.min_lovelace(len(change_output.to_cbor())):
+            raise Exception(f"Insufficient funds for fees/minUTXO. Fee UTXO: {fee_amount}, Fee: {fee}")
+        tx.transaction_body.outputs = outputs + [change_output]
+        tx.transaction_body.fee = fee
+        needed = fees.min_fee(len(tx.to_cbor()) + VKEY_WITNESS_SIZE)
+        if needed <= fee:
+            # 5. Serialize
+            return tx.to_cbor_hex()
+        fee = needed
+    raise Exception("Fee did not converge")
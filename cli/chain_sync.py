@@ -0,0 +1,178 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .ogmios_client import OgmiosClient
+
+logger = logging.getLogger(__name__)
+
+
+class ChainFollower:
+    """
+    Ogmios chain-sync follower (findIntersection at the tip, then nextBlock).
+
+    Replaces sleep-and-poll confirmation loops: callers await
+    `wait_for_tx(txid)` / `wait_for_output(address)` and are woken the
+    moment the block carrying it arrives. Subscribers get every
+    roll-forward/roll-backward result as it comes in.
+    """
+    def __init__(self, ogmios: OgmiosClient, remember: int = 10_000):
+        self.ogmios = ogmios
+        self.tip: Optional[Dict[str, Any]] = None
+        self.remember = remember
+        self._task: Optional[asyncio.Task] = None
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._tx_waiters: Dict[str, List[asyncio.Future]] = {}
+        self._output_waiters: List[Tuple[str, Optional[Callable], asyncio.Future]] = []
+        self._block_waiters: List[asyncio.Future] = []
+        # txid -> block point, so a tx that lands before someone waits on it still resolves
+        self._seen: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        """Registers callback(result) for every nextBlock result."""
+        self._subscribers.append(callback)
+
+    async def start(self):
+        if self.running:
+            return
+        self.tip = await self.ogmios.query_tip()
+        await self.ogmios.find_intersection([self.tip])
+        self._task = asyncio.create_task(self._follow())
+        logger.info(f"Following chain from slot {self.tip.get('slot')}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self._fail_waiters(asyncio.CancelledError())
+
+    async def wait_for_tx(self, txid: str, timeout: float = None) -> Dict[str, Any]:
+        """Waits until txid appears in a block; returns that block's {slot, id, height}."""
+        if txid in self._seen:
+            return self._seen[txid]
+        future = asyncio.get_running_loop().create_future()
+        self._tx_waiters.setdefault(txid, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            waiters = self._tx_waiters.get(txid)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._tx_waiters[txid]
+
+    async def wait_for_output(self, address: str, predicate: Callable[[Dict[str, Any]], bool] = None,
+                              timeout: float = None) -> Dict[str, Any]:
+        """
+        Waits for a new output paying `address` (optionally matching predicate(output)).
+        Returns it as an Ogmios-style UTxO: {transaction: {id}, index, address, value, ...}.
+        """
+        future = asyncio.get_running_loop().create_future()
+        waiter = (address, predicate, future)
+        self._output_waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            if waiter in self._output_waiters:
+                self._output_waiters.remove(waiter)
+
+    async def wait_for_next_block(self, timeout: float = None) -> Dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        self._block_waiters.append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            if future in self._block_waiters:
+                self._block_waiters.remove(future)
+
+    async def _follow(self):
+        try:
+            while True:
+                self._handle(await self.ogmios.next_block())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Chain follower stopped: {e}")
+            self._fail_waiters(e)
+
+    def _handle(self, result: Dict[str, Any]):
+        self.tip = result.get("tip", self.tip)
+        for callback in self._subscribers:
+            try:
+                callback(result)
+            except Exception as e:
+                logger.error(f"Chain-sync subscriber failed: {e}")
+
+        if result.get("direction") != "forward":
+            return
+        block = result.get("block", {})
+        point = {"slot": block.get("slot"), "id": block.get("id"), "height": block.get("height")}
+
+        for tx in block.get("transactions", []):
+            txid = tx.get("id")
+            self._seen[txid] = point
+            for future in self._tx_waiters.pop(txid, []):
+                if not future.done():
+                    future.set_result(point)
+            if self._output_waiters:
+                for index, output in enumerate(tx.get("outputs", [])):
+                    self._match_output(txid, index, output)
+        while len(self._seen) > self.remember:
+            self._seen.popitem(last=False)
+
+        for future in self._block_waiters:
+            if not future.done():
+                future.set_result(block)
+        self._block_waiters.clear()
+
+    def _match_output(self, txid: str, index: int, output: Dict[str, Any]):
+        for address, predicate, future in list(self._output_waiters):
+            if future.done() or output.get("address") != address:
+                continue
+            if predicate is not None and not predicate(output):
+                continue
+            future.set_result({"transaction": {"id": txid}, "index": index, **output})
+
+    def _fail_waiters(self, error: BaseException):
+        futures = [f for fs in self._tx_waiters.values() for f in fs]
+        futures += [f for _, _, f in self._output_waiters] + self._block_waiters
+        for future in futures:
+            if not future.done():
+                if isinstance(error, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+        self._tx_waiters.clear()
+        self._output_waiters.clear()
+        self._block_waiters.clear()
+
+
+async def wait_for_blocks(count: int = 1, timeout: float = None, url: str = None) -> Dict[str, Any]:
+    """
+    One-shot helper for scripts: opens its own Ogmios connection, follows from
+    the tip and returns once `count` new blocks have arrived (the last one).
+    """
+    ogmios = OgmiosClient(url)
+    await ogmios.connect()
+    follower = ChainFollower(ogmios)
+    try:
+        await follower.start()
+
+        async def _blocks():
+            block = None
+            for _ in range(count):
+                block = await follower.wait_for_next_block()
+            return block
+
+        return await asyncio.wait_for(_blocks(), timeout)
+    finally:
+        await follower.stop()
+        await ogmios.close()
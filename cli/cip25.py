@@ -0,0 +1,185 @@
+"""
+CIP-25 NFT metadata, encoded straight to CBOR from a template.
+
+A template is the per-asset metadata map with `{placeholder}` strings,
+e.g. {"name": "{name}", "image": "ipfs://{cid}"}. It is compiled once:
+fields without placeholders are pre-encoded, so each asset only encodes
+its substituted strings and the batch's `{721: {policy: {...}}}` map is
+assembled from byte fragments, with no nested dicts and no JSON round-trip.
+Collection manifests (CSV or JSONL, one row per asset) are read lazily,
+so a drop of any size is never held in memory at once.
+"""
+import csv
+import json
+import os
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import cbor2
+
+CIP25_LABEL = 721
+# Ledger limit on metadata text/bytes; longer strings become lists of chunks (CIP-25)
+MAX_METADATA_STR = 64
+
+DEFAULT_TEMPLATE = {
+    "name": "{name}",
+    "image": "ipfs://QmPlaceholder",
+    "mediaType": "image/png",
+    "description": "Hydra Powered NFT {name}",
+}
+
+Asset = Tuple[str, Dict[str, Any]]  # (asset name, placeholder values)
+
+
+def _head(major: int, length: int) -> bytes:
+    """CBOR initial byte(s) for a major type with a length/count."""
+    if length < 24:
+        return bytes([major << 5 | length])
+    for info, size in ((24, 1), (25, 2), (26, 4), (27, 8)):
+        if length < 1 << (8 * size):
+            return bytes([major << 5 | info]) + length.to_bytes(size, "big")
+    raise ValueError("CBOR length out of range")
+
+
+def _chunks(data: bytes) -> List[bytes]:
+    """Splits UTF-8 at character boundaries into <= MAX_METADATA_STR byte pieces."""
+    pieces, start = [], 0
+    while start < len(data):
+        end = min(start + MAX_METADATA_STR, len(data))
+        while end < len(data) and data[end] & 0xC0 == 0x80:  # don't cut a multi-byte character
+            end -= 1
+        pieces.append(data[start:end])
+        start = end
+    return pieces
+
+
+def encode_value(value: Any) -> bytes:
+    """Transaction-metadata CBOR for str/int/bytes/list/dict values."""
+    if isinstance(value, str):
+        data = value.encode()
+        if len(data) <= MAX_METADATA_STR:
+            return _head(3, len(data)) + data
+        pieces = _chunks(data)
+        return _head(4, len(pieces)) + b"".join(_head(3, len(p)) + p for p in pieces)
+    if isinstance(value, dict):
+        return _head(5, len(value)) + b"".join(encode_value(k) + encode_value(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return _head(4, len(value)) + b"".join(encode_value(v) for v in value)
+    if isinstance(value, (int, bytes)) and not isinstance(value, bool):
+        return cbor2.dumps(value)
+    raise ValueError(f"Unsupported metadata value: {value!r}")
+
+
+def _has_placeholder(value: Any) -> bool:
+    if isinstance(value, str):
+        return "{" in value
+    if isinstance(value, dict):
+        return any(_has_placeholder(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_placeholder(v) for v in value)
+    return False
+
+
+def _substitute(value: Any, fields: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        return value.format_map(fields)
+    if isinstance(value, dict):
+        return {k: _substitute(v, fields) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_substitute(v, fields) for v in value]
+    return value
+
+
+class MetadataTemplate:
+    def __init__(self, template: Dict[str, Any] = None):
+        # An explicit template, even an empty one loaded from a file, is used as given
+        self.template = DEFAULT_TEMPLATE if template is None else template
+        # Per field: (encoded key, pre-encoded value or None, raw value for substitution)
+        self._fields = [(encode_value(key), None if _has_placeholder(value) else encode_value(value), value)
+                        for key, value in self.template.items()]
+        self._head = _head(5, len(self._fields))
+
+    @classmethod
+    def load(cls, path: str) -> "MetadataTemplate":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def render(self, name: str, fields: Dict[str, Any] = None) -> Dict[str, Any]:
+        """The asset's metadata as a dict (the JSON view, for inspection)."""
+        return _substitute(self.template, {**(fields or {}), "name": name})
+
+    def encode_asset(self, name: str, fields: Dict[str, Any] = None) -> bytes:
+        values = {**(fields or {}), "name": name}
+        parts = [self._head]
+        try:
+            for key, static, raw in self._fields:
+                parts.append(key)
+                parts.append(static if static is not None else encode_value(_substitute(raw, values)))
+        except KeyError as e:
+            raise ValueError(f"Asset {name!r} has no value for template placeholder {e}") from None
+        return b"".join(parts)
+
+    def encode_batch(self, policy_id: str, assets: Iterable[Asset]) -> bytes:
+        """CBOR transaction metadata {721: {policy_id: {asset name: metadata}}} for one mint tx."""
+        entries = [encode_value(name) + self.encode_asset(name, fields) for name, fields in assets]
+        return (_head(5, 1) + cbor2.dumps(CIP25_LABEL)
+                + _head(5, 1) + encode_value(policy_id)
+                + _head(5, len(entries)) + b"".join(entries))
+
+
+class RowMetadata(MetadataTemplate):
+    """
+    Metadata taken from the manifest row itself: its CIP-25 fields
+    (name, image, mediaType, description, files, attributes) as given.
+    """
+    FIELDS = ("name", "image", "mediaType", "description", "files", "attributes")
+
+    def __init__(self):
+        # No template of its own: render/encode_asset take the fields from the row
+        super().__init__({})
+
+    def render(self, name: str, fields: Dict[str, Any] = None) -> Dict[str, Any]:
+        row = {**(fields or {}), "name": name}
+        return {key: row[key] for key in self.FIELDS if row.get(key) not in (None, "")}
+
+    def encode_asset(self, name: str, fields: Dict[str, Any] = None) -> bytes:
+        return encode_value(self.render(name, fields))
+
+
+def manifest_rows(path: str) -> Iterator[Any]:
+    """
+    Streams the raw rows of a collection manifest: .csv with a header row,
+    or .jsonl/.ndjson with one object per line (None for a malformed line).
+    """
+    is_csv = os.path.splitext(path)[1].lower() == ".csv"
+    with open(path, newline="" if is_csv else None) as f:
+        if is_csv:
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+
+
+def read_manifest(path: str) -> Iterator[Asset]:
+    """
+    Streams (name, fields) from a collection manifest. Every row needs
+    `name`; the other columns fill the template's placeholders.
+    """
+    for number, row in enumerate(manifest_rows(path), 1):
+        name = row.get("name") if isinstance(row, dict) else None
+        if not name:
+            raise ValueError(f"{path}: row {number} has no 'name'")
+        yield name, row
+
+
+def batched(assets: Iterable[Asset], size: int) -> Iterator[List[Asset]]:
+    iterator = iter(assets)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+from .hydra_client import HydraClient
+from .head_supervisor import HeadSupervisor, INITIALIZING, OPEN
+from .ogmios_client import OgmiosClient
+from .wallet_state import WalletState
+from .balance_utils import balance_commit_tx
+from .l1_tx import sign_tx_cbor
+
+logger = logging.getLogger(__name__)
+
+COMMIT_MIN = 10_000_000
+COMMIT_MAX = 150_000_000
+FEE_MIN = 5_000_000
+
+
+def _utxo_ref(u: Dict[str, Any]) -> str:
+    return f"{u['transaction']['id']}#{u['index']}"
+
+
+def _lovelace(u: Dict[str, Any]) -> int:
+    return u['value']['ada']['lovelace']
+
+
+def select_commit_sets(utxos: List[Dict[str, Any]], heads: int) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Picks `heads` disjoint (commit, fee/collateral) UTxO pairs from one wallet view.
+
+    Same strategy as the single-head `fund`: commit the smallest viable
+    ADA-only UTxO (10-150 ADA) and leave larger ones as fuel, so each head
+    gets its own commit input and its own fee input and the K commit txs
+    never contend for an input.
+    """
+    clean = [u for u in utxos if len(u['value']) == 1 and _lovelace(u) >= FEE_MIN]
+    clean.sort(key=_lovelace)
+    commits = [u for u in clean if COMMIT_MIN <= _lovelace(u) <= COMMIT_MAX][:heads]
+    used = {_utxo_ref(u) for u in commits}
+    fees = [u for u in reversed(clean) if _utxo_ref(u) not in used][:heads]
+    if len(commits) < heads or len(fees) < heads:
+        raise Exception(
+            f"Need {heads} commit UTxOs ({COMMIT_MIN // 1_000_000}-{COMMIT_MAX // 1_000_000} ADA) and "
+            f"{heads} fee UTxOs (>= {FEE_MIN // 1_000_000} ADA); found {len(commits)} and {len(fees)}"
+        )
+    return list(zip(commits, fees))
+
+
+class HeadCommit:
+    """Progress of one head through commit -> CollectCom -> HeadIsOpen."""
+    def __init__(self, url: str):
+        self.url = url
+        self.status = "pending"  # pending | submitted | open | failed
+        self.txid: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def __repr__(self):
+        return f"HeadCommit({self.url}, {self.status}, txid={self.txid}, error={self.error})"
+
+
+class CommitOrchestrator:
+    """
+    Commits to K Hydra heads concurrently from one wallet.
+
+    One Ogmios UTxO query feeds `select_commit_sets`; each head then drafts
+    its commit (POST /commit), balances and signs it in memory and submits
+    it over the shared Ogmios connection, all in parallel, so the K commit
+    txs land in the same L1 block. Each head is then followed until
+    HeadIsOpen, sending CollectCom once every party has committed.
+    """
+    def __init__(self, ogmios: OgmiosClient, head_urls: List[str], address: str,
+                 wallet: WalletState = None, greeting_timeout: float = 10.0, open_timeout: float = 600.0):
+        self.ogmios = ogmios
+        self.head_urls = list(head_urls)
+        self.address = address
+        self.wallet = wallet or WalletState(ogmios)
+        self.greeting_timeout = greeting_timeout
+        self.open_timeout = open_timeout
+
+    async def run(self) -> List[HeadCommit]:
+        utxos = await self.wallet.utxos_for(self.address)
+        pairs = select_commit_sets(utxos, len(self.head_urls))
+        results = [HeadCommit(url) for url in self.head_urls]
+        await asyncio.gather(*(self._commit_head(r, commit_utxo, fee_utxo)
+                               for r, (commit_utxo, fee_utxo) in zip(results, pairs)))
+        # Inputs we spent are gone from L1
+        self.wallet.invalidate()
+        return results
+
+    async def _commit_head(self, result: HeadCommit, commit_utxo: Dict[str, Any], fee_utxo: Dict[str, Any]):
+        # The supervisor sends CollectCom once every party has committed
+        head = HeadSupervisor(client=HydraClient(result.url), auto_collect=True, auto_fanout=False)
+        try:
+            await head.start()
+            await asyncio.wait_for(head.ready.wait(), self.greeting_timeout)
+            if head.state == OPEN:
+                result.status = "open"
+                logger.info(f"[{result.url}] Head already open, nothing to commit")
+                return
+            if head.state != INITIALIZING:
+                raise Exception(f"head is {head.state}, expected {INITIALIZING}")
+
+            draft = await head.client.commit_funds({
+                _utxo_ref(commit_utxo): {"address": self.address, "value": {"lovelace": _lovelace(commit_utxo)}}
+            })
+            if not draft:
+                raise Exception("commit draft failed")
+            signed, _ = sign_tx_cbor(balance_commit_tx(draft, fee_utxo, fee_utxo, self.address))
+            result.txid = await self.ogmios.submit_transaction(signed)
+            result.status = "submitted"
+            logger.info(f"[{result.url}] Commit submitted: {result.txid}")
+
+            await head.wait_for(OPEN, self.open_timeout)
+            result.status = "open"
+            logger.info(f"[{result.url}] Head is OPEN")
+        except asyncio.TimeoutError:
+            result.error = f"timed out while {result.status}"
+            result.status = "failed"
+            logger.error(f"[{result.url}] Commit failed: {result.error}")
+        except Exception as e:
+            result.status = "failed"
+            result.error = str(e)
+            logger.error(f"[{result.url}] Commit failed: {e}")
+        finally:
+            await head.stop()
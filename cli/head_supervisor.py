@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict, Any, List, Optional
+from .hydra_client import HydraClient
+
+logger = logging.getLogger(__name__)
+
+IDLE = "Idle"
+INITIALIZING = "Initializing"
+OPEN = "Open"
+CLOSED = "Closed"
+FANOUT_POSSIBLE = "FanoutPossible"
+FINAL = "Final"
+
+# Lifecycle events and the state they move the head into
+TRANSITIONS = {
+    "HeadIsInitializing": INITIALIZING,
+    "HeadIsOpen": OPEN,
+    "HeadIsClosed": CLOSED,
+    "HeadIsContested": CLOSED,
+    "ReadyToFanout": FANOUT_POSSIBLE,
+    "HeadIsFinalized": FINAL,
+    "HeadIsAborted": FINAL,
+}
+
+
+class HeadSupervisor:
+    """
+    Long-running view of one Hydra head, driven by its event stream.
+
+    Keeps a single WebSocket to the node (reconnecting if it drops) and
+    folds every event into the current lifecycle state
+    (Idle -> Initializing -> Open -> Closed -> FanoutPossible -> Final),
+    so status reads are instant and waiting for a state is an await, not
+    a polling loop. With auto_collect / auto_fanout it also drives the
+    head forward: CollectCom once every party has committed, Fanout as
+    soon as the contestation deadline has passed (ReadyToFanout). A
+    command the node rejects is sent again after retry_delay if the head
+    is still in the state that called for it.
+    """
+    def __init__(self, url: str = None, name: str = None, client: HydraClient = None,
+                 auto_collect: bool = True, auto_fanout: bool = True,
+                 reconnect_delay: float = 1.0, retry_delay: float = 5.0, history: int = 100):
+        self.client = client or HydraClient(url)
+        self.url = self.client.url
+        self.name = name or self.url
+        self.auto_collect = auto_collect
+        self.auto_fanout = auto_fanout
+        self.reconnect_delay = reconnect_delay
+        self.retry_delay = retry_delay
+
+        self.state = IDLE
+        self.head_id: Optional[str] = None
+        self.parties: Optional[set] = None
+        self.committed: set = set()
+        self.contestation_deadline: Optional[str] = None
+        self.connected = False
+        self.last_event_at: Optional[float] = None
+        self.history: deque = deque(maxlen=history)
+        self.ready = asyncio.Event()  # set once the node has greeted us with its current status
+        self.listeners: List[Callable[[str, Dict[str, Any]], None]] = []  # (name, event) for live events
+
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._rejections: Dict[str, List[asyncio.Future]] = {}  # command tag -> CommandFailed waiters
+        self._sent: set = set()  # auto commands already sent in this lifecycle
+        self._task: Optional[asyncio.Task] = None
+
+    # --- lifecycle of the supervisor itself ---
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        await self.client.close()
+        self.connected = False
+
+    async def _run(self):
+        while True:
+            try:
+                await self.client.connect()
+                self.connected = True
+                while True:
+                    self.apply(await self.client.receive_event())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[{self.name}] Connection lost ({e}); reconnecting in {self.reconnect_delay}s")
+            self.connected = False
+            self.ready.clear()
+            await asyncio.sleep(self.reconnect_delay)
+
+    # --- event sourcing ---
+
+    def apply(self, event: Dict[str, Any]) -> str:
+        """Folds one hydra-node event into the state; returns the (possibly new) state."""
+        tag = event.get("tag")
+        self.last_event_at = time.time()
+
+        if tag == "Greetings":
+            self.head_id = event.get("hydraHeadId", self.head_id)
+            self.ready.set()
+            self._enter(event.get("headStatus", self.state), tag)
+        elif tag in TRANSITIONS:
+            if tag == "HeadIsInitializing":
+                self.head_id = event.get("headId", self.head_id)
+                self.parties = {p.get("vkey") for p in event.get("parties", [])}
+                self.committed.clear()
+                self.contestation_deadline = None
+                self._sent.clear()
+            elif tag in ("HeadIsClosed", "HeadIsContested"):
+                self.contestation_deadline = event.get("contestationDeadline", self.contestation_deadline)
+            self._enter(TRANSITIONS[tag], tag)
+        elif tag == "Committed":
+            self.committed.add(event.get("party", {}).get("vkey"))
+        elif tag == "CommandFailed":
+            failed = event.get("clientInput", {}).get("tag")
+            logger.warning(f"[{self.name}] Command failed: {failed}")
+            if failed in self._sent:
+                # Not right away: the same state would just send it again on this very event
+                asyncio.get_running_loop().call_later(self.retry_delay, self._retry, failed)
+            for future in self._rejections.pop(failed, []):
+                if not future.done():
+                    future.set_result(event)
+
+        if self.ready.is_set():
+            self._drive()
+            self._notify(event)
+        return self.state
+
+    def _notify(self, event: Dict[str, Any]):
+        for listener in self.listeners:
+            try:
+                listener(self.name, event)
+            except Exception as e:
+                logger.error(f"[{self.name}] Event listener failed: {e}")
+
+    def _enter(self, state: str, cause: str):
+        previous, self.state = self.state, state
+        if not self.ready.is_set():
+            # Replayed history (before Greetings): settle silently, Greetings records the outcome
+            return
+        last = self.history[-1]["state"] if self.history else None
+        if state != last:
+            logger.info(f"[{self.name}] {previous} -> {state} ({cause})")
+            self.history.append({"at": self.last_event_at, "event": cause, "state": state})
+        for future in self._waiters.pop(state, []):
+            if not future.done():
+                future.set_result(state)
+
+    def _drive(self):
+        """Issues the command that moves the head forward, at most once per lifecycle."""
+        if self.state == INITIALIZING and self.auto_collect and self.committed \
+                and (self.parties is None or self.parties <= self.committed):
+            self._send_once("CollectCom")
+        elif self.state == FANOUT_POSSIBLE and self.auto_fanout:
+            self._send_once("Fanout")
+
+    def _send_once(self, tag: str):
+        if tag in self._sent:
+            return
+        self._sent.add(tag)
+        logger.info(f"[{self.name}] Sending {tag}")
+        asyncio.create_task(self._send(tag))
+
+    def _retry(self, tag: str):
+        self._sent.discard(tag)
+        if self.connected and self.ready.is_set():
+            self._drive()
+
+    async def _send(self, tag: str):
+        try:
+            await self.client.send_command({"tag": tag})
+        except Exception as e:
+            logger.error(f"[{self.name}] {tag} failed: {e}")
+            self._sent.discard(tag)
+
+    # --- queries and commands ---
+
+    async def wait_for(self, state: str, timeout: float = None) -> str:
+        """Returns once the head is in `state` (immediately if it already is)."""
+        if self.state == state:
+            return state
+        future = self._expect(state)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._unexpect(state, future)
+
+    def _expect(self, state: str) -> asyncio.Future:
+        """A future for the next transition into `state`, whatever the current state is."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(state, []).append(future)
+        return future
+
+    def _unexpect(self, state: str, future: asyncio.Future):
+        waiters = self._waiters.get(state)
+        if waiters and future in waiters:
+            waiters.remove(future)
+
+    async def command(self, tag: str, until: str = None, timeout: float = None) -> str:
+        """
+        Sends Init/Close/Abort/Fanout/CollectCom and optionally waits for the
+        resulting state. Raises if the node answers with CommandFailed.
+        `until` must be entered after the command is sent: a head already
+        in it (e.g. Final from an earlier lifecycle) does not count.
+        """
+        if not until:
+            await self.client.send_command({"tag": tag})
+            return self.state
+        rejected = asyncio.get_running_loop().create_future()
+        self._rejections.setdefault(tag, []).append(rejected)
+        reached = self._expect(until)
+        try:
+            await self.client.send_command({"tag": tag})
+            done, _ = await asyncio.wait({reached, rejected}, timeout=timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if reached in done:
+                return reached.result()
+            if rejected in done:
+                raise Exception(f"{tag} rejected by hydra-node in state {self.state}")
+            raise asyncio.TimeoutError()
+        finally:
+            reached.cancel()
+            self._unexpect(until, reached)
+            waiters = self._rejections.get(tag)
+            if waiters and rejected in waiters:
+                waiters.remove(rejected)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "url": self.url,
+            "connected": self.connected,
+            "state": self.state,
+            "headId": self.head_id,
+            "parties": len(self.parties) if self.parties is not None else None,
+            "committed": len(self.committed),
+            "contestationDeadline": self.contestation_deadline,
+            "lastEventAt": self.last_event_at,
+            "history": list(self.history),
+        }
+
+
+def parse_heads(spec: str) -> Dict[str, str]:
+    """'main=ws://a:4001,game=ws://b:4001' (or bare URLs) -> {name: url}."""
+    heads = {}
+    for i, item in enumerate(s.strip() for s in (spec or "").split(",")):
+        if not item:
+            continue
+        # Only an '=' before the scheme names the head; URLs may carry ?query=params
+        if "=" in item.split("://")[0]:
+            name, _, url = item.partition("=")
+        else:
+            name, url = f"head{i}", item
+        heads[name.strip()] = url.strip()
+    return heads
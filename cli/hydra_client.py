@@ -3,15 +3,58 @@ import json
 import logging
 import os
 import websockets
+from websockets.exceptions import ConnectionClosed
 import aiohttp
 from typing import Dict, Any, Optional, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class Greeting:
+    """The Greetings message a hydra-node sends on connect, parsed."""
+    __slots__ = ("head_status", "head_id", "snapshot_utxo", "me", "version", "raw")
+
+    def __init__(self, event: Dict[str, Any]):
+        self.head_status: str = event.get("headStatus", "Idle")
+        self.head_id: Optional[str] = event.get("hydraHeadId")
+        # None when the node was asked not to send it (snapshot-utxo=no) or has none yet
+        self.snapshot_utxo: Optional[Dict[str, Any]] = event.get("snapshotUtxo")
+        self.me: Optional[Dict[str, Any]] = event.get("me")
+        self.version: Optional[str] = event.get("hydraNodeVersion")
+        self.raw = event
+
+    def __repr__(self):
+        return f"Greeting({self.head_status}, head={self.head_id})"
+
+
+def _with_query(url: str, **params: str) -> str:
+    """Adds/overrides query parameters on a ws:// URL."""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update(params)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
 class HydraClient:
-    def __init__(self, url: str = None):
+    """
+    WebSocket + HTTP client for a hydra-node.
+
+    If the socket drops, send_command/receive_event reconnect transparently
+    with exponential backoff. The reconnect asks the node to replay its
+    event history (`?history=yes`) and events whose `seq` we already
+    delivered are skipped, so callers waiting on TxValid/SnapshotConfirmed
+    keep waiting on the same stream instead of failing or missing events.
+
+    history=False / snapshot_utxo=False ask the node for a lean connection
+    (`?history=no&snapshot-utxo=no`): no replay of past events and no UTxO
+    in the greeting, so connecting costs the same however old the head is.
+    Leave them as None to use the node's defaults.
+    """
+    def __init__(self, url: str = None, reconnect: bool = True, max_retries: int = 8,
+                 backoff: float = 0.5, max_backoff: float = 30.0,
+                 history: Optional[bool] = None, snapshot_utxo: Optional[bool] = None):
         self.url = url or os.getenv('HYDRA_API_URL', 'ws://localhost:4001')
         # Derive HTTP URL from WS URL
         if self.url.startswith("ws://"):
@@ -22,23 +65,89 @@ class HydraClient:
             self.http_url = self.url # Fallback or already http?
         
         self.connection = None
+        self.history = history
+        self.snapshot_utxo = snapshot_utxo
+        self.greeting: Optional[Greeting] = None
+        self.reconnect = reconnect
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.last_seq: Optional[int] = None  # highest event seq handed to a caller
+        self.reconnects = 0
+        self._closing = False
+        self._reconnect_lock = asyncio.Lock()
+
+    @classmethod
+    def lean(cls, url: str = None, **kwargs) -> "HydraClient":
+        """Client that skips history replay and the greeting UTxO."""
+        return cls(url, history=False, snapshot_utxo=False, **kwargs)
+
+    def _connect_url(self, history: Optional[bool] = None) -> str:
+        params = {}
+        history = self.history if history is None else history
+        if history is not None:
+            params["history"] = "yes" if history else "no"
+        if self.snapshot_utxo is not None:
+            params["snapshot-utxo"] = "yes" if self.snapshot_utxo else "no"
+        return _with_query(self.url, **params) if params else self.url
+
+    async def connect(self, greeting: bool = False) -> Optional[Greeting]:
+        """
+        Establishes a WebSocket connection to the Hydra node.
 
-    async def connect(self):
-        """Establishes a WebSocket connection to the Hydra node."""
+        With greeting=True, reads up to and including the Greetings message
+        (discarding any replayed history before it) and returns it parsed.
+        """
+        url = self._connect_url()
         try:
-            logger.info(f"Connecting to Hydra API at {self.url}")
-            self.connection = await websockets.connect(self.url)
+            logger.info(f"Connecting to Hydra API at {url}")
+            self.connection = await websockets.connect(url)
+            self._closing = False
             logger.info("Connected to Hydra API")
         except Exception as e:
             logger.error(f"Failed to connect to Hydra API: {e}")
             raise
+        if greeting:
+            while (await self.receive_event()).get("tag") != "Greetings":
+                pass
+            return self.greeting
+        return None
 
     async def close(self):
         """Closes the WebSocket connection."""
+        self._closing = True
         if self.connection:
             await self.connection.close()
             logger.info("Disconnected from Hydra API")
 
+    def _replay_url(self) -> str:
+        # Events missed while down are only available as history, so replay
+        # even on lean connections -- unless nothing has been seen yet to resume from
+        if self.history is False and self.last_seq is None:
+            return self._connect_url()
+        return self._connect_url(history=True)
+
+    async def _reconnect(self, dropped):
+        """Re-opens the socket with history replay; `dropped` is the connection that failed."""
+        async with self._reconnect_lock:
+            if self.connection is not dropped:
+                return  # another caller already reconnected
+            delay = self.backoff
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    self.connection = await websockets.connect(self._replay_url())
+                    self.reconnects += 1
+                    logger.info(f"Reconnected to Hydra API (attempt {attempt}), resuming after seq {self.last_seq}")
+                    return
+                except Exception as e:
+                    logger.warning(f"Reconnect attempt {attempt}/{self.max_retries} failed: {e}; retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_backoff)
+            raise Exception(f"Hydra API unreachable after {self.max_retries} reconnect attempts")
+
+    def _can_reconnect(self) -> bool:
+        return self.reconnect and not self._closing
+
     async def send_command(self, command: Dict[str, Any]):
         """Sends a JSON command to the Hydra node."""
         if not self.connection:
@@ -46,17 +155,42 @@ class HydraClient:
         
         message = json.dumps(command)
         logger.debug(f"Sending command: {message}")
-        await self.connection.send(message)
+        while True:
+            connection = self.connection
+            try:
+                await connection.send(message)
+                return
+            except (ConnectionClosed, ConnectionError) as e:
+                if not self._can_reconnect():
+                    raise
+                logger.warning(f"Hydra connection lost while sending ({e}); reconnecting")
+                await self._reconnect(connection)
 
     async def receive_event(self) -> Dict[str, Any]:
-        """Receives the next event from the Hydra node."""
+        """Receives the next event from the Hydra node (each seq at most once, across reconnects)."""
         if not self.connection:
             raise Exception("Not connected to Hydra API")
         
-        response = await self.connection.recv()
-        data = json.loads(response)
-        logger.debug(f"Received event: {data}")
-        return data
+        while True:
+            connection = self.connection
+            try:
+                response = await connection.recv()
+            except (ConnectionClosed, ConnectionError) as e:
+                if not self._can_reconnect():
+                    raise
+                logger.warning(f"Hydra connection lost while receiving ({e}); reconnecting")
+                await self._reconnect(connection)
+                continue
+            data = json.loads(response)
+            seq = data.get("seq") if isinstance(data, dict) else None
+            if seq is not None:
+                if self.last_seq is not None and seq <= self.last_seq:
+                    continue  # replayed after a reconnect; already delivered
+                self.last_seq = seq
+            if isinstance(data, dict) and data.get("tag") == "Greetings":
+                self.greeting = Greeting(data)
+            logger.debug(f"Received event: {data}")
+            return data
 
     async def wait_for_event(self, expected_tag: str, timeout: int = 30) -> Optional[Dict[str, Any]]:
         """Waits for a specific event tag within a timeout period."""
@@ -187,6 +321,15 @@ class HydraClient:
         else:
             logger.error("Failed to fanout Head.")
 
+    async def head_utxo(self, fresh: bool = False) -> Dict[str, Any]:
+        """
+        UTxO set as of the greeting if the node sent one, else (or with
+        fresh=True) fetched via /snapshot only now that it is needed.
+        """
+        if not fresh and self.greeting and self.greeting.snapshot_utxo is not None:
+            return self.greeting.snapshot_utxo
+        return await self.get_utxos()
+
     async def get_utxos(self) -> Dict[str, Any]:
         """Fetches the current UTXO set from the Head via HTTP /snapshot endpoint."""
         snapshot_url = f"{self.http_url}/snapshot"
@@ -0,0 +1,91 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
+import pycardano
+from .protocol_params import FeeModel, fee_model as current_fee_model
+
+logger = logging.getLogger(__name__)
+
+SIGNING_KEY_FILE = os.getenv("CARDANO_SIGNING_KEY", "keys/cardano.sk")
+
+
+@lru_cache(maxsize=None)
+def load_signing_key(path: str = SIGNING_KEY_FILE) -> pycardano.PaymentSigningKey:
+    """Loads a cardano-cli text-envelope signing key once per process."""
+    return pycardano.PaymentSigningKey.load(path)
+
+
+def parse_tx_in(tx_in: str) -> pycardano.TransactionInput:
+    """'TxId#Index' -> TransactionInput."""
+    tx_id, index = tx_in.split("#")
+    return pycardano.TransactionInput(pycardano.TransactionId(bytes.fromhex(tx_id)), int(index))
+
+
+def to_value(value: Dict[str, Any]) -> pycardano.Value:
+    """cardano-cli JSON value ({lovelace, <policy>: {<name hex>: qty}}) -> Value."""
+    assets = {
+        bytes.fromhex(policy): {bytes.fromhex(name): qty for name, qty in names.items()}
+        for policy, names in value.items() if policy != "lovelace"
+    }
+    return pycardano.Value(value.get("lovelace", 0), pycardano.MultiAsset.from_primitive(assets))
+
+
+def sign_tx(tx: pycardano.Transaction, signing_key: pycardano.PaymentSigningKey = None) -> pycardano.Transaction:
+    """
+    Adds our vkey witness over the current body hash. Witnesses already on
+    the tx (e.g. from hydra-node on a drafted commit) are kept.
+    """
+    signing_key = signing_key or load_signing_key()
+    vkey = signing_key.to_verification_key()
+    witness = pycardano.VerificationKeyWitness(vkey, signing_key.sign(tx.transaction_body.hash()))
+    witnesses = [w for w in (tx.transaction_witness_set.vkey_witnesses or []) if w.vkey != vkey]
+    tx.transaction_witness_set.vkey_witnesses = witnesses + [witness]
+    return tx
+
+
+def sign_tx_cbor(cbor_hex: str, signing_key: pycardano.PaymentSigningKey = None) -> Tuple[str, str]:
+    """Signs a serialized tx in memory; returns (signed cbor hex, txid)."""
+    tx = sign_tx(pycardano.Transaction.from_cbor(cbor_hex), signing_key)
+    return tx.to_cbor_hex(), str(tx.id)
+
+
+def build_payment_tx(inputs: Dict[str, Dict[str, Any]], outputs: List[Tuple[str, int]],
+                     change_address: str, signing_key: pycardano.PaymentSigningKey = None,
+                     fees: FeeModel = None) -> pycardano.Transaction:
+    """
+    Builds, balances and signs a pubkey-only payment in memory
+    (the equivalent of `cardano-cli transaction build` + `sign`).
+
+    inputs: cardano-cli UTxO map ("TxId#Ix" -> {address, value, ...}).
+    outputs: [(address, lovelace), ...]; everything else, native assets
+    included, goes to change_address. The fee is the linear fee of the
+    signed tx, so it is exact for the witness count we produce.
+    """
+    signing_key = signing_key or load_signing_key()
+    fees = fees or current_fee_model()
+
+    total_in = pycardano.Value(0)
+    for entry in inputs.values():
+        total_in += to_value(entry["value"])
+    tx_outs = [pycardano.TransactionOutput(pycardano.Address.from_primitive(a), pycardano.Value(amt))
+               for a, amt in outputs]
+    paid = sum(amt for _, amt in outputs)
+    change_addr = pycardano.Address.from_primitive(change_address)
+
+    body = pycardano.TransactionBody(inputs=[parse_tx_in(i) for i in sorted(inputs)], outputs=tx_outs)
+    fee = 0
+    # The fee depends on the tx size, which depends on the fee and change; two or three passes settle it
+    for _ in range(4):
+        change = total_in - pycardano.Value(paid + fee)
+        change_out = pycardano.TransactionOutput(change_addr, change)
+        if change.coin < fees.min_lovelace(len(change_out.to_cbor())):
+            raise Exception(f"Insufficient funds: inputs {total_in.coin}, outputs {paid}, fee {fee}")
+        body.outputs = tx_outs + [change_out]
+        body.fee = fee
+        tx = sign_tx(pycardano.Transaction(body, pycardano.TransactionWitnessSet()), signing_key)
+        needed = fees.min_fee(len(tx.to_cbor()))
+        if needed <= fee:
+            return tx
+        fee = needed
+    raise Exception("Fee did not converge")
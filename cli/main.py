@@ -1,13 +1,16 @@
 import click
 import asyncio
 import logging
-import json
-import subprocess
 import os
 from typing import Dict, Any, List
 from .hydra_client import HydraClient
 from .ogmios_client import OgmiosClient
+from .wallet_state import WalletState
+from .l1_tx import sign_tx_cbor
+from .commit_orchestrator import CommitOrchestrator
+from .head_supervisor import HeadSupervisor, INITIALIZING, CLOSED, FINAL
 from .minting import MintingEngine
+from .cip25 import MetadataTemplate
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -65,36 +68,50 @@ def cli():
     """Hydra Powered Micro-PaaS CLI for NFT Minting"""
     pass
 
+def _head_command(tag: str, until: str, timeout: float, success: str, failure: str):
+    """Sends a lifecycle command through a HeadSupervisor and waits for the head to reach `until`."""
+    async def _run():
+        head = HeadSupervisor(client=HydraClient.lean(), auto_collect=False, auto_fanout=False)
+        try:
+            await head.start()
+            await asyncio.wait_for(head.ready.wait(), timeout=10)
+            await head.command(tag, until=until, timeout=timeout)
+            logger.info(success)
+        except asyncio.TimeoutError:
+            logger.error(f"{failure}: no {until} state within {timeout}s")
+        except Exception as e:
+            logger.error(f"{failure}: {e}")
+        finally:
+            await head.stop()
+
+    asyncio.run(_run())
+
 @cli.command()
 @click.option('--network', default='preprod', help='Cardano network to use')
 def init(network):
     """Initialize a new Hydra Head"""
     click.echo(f"Initializing Hydra Head on {network}...")
-    
-    async def _init():
-        client = HydraClient()
-        try:
-            await client.connect()
-            await client.init_head()
-        except Exception as e:
-            logger.error(f"Error initializing head: {e}")
-        finally:
-            await client.close()
-
-    asyncio.run(_init())
+    _head_command("Init", INITIALIZING, 120, "Head is initializing.", "Error initializing head")
 
 @cli.command()
 @click.argument('address')
-def fund(address):
+@click.option('--head', 'heads', multiple=True,
+              help='Hydra node API URL to commit to; repeat to bring up several heads in parallel')
+def fund(address, heads):
     """Fund the Hydra Head (single-party manual balance)."""
+    if heads:
+        asyncio.run(_fund_heads(address, list(heads)))
+        return
+
     async def _fund():
         ogmios = OgmiosClient()
         try:
             logger.info(f"Funding Hydra Head with funds from {address}...")
             await ogmios.connect()
             
-            # 1. Get UTXOs
-            utxos = await ogmios.query_utxo(address)
+            # 1. Get UTXOs (shared L1 wallet view: one batched Ogmios query)
+            wallet = WalletState(ogmios)
+            utxos = await wallet.utxos_for(address)
             if not utxos:
                  click.echo("No UTXOs found.")
                  return
@@ -174,38 +191,17 @@ def fund(address):
                 logger.error(f"Failed to balance transaction: {e}")
                 return
 
-            # Save balanced CBOR
-            import json
-            with open("keys/commit.balanced.cbor", "w") as f:
-                 json.dump({"type": "Tx ConwayEra", "description": "", "cborHex": balanced_cbor}, f)
-            
-            # 4. Sign and Submit
-            import subprocess
+            # 4. Sign in memory and submit through Ogmios (one round-trip, no temp files)
             logger.info("Signing commit transaction...")
-            
-            cmd_sign = [
-                "docker", "compose", "exec", "cardano-node",
-                "cardano-cli", "conway", "transaction", "sign",
-                "--tx-body-file", "/keys/commit.balanced.cbor",
-                "--signing-key-file", "/keys/cardano.sk",
-                "--testnet-magic", "1",
-                "--out-file", "/keys/commit.signed"
-            ]
-            subprocess.run(cmd_sign, check=True)
-            
+            signed_cbor, txid = sign_tx_cbor(balanced_cbor)
+
             logger.info("Submitting commit transaction...")
-            cmd_submit = [
-                "docker", "compose", "exec", "cardano-node",
-                "cardano-cli", "conway", "transaction", "submit",
-                "--tx-file", "/keys/commit.signed",
-                "--testnet-magic", "1",
-                "--socket-path", "/ipc/node.socket"
-            ]
-            res_submit = subprocess.run(cmd_submit, capture_output=True, text=True)
-            if res_submit.returncode != 0:
-                logger.error(f"Submit failed: {res_submit.stderr}")
+            try:
+                txid = await ogmios.submit_transaction(signed_cbor)
+            except Exception as e:
+                logger.error(f"Submit failed: {e}")
             else:
-                logger.info(f"Commit transaction submitted successfully! Output: {res_submit.stdout}")
+                logger.info(f"Commit transaction submitted successfully! TxId: {txid}")
 
         except Exception as e:
             logger.error(f"Error funding head: {e}")
@@ -214,62 +210,64 @@ def fund(address):
 
     asyncio.run(_fund())
 
+async def _fund_heads(address: str, heads: List[str]):
+    """Commits to every head concurrently and follows each one until it is open."""
+    ogmios = OgmiosClient()
+    try:
+        logger.info(f"Funding {len(heads)} Hydra Heads with funds from {address}...")
+        await ogmios.connect()
+        results = await CommitOrchestrator(ogmios, heads, address).run()
+        for r in results:
+            line = f"{r.url}: {r.status}"
+            if r.txid:
+                line += f" (commit {r.txid})"
+            if r.error:
+                line += f" - {r.error}"
+            click.echo(line)
+    except Exception as e:
+        logger.error(f"Error funding heads: {e}")
+    finally:
+        await ogmios.close()
+
 
 
 @cli.command()
 def close():
     """Close the Hydra Head"""
     click.echo("Closing Hydra Head...")
-    async def _close():
-        client = HydraClient()
-        try:
-            await client.connect()
-            await client.close_head()
-            # await client.fanout_head() # Optional: auto-fanout
-        except Exception as e:
-            logger.error(f"Error closing head: {e}")
-        finally:
-            await client.close()
-
-    asyncio.run(_close())
+    _head_command("Close", CLOSED, 120, "Head closed; fanout is possible after the contestation deadline.",
+                  "Error closing head")
 
 @cli.command()
 def abort():
     """Abort the Hydra Head"""
     click.echo("Aborting Hydra Head...")
-    async def _abort():
-        client = HydraClient()
-        try:
-            await client.connect()
-            await client.send_command({"tag": "Abort"})
-            event = await client.wait_for_event("HeadIsAborted")
-            if event:
-                logger.info("Head aborted successfully!")
-        except Exception as e:
-            logger.error(f"Error aborting head: {e}")
-        finally:
-            await client.close()
-
-    asyncio.run(_abort())
+    _head_command("Abort", FINAL, 120, "Head aborted successfully!", "Error aborting head")
 
 @cli.command()
 def fanout():
     """Fanout funds from a Closed Hydra Head."""
     click.echo("Fanning out funds...")
-    async def _fanout():
-        client = HydraClient()
+    _head_command("Fanout", FINAL, 300, "Head finalized! Funds returned to L1.", "Error fanning out")
+
+@cli.command()
+def status():
+    """Show the Hydra Head lifecycle state."""
+    async def _status():
+        head = HeadSupervisor(client=HydraClient.lean(), auto_collect=False, auto_fanout=False)
         try:
-            await client.connect()
-            await client.send_command({"tag": "Fanout"})
-            event = await client.wait_for_event("HeadIsFinalized")
-            if event:
-                logger.info("Head finalized! Funds returned to L1.")
-        except Exception as e:
-            logger.error(f"Error fanning out: {e}")
+            await head.start()
+            await asyncio.wait_for(head.ready.wait(), timeout=10)
+            snap = head.snapshot()
+            click.echo(f"Head {snap['headId'] or '-'}: {snap['state']}")
+            if snap['contestationDeadline']:
+                click.echo(f"Contestation deadline: {snap['contestationDeadline']}")
+        except asyncio.TimeoutError:
+            logger.error("Hydra node did not greet us within 10s")
         finally:
-            await client.close()
+            await head.stop()
 
-    asyncio.run(_fanout())
+    asyncio.run(_status())
 
 @cli.command()
 @click.option('--asset-name', default="HydraNFT", help="Name prefix for assets")
@@ -277,7 +275,15 @@ def fanout():
 @click.option('--batch-size', default=1, help="Assets per transaction (Batching)")
 @click.option('--unique', is_flag=True, help="Mint unique assets (asset_name_{i})")
 @click.option('--workers', default=4, help="Number of parallel workers (Turbo mode)")
-def mint(asset_name, quantity, batch_size, unique, workers):
+@click.option('--manifest', type=click.Path(exists=True, dir_okay=False),
+              help="CSV/JSONL collection manifest (one row per asset: name, image, attributes, recipient); "
+                   "replaces --quantity")
+@click.option('--template', type=click.Path(exists=True, dir_okay=False),
+              help="JSON CIP-25 template with {placeholders} filled from the manifest columns "
+                   "(default: the rows' own name/image/attributes/... fields)")
+@click.option('--index', 'index_path', type=click.Path(dir_okay=False),
+              help="On-disk dedup index for --manifest (default: <manifest>.index.sqlite)")
+def mint(asset_name, quantity, batch_size, unique, workers, manifest, template, index_path):
     """Mint NFTs inside the Hydra Head."""
     async def _mint():
         client = HydraClient()
@@ -285,7 +291,12 @@ def mint(asset_name, quantity, batch_size, unique, workers):
             await client.connect()
             engine = MintingEngine(client)
             
-            if unique:
+            if manifest:
+                # Collection drop: validated + deduplicated into an index, then minted by the turbo workers
+                await engine.mint_parallel(asset_name, batch_size=batch_size, workers=workers, manifest=manifest,
+                                           template=MetadataTemplate.load(template) if template else None,
+                                           index_path=index_path)
+            elif unique:
                 # Use parallel engine (Turbo Mode)
                 # workers=1 is equivalent to old serial batching but using new logic
                 # workers>1 is Turbo
@@ -0,0 +1,164 @@
+"""
+Collection manifest ingestion for large NFT drops.
+
+ManifestIndex.ingest() makes one streaming pass over a CSV/JSONL manifest:
+each row is validated (asset name, recipient address, metadata) and
+deduplicated by name against an on-disk SQLite index, which then holds the
+accepted rows in manifest order. Mint workers read back their own
+contiguous slice of the index, so neither step holds the collection in
+memory and a million-row drop costs a file, not RAM.
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pycardano
+from .cip25 import Asset, MetadataTemplate, RowMetadata, manifest_rows
+
+logger = logging.getLogger(__name__)
+
+MAX_ASSET_NAME_BYTES = 32
+PROGRESS_EVERY = 100_000
+COMMIT_EVERY = 10_000
+MAX_ERROR_SAMPLES = 20
+
+
+class ManifestStats:
+    def __init__(self):
+        self.rows = 0
+        self.accepted = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.errors: List[str] = []  # the first MAX_ERROR_SAMPLES problems, for the report
+
+    def reject(self, number: int, reason: str, duplicate: bool = False):
+        if duplicate:
+            self.duplicates += 1
+        else:
+            self.invalid += 1
+        if len(self.errors) < MAX_ERROR_SAMPLES:
+            self.errors.append(f"row {number}: {reason}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"rows": self.rows, "accepted": self.accepted, "invalid": self.invalid,
+                "duplicates": self.duplicates, "errors": self.errors}
+
+
+def validate_row(row: Any, template: MetadataTemplate = None) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Returns (error, None) or (None, normalized fields) for one manifest row.
+    The row's metadata is encoded with the `template` the mint will use
+    (the row's own CIP-25 fields by default), so a missing placeholder
+    value is caught here rather than mid-mint.
+    """
+    if not isinstance(row, dict):
+        return "not a JSON object", None
+    name = row.get("name")
+    if not isinstance(name, str) or not name:
+        return "missing 'name'", None
+    if len(name.encode()) > MAX_ASSET_NAME_BYTES:
+        return f"asset name {name!r} is longer than {MAX_ASSET_NAME_BYTES} bytes", None
+    fields = {k: v for k, v in row.items() if v not in (None, "")}
+
+    attributes = fields.get("attributes")
+    if isinstance(attributes, str):
+        # CSV cells carry attributes as a JSON object
+        try:
+            fields["attributes"] = json.loads(attributes)
+        except ValueError:
+            return "attributes is not valid JSON", None
+
+    recipient = fields.get("recipient")
+    if recipient is not None:
+        try:
+            pycardano.Address.from_primitive(recipient)
+        except Exception:
+            return f"invalid recipient address {recipient!r}", None
+
+    try:
+        (template or RowMetadata()).encode_asset(name, fields)
+    except ValueError as e:
+        return str(e), None
+    return None, fields
+
+
+class ManifestIndex:
+    def __init__(self, path: str):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def ingest(self, manifest: str, template: MetadataTemplate = None) -> ManifestStats:
+        """Validates (against `template`) and deduplicates `manifest` into a fresh index; returns the counts."""
+        stats = ManifestStats()
+        template = template or RowMetadata()
+        started = time.monotonic()
+        db = self._connect()
+        try:
+            db.execute("DROP TABLE IF EXISTS assets")
+            db.execute("CREATE TABLE assets (seq INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, fields TEXT)")
+            for number, row in enumerate(manifest_rows(manifest), 1):
+                stats.rows = number
+                error, fields = validate_row(row, template)
+                if error:
+                    stats.reject(number, error)
+                else:
+                    inserted = db.execute("INSERT OR IGNORE INTO assets VALUES (?, ?, ?)",
+                                          (stats.accepted, fields["name"], json.dumps(fields))).rowcount
+                    if inserted:
+                        stats.accepted += 1
+                    else:
+                        stats.reject(number, f"duplicate asset name {fields['name']!r}", duplicate=True)
+                if number % COMMIT_EVERY == 0:
+                    db.commit()
+                if number % PROGRESS_EVERY == 0:
+                    logger.info(f"Manifest: {number} rows read ({number / (time.monotonic() - started):.0f}/s), "
+                                f"{stats.accepted} accepted, {stats.invalid} invalid, {stats.duplicates} duplicates")
+            db.commit()
+        finally:
+            db.close()
+        logger.info(f"Manifest {os.path.basename(manifest)}: {stats.accepted}/{stats.rows} rows accepted "
+                    f"({stats.invalid} invalid, {stats.duplicates} duplicates) in {time.monotonic() - started:.1f}s")
+        return stats
+
+    def __len__(self) -> int:
+        db = self._connect()
+        try:
+            return db.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+        finally:
+            db.close()
+
+    def rows(self, start: int = 0, stop: int = None) -> Iterator[Asset]:
+        """(name, fields) for index positions [start, stop), streamed; safe to call from worker threads."""
+        db = self._connect()
+        try:
+            cursor = db.execute("SELECT name, fields FROM assets WHERE seq >= ? AND seq < ? ORDER BY seq",
+                                (start, stop if stop is not None else 2 ** 62))
+            while True:
+                chunk = cursor.fetchmany(1000)
+                if not chunk:
+                    return
+                for name, fields in chunk:
+                    yield name, json.loads(fields)
+        finally:
+            db.close()
+
+
+def partition(count: int, workers: int, batch_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits [0, count) into one contiguous range per worker, on batch
+    boundaries so only the last batch of each chain can be short.
+    """
+    batches = (count + batch_size - 1) // batch_size
+    ranges = []
+    for w in range(workers):
+        first = batches * w // workers
+        last = batches * (w + 1) // workers
+        ranges.append((min(first * batch_size, count), min(last * batch_size, count)))
+    return ranges
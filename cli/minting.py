@@ -2,9 +2,13 @@ import subprocess
 import json
 import logging
 import asyncio
-import os
-from typing import Dict, Any, List
+import math
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from .cip25 import Asset, MetadataTemplate, RowMetadata, batched, encode_value
+from .manifest import ManifestIndex, partition
 from .hydra_client import HydraClient
+from .protocol_params import ADA_ONLY_OUTPUT_SIZE, fee_model
+from .signer import TxSigner, tx_id
 
 logger = logging.getLogger(__name__)
 
@@ -12,10 +16,97 @@ POLICY_ID = "b7d525b149829894aa5fa73087d7758c2163c55520c8715652cb8515"
 SCRIPT_FILE = "/keys/policy.script"
 SK_FILE = "/keys/cardano.sk"
 MAGIC = 1
+# Body/witness bytes of a mint tx besides the asset output, mint field and metadata
+MINT_TX_OVERHEAD = 400
+# Progress line every this many submitted txs in mint_parallel
+SUBMIT_PROGRESS_EVERY = 500
+# Headroom under maxTxSize for what pack_batches' size estimate leaves out (witnesses, CBOR framing)
+TX_SIZE_MARGIN = 1024
+
+
+def mint_costs(asset_names: List[str], metadata_bytes: int = 0,
+               fee_floor: int = 0, min_utxo_floor: int = 0):
+    """
+    (fee, min_utxo) for a mint tx that puts asset_names in one output, from the
+    shared protocol-parameter fee model. The flat amounts the mint paths used
+    to hardcode are kept as floors; the model only raises them for batches
+    big enough to need more.
+    """
+    fees = fee_model()
+    output_size = fees.asset_output_size(asset_names)
+    min_utxo = max(min_utxo_floor, fees.min_lovelace(output_size))
+    # Asset names appear twice: in the output and in the mint field
+    tx_size = MINT_TX_OVERHEAD + 2 * output_size + metadata_bytes
+    fee = max(fee_floor, fees.min_fee(tx_size))
+    return fee, min_utxo
+
+def _mint_str(names: List[str]) -> str:
+    return "+".join(f"1 {POLICY_ID}.{name.encode('utf-8').hex()}" for name in names)
+
+
+def plan_mint(batch: List[Asset], address: str, template: MetadataTemplate = None,
+              fee_floor: int = 0, min_utxo_floor: int = 0):
+    """
+    Outputs and fee for one mint tx. Assets whose row names a `recipient`
+    are minted straight to it (one output per recipient); the rest go to
+    `address`, whose output keeps the min_utxo_floor. Returns
+    ([(address, lovelace, asset names)], fee, metadata cbor).
+    """
+    fees = fee_model()
+    groups: Dict[str, List[str]] = {}
+    for name, fields in batch:
+        groups.setdefault(fields.get("recipient") or address, []).append(name)
+    metadata = template.encode_batch(POLICY_ID, batch) if template else b""
+    outputs, outputs_size = [], 0
+    for recipient, names in groups.items():
+        size = fees.asset_output_size(names)
+        floor = min_utxo_floor if recipient == address else 0
+        outputs.append((recipient, max(floor, fees.min_lovelace(size)), names))
+        outputs_size += size
+    # The mint field lists every asset once more
+    tx_size = MINT_TX_OVERHEAD + outputs_size + fees.asset_output_size(name for name, _ in batch) + len(metadata)
+    return outputs, max(fee_floor, fees.min_fee(tx_size)), metadata
+
+
+def pack_batches(assets: Iterable[Asset], batch_size: int, template: MetadataTemplate = None,
+                 max_tx_size: int = None) -> Iterator[List[Asset]]:
+    """
+    Groups assets into mint txs of up to batch_size assets, closing a tx
+    early when its estimated size (mint field, one output per recipient,
+    metadata) would pass max_tx_size. Without recipients or metadata this
+    is plain batching.
+    """
+    limit = (max_tx_size or fee_model().max_tx_size) - TX_SIZE_MARGIN
+    base = MINT_TX_OVERHEAD + ADA_ONLY_OUTPUT_SIZE  # inputs, witness, fuel output
+    batch, recipients, size = [], set(), base
+    for name, fields in assets:
+        recipient = fields.get("recipient")
+        added = 2 * (len(name.encode("utf-8")) + 3)  # in the mint field and in an output
+        if template:
+            added += len(encode_value(name)) + len(template.encode_asset(name, fields))
+        new_output = 0 if recipient in recipients else ADA_ONLY_OUTPUT_SIZE + 3 + 31  # with the policy id
+        if batch and (len(batch) >= batch_size or size + added + new_output > limit):
+            yield batch
+            batch, recipients, size = [], set(), base
+            new_output = ADA_ONLY_OUTPUT_SIZE + 3 + 31
+        batch.append((name, fields))
+        recipients.add(recipient)
+        size += added + new_output
+    if batch:
+        yield batch
+
 
 class MintingEngine:
-    def __init__(self, hydra_client: HydraClient):
+    def __init__(self, hydra_client: HydraClient, signer: TxSigner = None):
         self.client = hydra_client
+        self._signer = signer
+
+    @property
+    def signer(self) -> TxSigner:
+        """Signs turbo mint chains in-process; loads the key file on first use."""
+        if self._signer is None:
+            self._signer = TxSigner()
+        return self._signer
 
     async def mint_nft(self, asset_name: str = "HydraNFT", quantity: int = 1):
         """
@@ -117,25 +208,40 @@ class MintingEngine:
         return raw_output
 
     def _generate_metadata(self, assets: List[str]) -> Dict[str, Any]:
-        """Generates CIP-25 metadata for the batch."""
-        metadata_policy = {}
-        
-        for asset_name in assets:
-            metadata_policy[asset_name] = {
-                "name": asset_name,
-                "image": "ipfs://QmPlaceholder",
-                "mediaType": "image/png",
-                "description": f"Hydra Powered NFT {asset_name}"
-            }
-        return {"721": {POLICY_ID: metadata_policy}}
-
-    async def mint_batch_unique(self, prefix: str, count: int, batch_size: int = 50):
+        """CIP-25 metadata for the batch as a dict (the JSON view of the default template)."""
+        template = MetadataTemplate()
+        return {"721": {POLICY_ID: {name: template.render(name) for name in assets}}}
+
+    async def mint_batch_unique(self, prefix: str, count: Optional[int], batch_size: int = 50,
+                                manifest: str = None, template: MetadataTemplate = None, index_path: str = None):
         """
         Mints 'count' NFTs in 'batch_size' chunks using Transaction Chaining.
         Splits assets into multiple outputs to avoid maxValueSize limits.
+
+        Assets are named f"{prefix}_{i}", or streamed from a CSV/JSONL
+        `manifest` (count then caps how many rows are minted; None for all).
+        The manifest is validated against `template` and deduplicated into
+        an on-disk index first, as in mint_parallel, so a bad row is reported
+        and skipped instead of stopping the drop after some batches went out.
+        Each batch's CIP-25 metadata is encoded to CBOR from `template` and
+        piped to cardano-cli on stdin, so no metadata file is written.
         """
-        total_batches = (count + batch_size - 1) // batch_size
-        logger.info(f"Starting CHAINED batch mint of {count} assets (Batch Size: {batch_size})...")
+        template = template or MetadataTemplate()
+        if manifest:
+            index = ManifestIndex(index_path or f"{manifest}.index.sqlite")
+            stats = await asyncio.to_thread(index.ingest, manifest, template)
+            for error in stats.errors:
+                logger.warning(f"  Manifest {error}")
+            if not stats.accepted:
+                logger.error("Manifest has no valid rows. Aborting.")
+                return
+            count = min(count, stats.accepted) if count else stats.accepted
+            assets = index.rows(0, count)
+            logger.info(f"Starting CHAINED batch mint from {manifest} (Batch Size: {batch_size})...")
+        else:
+            assets = ((f"{prefix}_{i}", {}) for i in range(count))
+            logger.info(f"Starting CHAINED batch mint of {count} assets (Batch Size: {batch_size})...")
+        total_batches = (count + batch_size - 1) // batch_size if count else "?"
         
         # 1. Get Initial UTXO
         utxos = await self.client.get_utxos()
@@ -165,40 +271,25 @@ class MintingEngine:
         # State tracking
         prev_tx_id = tx_id
         prev_output_indices = [tx_ix]
-        
-        # Ensure metadata dir exists
-        subprocess.run(["mkdir", "-p", "/tmp/metadata"], check=False)
 
-        for b in range(total_batches):
-            batch_start_index = b * batch_size
-            current_batch_count = min(batch_size, count - batch_start_index)
-            
-            # Prepare Assets
-            assets = []
-            for i in range(current_batch_count):
-                asset_name = f"{prefix}_{batch_start_index + i}"
-                assets.append(asset_name)
-
-            # Generate Metadata
-            metadata_json = self._generate_metadata(assets)
-            metadata_filename = f"metadata_batch_{b}.json"
-            metadata_host_path = os.path.abspath(f"keys/{metadata_filename}")
-            metadata_container_path = f"/keys/{metadata_filename}"
-            with open(metadata_host_path, "w") as f:
-                json.dump(metadata_json, f)
+        for b, batch in enumerate(batched(assets, batch_size)):
+            assets_in_batch = [name for name, _ in batch]
+
+            # CIP-25 metadata, encoded once and handed to cardano-cli as CBOR on stdin
+            metadata_cbor = template.encode_batch(POLICY_ID, batch)
 
             # Prepare Mint String (All 500 assets in one go)
             mint_entries = []
-            for name in assets:
+            for name in assets_in_batch:
                 name_hex = name.encode("utf-8").hex()
                 mint_entries.append(f"1 {POLICY_ID}.{name_hex}")
             full_mint_str = "+".join(mint_entries)
 
             logger.info(f"Building Batch {b+1}/{total_batches} (Input Tx: {prev_tx_id}, Outputs: {len(prev_output_indices)} -> 2)...")
 
-            # Build Tx Args
+            # Build Tx Args (-i: the metadata arrives on stdin)
             cmd_build = [
-                "docker", "exec", "hydra-paas-cardano-node-1",
+                "docker", "exec", "-i", "hydra-paas-cardano-node-1",
                 "cardano-cli", "latest", "transaction", "build-raw"
             ]
             
@@ -207,9 +298,9 @@ class MintingEngine:
             for inp in current_input_list:
                 cmd_build.extend(["--tx-in", inp])
 
-            # Fee logic: 8 ADA fixed
-            fee = 8000000
-            min_utxo = 15000000 # 15 ADA to cover ~50-100 assets in output
+            # Fee logic: 8 ADA / 15 ADA floors, raised by the fee model for larger batches
+            fee, min_utxo = mint_costs(assets_in_batch, len(metadata_cbor),
+                                       fee_floor=8_000_000, min_utxo_floor=15_000_000)
             
             # Check funds
             # We need fee + min_utxo. Remainder stays as fuel.
@@ -235,8 +326,7 @@ class MintingEngine:
             cmd_build.extend([
                 "--mint", full_mint_str,
                 "--mint-script-file", SCRIPT_FILE,
-                "--metadata-json-file", metadata_container_path,
-                "--protocol-params-file", "/params/protocol-parameters.json",
+                "--metadata-cbor-file", "/dev/stdin",
                 "--fee", str(fee),
                 "--invalid-hereafter", "200000000",
                 "--out-file", f"/tmp/tx_batch_{b}.raw"
@@ -244,7 +334,7 @@ class MintingEngine:
 
             # Build and Sign
             try:
-                subprocess.run(cmd_build, check=True, capture_output=True)
+                subprocess.run(cmd_build, input=metadata_cbor, check=True, capture_output=True)
                 
                 cmd_sign = [
                     "docker", "exec", "hydra-paas-cardano-node-1",
@@ -328,7 +418,8 @@ class MintingEngine:
             cmd_build.extend(["--tx-out", f"{address}+{amount_per_part}"])
             
         # Change (remainder)
-        fee_est = 200_000 * parts
+        # Generous size bound: one input, parts+1 ADA-only outputs, a witness
+        fee_est = fee_model().min_fee(MINT_TX_OVERHEAD + 70 * (parts + 1))
         change = val - (amount_per_part * parts) - fee_est
         cmd_build.extend(["--tx-out", f"{address}+{change}"])
         
@@ -379,14 +470,22 @@ class MintingEngine:
             return []
 
     def _build_chain(self, worker_id: int, initial_utxo: Dict, 
-                    prefix: str, count: int, batch_size: int) -> List[Dict]:
+                    prefix: str, count: int, batch_size: int,
+                    assets: Iterable[Asset] = None, template: MetadataTemplate = None) -> List[Tuple[Dict, str, int]]:
         """
         Worker function to build a chain of transactions.
         Executed in a separate thread to allow parallelism.
+        cardano-cli only builds the bodies; each next input comes from the
+        previous body's hash, and the chain is signed in one batch at the end.
+        `assets` (e.g. this worker's slice of a manifest index) replaces the
+        generated prefix names; with `template` each tx carries CIP-25 metadata.
+        Returns [(signed tx envelope, txid, NFTs minted by the tx)] in chain order.
         """
-        import time
-        built_txs = []
+        unsigned = []
         total_batches = (count + batch_size - 1) // batch_size
+        if assets is None:
+            # Unique name: prefix_{index}; the caller passes a unique prefix per worker
+            assets = ((f"{prefix}_{i:05d}", {}) for i in range(count))
         
         prev_tx_id = initial_utxo['tx_id']
         prev_tx_ix = initial_utxo['index']
@@ -395,125 +494,123 @@ class MintingEngine:
         
         logger.info(f"[Worker {worker_id}] Starting chain: {count} NFTs in {total_batches} batches")
         
-        for b in range(total_batches):
-            logger.info(f"[Worker {worker_id}] Building batch {b}/{total_batches}, fuel={current_lovelace/1e6:.1f} ADA")
-            batch_start_index = b * batch_size
-            current_batch_count = min(batch_size, count - batch_start_index)
-            
-            # Assets
-            assets = []
-            for i in range(current_batch_count):
-                # Unique name: prefix_W{worker}_B{batch}_I{index}
-                # using global index to keep it clean: prefix_{global_index}
-                # We need to know global offset if strictly contiguous, but for speed 
-                # we can use worker-based suffixing or ensure caller handles offset.
-                # Here we assume caller passed a unique prefix per worker or handled offset logic.
-                asset_name = f"{prefix}_{batch_start_index + i:05d}"
-                assets.append(asset_name)
-            
-            mint_entries = [f"1 {POLICY_ID}.{name.encode('utf-8').hex()}" for name in assets]
-            full_mint_str = "+".join(mint_entries)
-            
-            # Fees
-            fee = 1_000_000 # Increased to 1 ADA to be safe
-            min_utxo = 10_000_000  # 10 ADA for 50 NFT output (safer for ledger checks)
-            remaining_fuel = current_lovelace - fee - min_utxo
-            
-            if remaining_fuel < 1_000_000:
-                logger.error(f"[Worker {worker_id}] Out of fuel at batch {b}")
-                break
-                
-            # Build Raw
-            # Note: Parallel docker execs might race on /tmp files if we don't unique them.
-            # Use unique filenames for this worker/batch.
-            raw_file = f"/tmp/w{worker_id}_b{b}.raw"
-            signed_file = f"/tmp/w{worker_id}_b{b}.signed"
-
-            cmd_build = [
-                "docker", "exec", "hydra-paas-cardano-node-1",
-                "cardano-cli", "latest", "transaction", "build-raw",
-                "--tx-in", f"{prev_tx_id}#{prev_tx_ix}",
-                "--tx-out", f"{address}+{min_utxo}+{full_mint_str}",
-                "--tx-out", f"{address}+{remaining_fuel}",
-                "--mint", full_mint_str,
-                "--mint-script-file", SCRIPT_FILE,
-                "--protocol-params-file", "/params/protocol-parameters.json",
-                "--fee", str(fee),
-                "--invalid-hereafter", "200000000",
-                "--out-file", raw_file
-            ]
+        # The batches are packed lazily from the asset rows, so packing can fail mid-chain too
+        try:
+            for b, batch in enumerate(pack_batches(assets, batch_size, template)):
+                logger.info(f"[Worker {worker_id}] Building batch {b}/{total_batches}, fuel={current_lovelace/1e6:.1f} ADA")
+                # Rows with a recipient are minted straight to it; the rest stay at our address.
+                # Fees (1 ADA / 10 ADA floors, raised by the fee model for larger batches)
+                outputs, fee, metadata_cbor = plan_mint(batch, address, template,
+                                                        fee_floor=1_000_000, min_utxo_floor=10_000_000)
+                remaining_fuel = current_lovelace - fee - sum(lovelace for _, lovelace, _ in outputs)
             
-            try:
-                subprocess.run(cmd_build, check=True, capture_output=True)
+                if remaining_fuel < 1_000_000:
+                    logger.error(f"[Worker {worker_id}] Out of fuel at batch {b}")
+                    break
                 
-                # Sign
-                cmd_sign = [
-                    "docker", "exec", "hydra-paas-cardano-node-1",
-                    "cardano-cli", "latest", "transaction", "sign",
-                    "--tx-body-file", raw_file,
-                    "--signing-key-file", SK_FILE,
-                    "--testnet-magic", str(MAGIC),
-                    "--out-file", signed_file
+                # Build Raw (the text envelope comes back on stdout, no temp files to race on)
+                cmd_build = [
+                    "docker", "exec", *(["-i"] if metadata_cbor else []), "hydra-paas-cardano-node-1",
+                    "cardano-cli", "latest", "transaction", "build-raw",
+                    "--tx-in", f"{prev_tx_id}#{prev_tx_ix}",
+                    *[arg for recipient, lovelace, names in outputs
+                      for arg in ("--tx-out", f"{recipient}+{lovelace}+{_mint_str(names)}")],
+                    # Fuel change goes last, after the asset outputs
+                    "--tx-out", f"{address}+{remaining_fuel}",
+                    "--mint", _mint_str([name for name, _ in batch]),
+                    "--mint-script-file", SCRIPT_FILE,
+                    "--fee", str(fee),
+                    "--invalid-hereafter", "200000000",
+                    "--out-file", "/dev/stdout"
                 ]
-                subprocess.run(cmd_sign, check=True, capture_output=True)
-                
-                # Get TxId (cardano-cli latest returns JSON: {"txhash": "hex..."})
-                cmd_txid = ["docker", "exec", "hydra-paas-cardano-node-1", "cardano-cli", "latest", "transaction", "txid", "--tx-file", signed_file]
-                res_txid = subprocess.run(cmd_txid, check=True, capture_output=True, text=True)
-                raw_txid = res_txid.stdout.strip()
-                # Parse JSON if present, otherwise use raw
-                import re
-                if raw_txid.startswith('{'):
-                    txid_data = json.loads(raw_txid)
-                    new_tx_id = txid_data.get('txhash', txid_data.get('transaction', ''))
-                else:
-                    # Fallback: extract 64-char hex string
-                    m = re.search(r'[a-fA-F0-9]{64}', raw_txid)
-                    new_tx_id = m.group(0) if m else raw_txid
-                
-                # Read JSON
-                cmd_cat = ["docker", "exec", "hydra-paas-cardano-node-1", "cat", signed_file]
-                res_cat = subprocess.run(cmd_cat, capture_output=True, text=True, check=True)
-                tx_json = json.loads(res_cat.stdout)
-                
-                built_txs.append(tx_json)
-                
-                prev_tx_id = new_tx_id
-                prev_tx_ix = 1
-                current_lovelace = remaining_fuel
+                if metadata_cbor:
+                    # Metadata goes in on stdin, as in mint_batch_unique
+                    cmd_build.extend(["--metadata-cbor-file", "/dev/stdin"])
+            
+                try:
+                    res_build = subprocess.run(cmd_build, input=metadata_cbor or None, check=True, capture_output=True)
+                    envelope = json.loads(res_build.stdout)
+                    tx_cbor = bytes.fromhex(envelope["cborHex"])
+                    unsigned.append((envelope.get("type", "Tx ConwayEra"), tx_cbor, len(batch)))
+                    new_tx_id = tx_id(tx_cbor)
                 
-            except subprocess.CalledProcessError as e:
-                stderr = e.stderr.decode() if e.stderr else "no stderr"
-                logger.error(f"[Worker {worker_id}] Build failed at batch {b}: {stderr[:500]}")
-                break
-            except Exception as e:
-                logger.error(f"[Worker {worker_id}] Build failed at batch {b}: {e}")
-                break
+                    prev_tx_id = new_tx_id
+                    prev_tx_ix = len(outputs)
+                    current_lovelace = remaining_fuel
                 
+                except subprocess.CalledProcessError as e:
+                    stderr = e.stderr.decode() if e.stderr else "no stderr"
+                    logger.error(f"[Worker {worker_id}] Build failed at batch {b}: {stderr[:500]}")
+                    break
+                except Exception as e:
+                    logger.error(f"[Worker {worker_id}] Build failed at batch {b}: {e}")
+                    break
+        except Exception as e:
+            logger.error(f"[Worker {worker_id}] Chain failed after {len(unsigned)} txs: {e}")
+            return []
+
+        try:
+            signed = self.signer.sign_many(tx for _, tx, _ in unsigned)
+        except Exception as e:
+            logger.error(f"[Worker {worker_id}] Signing failed: {e}")
+            return []
+        built_txs = [({"type": tx_type.replace("Unwitnessed", "Witnessed"), "description": "", "cborHex": tx.hex()},
+                      txid, nfts)
+                     for (tx_type, _, nfts), (tx, txid) in zip(unsigned, signed)]
         logger.info(f"[Worker {worker_id}] Built {len(built_txs)} transactions.")
         return built_txs
 
-    async def mint_parallel(self, prefix: str, total_count: int = 10000, batch_size: int = 100, workers: int = 4):
+    async def mint_parallel(self, prefix: str, total_count: int = 10000, batch_size: int = 100, workers: int = 4,
+                            manifest: str = None, template: MetadataTemplate = None, index_path: str = None):
         """
         Parallel Minting Engine.
+        0. With a manifest: validates and deduplicates it into an on-disk
+           index (index_path, default <manifest>.index.sqlite) and gives each
+           worker a contiguous slice of it; metadata comes from each row
+           unless a template is given.
         1. Splits funds into 'workers' parts.
         2. Spawns 'workers' threads to build transaction chains concurrently.
         3. Submits all transactions (interleaved or sequential per chain).
         """
         import time
         from concurrent.futures import ThreadPoolExecutor
+
+        index = None
+        if manifest:
+            # Rows are checked against the template the workers will encode with, before any funds move
+            template = template or RowMetadata()
+            index = ManifestIndex(index_path or f"{manifest}.index.sqlite")
+            stats = await asyncio.to_thread(index.ingest, manifest, template)
+            for error in stats.errors:
+                logger.warning(f"  Manifest {error}")
+            total_count = stats.accepted
+            if not total_count:
+                logger.error("Manifest has no valid rows. Aborting.")
+                return 0, 0
+            ranges = partition(total_count, workers, batch_size)
+        else:
+            per_worker_count = total_count // workers
+            ranges = [(w * per_worker_count, (w + 1) * per_worker_count) for w in range(workers)]
         
         logger.info(f"🚀 PARALLEL MINT: {total_count} NFTs | {workers} Workers | {batch_size} Batch Size")
         
         # 1. Calculate requirements
-        per_worker_count = total_count // workers
-        batches_per_worker = (per_worker_count + batch_size - 1) // batch_size
-        
-        # Cost per batch = fee + min_utxo. The min_utxo is NOT recycled —
-        # it stays in the NFT output. Only remaining_fuel carries forward.
-        fee_est = 1_000_000
-        min_utxo_est = 10_000_000 # 10 ADA for 50 NFT output
-        needed_per_worker = (batches_per_worker * (fee_est + min_utxo_est)) + 5_000_000
+        # Cost per batch = fee + the lovelace locked in its asset outputs. That
+        # is NOT recycled — it stays with the NFTs. Only remaining_fuel carries
+        # forward. A manifest sample is packed the way the workers will pack
+        # it, since recipients and metadata can make txs hold fewer assets.
+        if index is not None:
+            sample = list(index.rows(0, 4 * batch_size))
+        else:
+            sample = [(f"{prefix}_{i:05d}", {}) for i in range(batch_size)]
+        sample_batches = list(pack_batches(sample, batch_size, template))
+        batch_cost = 0
+        for batch in sample_batches:
+            outputs, fee, _ = plan_mint(batch, "addr", template, fee_floor=1_000_000, min_utxo_floor=10_000_000)
+            batch_cost = max(batch_cost, fee + sum(lovelace for _, lovelace, _ in outputs))
+        assets_per_batch = len(sample) / len(sample_batches)
+        batches_per_worker = max(math.ceil((stop - start) / assets_per_batch) for start, stop in ranges)
+        needed_per_worker = (batches_per_worker * batch_cost) + 5_000_000
         
         # 2. Split Funds
         worker_utxos = await self._split_utxo(needed_per_worker, workers)
@@ -530,17 +627,19 @@ class MintingEngine:
         
         with ThreadPoolExecutor(max_workers=workers) as executor:
             tasks = []
-            for w in range(workers):
+            for w, (start, stop) in enumerate(ranges):
                 # Offset prefix for uniqueness? 
                 # e.g. prefix="Hydra" -> worker 0: Hydra_00000..., worker 1: Hydra_02500...
                 # We handle this by passing base index or modifying prefix
                 worker_prefix = f"{prefix}_W{w}"
+                # Manifest drops: each worker streams its own slice of the index
+                assets = index.rows(start, stop) if index is not None else None
                 
                 tasks.append(
                     loop.run_in_executor(
                         executor, 
                         self._build_chain, 
-                        w, worker_utxos[w], worker_prefix, per_worker_count, batch_size
+                        w, worker_utxos[w], worker_prefix, stop - start, batch_size, assets, template
                     )
                 )
             
@@ -571,13 +670,19 @@ class MintingEngine:
                 if depth < len(chain):
                     await self.client.send_command({
                         "tag": "NewTx",
-                        "transaction": chain[depth]
+                        "transaction": chain[depth][0]
                     })
                     submitted += 1
+                    if submitted % SUBMIT_PROGRESS_EVERY == 0:
+                        logger.info(f"  Submitted {submitted}/{total_built} txs "
+                                    f"({submitted / (time.time() - submit_start):.0f} tx/s)")
         
         logger.info(f"  Submitted {submitted} txs. Collecting confirmations...")
         
-        # Collect confirmations
+        # Collect confirmations. Txs hold different numbers of NFTs (size-limited
+        # packing, short last batches), so the NFTs are counted per confirmed tx.
+        nfts_by_tx = {txid: nfts for chain in all_chains for _, txid, nfts in chain}
+        minted = 0
         valid = 0
         invalid = 0
         timeout_per_tx = 2  # seconds per tx max wait
@@ -592,6 +697,7 @@ class MintingEngine:
                 tag = event.get("tag", "")
                 if tag == "TxValid":
                     valid += 1
+                    minted += nfts_by_tx.pop(event.get("transactionId"), 0)
                 elif tag == "TxInvalid":
                     invalid += 1
                     reason = event.get("validationError", {}).get("reason", "Unknown")
@@ -602,7 +708,7 @@ class MintingEngine:
         
         submit_time = time.time() - submit_start
         total_valid_txs = valid
-        total_nfts = total_valid_txs * batch_size
+        total_nfts = minted
         total_time = build_time + submit_time
         
         logger.info(f"═══ PARALLEL RESULTS ═══")
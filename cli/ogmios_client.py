@@ -1,17 +1,29 @@
 import asyncio
+import itertools
 import json
 import logging
 import os
 import websockets
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class OgmiosClient:
+    """
+    JSON-RPC client for Ogmios v6.
+
+    Requests carry unique ids and are tracked in a pending table, so any
+    number of queries can be in flight on one connection. A background
+    reader (running only while requests are outstanding) routes each
+    response to the future of the request with the matching id.
+    """
     def __init__(self, url: str = None):
         self.url = url or os.getenv('OGMIOS_API_URL', 'ws://localhost:1338')
         self.connection = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._reader: Optional[asyncio.Task] = None
 
     async def connect(self):
         """Establishes a WebSocket connection to Ogmios."""
@@ -25,51 +37,126 @@ class OgmiosClient:
 
     async def close(self):
         """Closes the WebSocket connection."""
+        if self._reader and not self._reader.done():
+            self._reader.cancel()
+        self._fail_pending(Exception("Ogmios connection closed"))
         if self.connection:
             await self.connection.close()
 
-    async def query_utxo(self, address: str) -> List[Dict[str, Any]]:
-        """Queries UTxOs for a specific address."""
+    async def request(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Sends a JSON-RPC request and waits for the response with the same id."""
         if not self.connection:
             raise Exception("Not connected to Ogmios")
 
+        request_id = f"{method}-{next(self._ids)}"
+        payload = {"jsonrpc": "2.0", "method": method, "id": request_id}
+        if params is not None:
+            payload["params"] = params
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self.connection.send(json.dumps(payload))
+            self._ensure_reader()
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _ensure_reader(self):
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        try:
+            while self._pending:
+                raw = await self.connection.recv()
+                self._dispatch(json.loads(raw))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ogmios reader stopped: {e}")
+            self._fail_pending(e)
+
+    def _dispatch(self, data: Dict[str, Any]):
+        request_id = data.get("id")
+        future = self._pending.pop(request_id, None) if request_id is not None else None
+        if future is None and request_id is None and self._pending:
+            # Errors for requests Ogmios could not parse come back without an id;
+            # hand them to the oldest outstanding request.
+            future = self._pending.pop(next(iter(self._pending)))
+        if future is None:
+            logger.debug(f"Dropping Ogmios response for unknown id: {request_id}")
+            return
+        if not future.done():
+            future.set_result(data)
+
+    def _fail_pending(self, error: Exception):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def query_utxo(self, address: Union[str, List[str]]) -> List[Dict[str, Any]]:
+        """Queries UTxOs for one address or, in a single call, for a list of addresses."""
+        addresses = [address] if isinstance(address, str) else list(address)
         # Ogmios v6 method for querying UTXO
-        payload = {
-            "jsonrpc": "2.0",
-            "method": "queryLedgerState/utxo",
-            "params": {
-                "addresses": [address]
-            },
-            "id": "query-utxo"
-        }
-        
-        await self.connection.send(json.dumps(payload))
-        response = await self.connection.recv()
-        data = json.loads(response)
-        
+        data = await self.request("queryLedgerState/utxo", {"addresses": addresses})
+
         if "error" in data:
             logger.error(f"Ogmios query error: {data['error']}")
             return []
-            
+
         return data.get("result", [])
 
+    async def query_utxos(self, addresses: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Queries several addresses in one round-trip, grouped by address."""
+        grouped = {a: [] for a in addresses}
+        for u in await self.query_utxo(addresses):
+            if u.get("address") in grouped:
+                grouped[u["address"]].append(u)
+        return grouped
+
+    async def query_tip(self) -> Dict[str, Any]:
+        """Returns the node's current tip ({"slot": ..., "id": ...})."""
+        data = await self.request("queryNetwork/tip")
+        if "error" in data:
+            raise Exception(f"Ogmios tip query failed: {data['error']}")
+        return data.get("result", {})
+
+    async def query_epoch(self) -> int:
+        """Returns the current epoch number."""
+        data = await self.request("queryLedgerState/epoch")
+        if "error" in data:
+            raise Exception(f"Ogmios epoch query failed: {data['error']}")
+        return data.get("result")
+
+    async def find_intersection(self, points: List[Any]) -> Dict[str, Any]:
+        """Chain-sync: positions the follower at the first known point."""
+        data = await self.request("findIntersection", {"points": points})
+        if "error" in data:
+            raise Exception(f"Ogmios findIntersection failed: {data['error']}")
+        return data.get("result", {})
+
+    async def next_block(self) -> Dict[str, Any]:
+        """Chain-sync: waits for the next roll forward/backward from the current point."""
+        data = await self.request("nextBlock")
+        if "error" in data:
+            raise Exception(f"Ogmios nextBlock failed: {data['error']}")
+        return data.get("result", {})
+
+    async def submit_transaction(self, cbor_hex: str) -> str:
+        """Submits a signed transaction; returns its id."""
+        data = await self.request("submitTransaction", {"transaction": {"cbor": cbor_hex}})
+        if "error" in data:
+            raise Exception(f"Ogmios submit failed: {data['error']}")
+        return data["result"]["transaction"]["id"]
+
     async def query_protocol_parameters(self) -> Dict[str, Any]:
         """Queries protocol parameters."""
-        if not self.connection:
-            raise Exception("Not connected to Ogmios")
+        data = await self.request("queryLedgerState/protocolParameters")
 
-        payload = {
-            "jsonrpc": "2.0",
-            "method": "queryLedgerState/protocolParameters",
-            "id": "query-pparams"
-        }
-        
-        await self.connection.send(json.dumps(payload))
-        response = await self.connection.recv()
-        data = json.loads(response)
-        
         if "error" in data:
             logger.error(f"Ogmios query error: {data['error']}")
             return {}
-            
+
         return data.get("result", {})
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from fractions import Fraction
+from typing import Dict, Any, Iterable, Optional
+from .ogmios_client import OgmiosClient
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_PARAMS_FILE = os.getenv("CARDANO_PROTOCOL_PARAMS", "params/protocol-parameters.json")
+# Ledger constant added to the serialized output size for the min-UTxO rule
+UTXO_ENTRY_OVERHEAD = 160
+# Serialized size of a base address output carrying only lovelace
+ADA_ONLY_OUTPUT_SIZE = 67
+
+
+def _lovelace(value) -> int:
+    """Ogmios wraps amounts as {"ada": {"lovelace": n}}; cardano-cli uses plain ints."""
+    if isinstance(value, dict):
+        return int(value["ada"]["lovelace"])
+    return int(value)
+
+
+def _ratio(value) -> Fraction:
+    """Ogmios encodes prices as "num/den" strings; cardano-cli uses floats."""
+    return Fraction(value).limit_denominator(10**9) if isinstance(value, float) else Fraction(value)
+
+
+class FeeModel:
+    """
+    Precomputed fee / size / min-UTxO rules for one set of protocol parameters.
+
+    Built once per parameter set (load or epoch refresh) from either the
+    cardano-cli JSON or the Ogmios v6 shape; every method is plain integer
+    arithmetic, so callers on hot paths pay nothing per call.
+    """
+    __slots__ = ("fee_fixed", "fee_per_byte", "utxo_cost_per_byte", "max_tx_size",
+                 "price_memory", "price_steps", "collateral_percentage", "epoch")
+
+    def __init__(self, fee_fixed: int, fee_per_byte: int, utxo_cost_per_byte: int, max_tx_size: int,
+                 price_memory: Fraction = Fraction(0), price_steps: Fraction = Fraction(0),
+                 collateral_percentage: int = 150, epoch: Optional[int] = None):
+        self.fee_fixed = fee_fixed
+        self.fee_per_byte = fee_per_byte
+        self.utxo_cost_per_byte = utxo_cost_per_byte
+        self.max_tx_size = max_tx_size
+        self.price_memory = price_memory
+        self.price_steps = price_steps
+        self.collateral_percentage = collateral_percentage
+        self.epoch = epoch
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any], epoch: int = None) -> "FeeModel":
+        if "minFeeCoefficient" in params:  # Ogmios v6
+            prices = params.get("scriptExecutionPrices", {})
+            return cls(
+                fee_fixed=_lovelace(params["minFeeConstant"]),
+                fee_per_byte=int(params["minFeeCoefficient"]),
+                utxo_cost_per_byte=int(params["minUtxoDepositCoefficient"]),
+                max_tx_size=int(params["maxTransactionSize"]["bytes"]),
+                price_memory=_ratio(prices.get("memory", 0)),
+                price_steps=_ratio(prices.get("cpu", 0)),
+                collateral_percentage=int(params.get("collateralPercentage", 150)),
+                epoch=epoch,
+            )
+        prices = params.get("executionUnitPrices", {})
+        return cls(
+            fee_fixed=int(params["txFeeFixed"]),
+            fee_per_byte=int(params["txFeePerByte"]),
+            utxo_cost_per_byte=int(params["utxoCostPerByte"]),
+            max_tx_size=int(params["maxTxSize"]),
+            price_memory=_ratio(prices.get("priceMemory", 0)),
+            price_steps=_ratio(prices.get("priceSteps", 0)),
+            collateral_percentage=int(params.get("collateralPercentage", 150)),
+            epoch=epoch,
+        )
+
+    def min_fee(self, tx_size: int, memory: int = 0, steps: int = 0) -> int:
+        fee = self.fee_fixed + self.fee_per_byte * tx_size
+        if memory or steps:
+            fee += -(-(self.price_memory * memory + self.price_steps * steps) // 1)  # ceil
+        return int(fee)
+
+    def min_lovelace(self, output_size: int) -> int:
+        """Minimum lovelace for an output whose serialized size is output_size bytes."""
+        return (UTXO_ENTRY_OVERHEAD + output_size) * self.utxo_cost_per_byte
+
+    def asset_output_size(self, asset_names: Iterable[str], policies: int = 1) -> int:
+        """Upper bound on the serialized size of an output holding these assets (1 each)."""
+        size = ADA_ONLY_OUTPUT_SIZE + 3 + policies * 31
+        for name in asset_names:
+            size += len(name.encode("utf-8")) + 3
+        return size
+
+
+class ProtocolParamsProvider:
+    """
+    Process-wide protocol parameter cache.
+
+    Starts from the on-disk file and, once `watch()` runs, refreshes from
+    Ogmios whenever the epoch changes (the only time parameters can). The
+    current FeeModel is swapped under a lock, so CLI code, API handlers and
+    mint worker threads all read the same object without locking.
+    """
+    def __init__(self, path: str = PROTOCOL_PARAMS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._params: Optional[Dict[str, Any]] = None
+        self._fee_model: Optional[FeeModel] = None
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        if self._params is None:
+            self._load_file()
+        return self._params
+
+    @property
+    def fee_model(self) -> FeeModel:
+        if self._fee_model is None:
+            self._load_file()
+        return self._fee_model
+
+    def _load_file(self):
+        with self._lock:
+            if self._fee_model is not None:
+                return
+            with open(self.path) as f:
+                params = json.load(f)
+            self._params = params
+            self._fee_model = FeeModel.from_params(params)
+            logger.info(f"Loaded protocol parameters from {self.path}")
+
+    def update(self, params: Dict[str, Any], epoch: int = None):
+        model = FeeModel.from_params(params, epoch)
+        with self._lock:
+            self._params = params
+            self._fee_model = model
+
+    async def refresh(self, ogmios: OgmiosClient) -> bool:
+        """Fetches parameters from Ogmios if the epoch moved on; returns True if they were replaced."""
+        epoch = await ogmios.query_epoch()
+        if self._fee_model is not None and self._fee_model.epoch == epoch:
+            return False
+        params = await ogmios.query_protocol_parameters()
+        if not params:
+            return False
+        self.update(params, epoch)
+        logger.info(f"Protocol parameters refreshed for epoch {epoch}")
+        return True
+
+    async def watch(self, url: str = None, interval: float = 60.0):
+        """Keeps the cache current from Ogmios; on any error the last good parameters stay live."""
+        ogmios = None
+        while True:
+            try:
+                if ogmios is None:
+                    ogmios = OgmiosClient(url)
+                    await ogmios.connect()
+                await self.refresh(ogmios)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Protocol parameter refresh failed, keeping cached values: {e}")
+                if ogmios is not None:
+                    await ogmios.close()
+                    ogmios = None
+            await asyncio.sleep(interval)
+
+
+_provider: Optional[ProtocolParamsProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> ProtocolParamsProvider:
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = ProtocolParamsProvider()
+    return _provider
+
+
+def fee_model() -> FeeModel:
+    """The current FeeModel of the process-wide provider."""
+    return get_provider().fee_model
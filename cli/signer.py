@@ -0,0 +1,94 @@
+"""
+In-process signing for chained transactions.
+
+A tx is the CBOR array [body, witness set, is_valid, auxiliary data]. Its id
+is blake2b-256 over the body bytes exactly as serialized, so TxSigner finds
+the body's byte span and hashes that slice instead of decoding and
+re-encoding the tx (which is what pycardano does, and which is slow and
+only correct when the re-encoding is byte-identical). The vkey witness is
+spliced into the witness set next to any script witnesses already there.
+
+The Ed25519 key is expanded once per signer: pycardano builds a fresh
+nacl SigningKey (and so re-derives the public key) on every sign call.
+"""
+import hashlib
+from typing import Iterable, List, Tuple
+
+import nacl.signing
+import pycardano
+from .cip25 import _head
+from .l1_tx import load_signing_key
+
+
+def _argument(data: bytes, pos: int) -> Tuple[int, int, int]:
+    """(major type, argument, offset after the head) for the CBOR item at pos."""
+    initial = data[pos]
+    major, info = initial >> 5, initial & 0x1F
+    if info < 24:
+        return major, info, pos + 1
+    if info == 31:
+        return major, -1, pos + 1  # indefinite length
+    if info > 27:
+        raise ValueError(f"Malformed CBOR at byte {pos}")
+    size = 1 << (info - 24)
+    return major, int.from_bytes(data[pos + 1:pos + 1 + size], "big"), pos + 1 + size
+
+
+def _skip(data: bytes, pos: int) -> int:
+    """Offset just past the CBOR item starting at pos, without decoding it."""
+    major, arg, pos = _argument(data, pos)
+    if major in (0, 1, 7):  # ints, simple values and floats are all head
+        return pos
+    if major in (2, 3):
+        if arg >= 0:
+            return pos + arg
+        while data[pos] != 0xFF:  # indefinite byte/text string: a run of chunks
+            pos = _skip(data, pos)
+        return pos + 1
+    if major == 6:  # tag: skip the tagged item
+        return _skip(data, pos)
+    if arg < 0:
+        while data[pos] != 0xFF:
+            pos = _skip(data, pos)
+        return pos + 1
+    for _ in range(arg * 2 if major == 5 else arg):
+        pos = _skip(data, pos)
+    return pos
+
+
+def tx_id(tx_cbor: bytes) -> str:
+    """The txid of a serialized tx: blake2b-256 of its body bytes as they stand."""
+    _, _, start = _argument(tx_cbor, 0)
+    return hashlib.blake2b(tx_cbor[start:_skip(tx_cbor, start)], digest_size=32).hexdigest()
+
+
+class TxSigner:
+    def __init__(self, signing_key: pycardano.PaymentSigningKey = None):
+        signing_key = signing_key or load_signing_key()
+        self._key = nacl.signing.SigningKey(signing_key.payload)
+        # Pre-encoded witness prefix: [vkey, <signature follows>]
+        self._witness_head = b"\x82" + _head(2, 32) + bytes(self._key.verify_key) + _head(2, 64)
+
+    def sign(self, tx_cbor: bytes) -> Tuple[bytes, str]:
+        """Adds our vkey witness to a serialized tx; returns (signed tx bytes, txid)."""
+        major, count, start = _argument(tx_cbor, 0)
+        if major != 4 or count < 2:
+            raise ValueError("Not a serialized transaction")
+        body_end = _skip(tx_cbor, start)
+        digest = hashlib.blake2b(tx_cbor[start:body_end], digest_size=32).digest()
+        witness = self._witness_head + self._key.sign(digest).signature
+
+        # Witness set map: prepend key 0 (vkey witnesses); the other entries are copied as bytes
+        major, entries, pos = _argument(tx_cbor, body_end)
+        if major != 5 or entries < 0:
+            raise ValueError("Unsupported witness set encoding")
+        witnesses_end = _skip(tx_cbor, body_end)
+        if entries and tx_cbor[pos] == 0:
+            raise ValueError("Transaction already has vkey witnesses")
+        witness_set = _head(5, entries + 1) + b"\x00\x81" + witness + tx_cbor[pos:witnesses_end]
+        signed = tx_cbor[:body_end] + witness_set + tx_cbor[witnesses_end:]
+        return signed, digest.hex()
+
+    def sign_many(self, txs: Iterable[bytes]) -> List[Tuple[bytes, str]]:
+        """Signs a batch of serialized txs (e.g. a whole mint chain) with the one expanded key."""
+        return [self.sign(tx) for tx in txs]
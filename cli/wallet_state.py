@@ -0,0 +1,99 @@
+import logging
+from typing import Dict, Any, List, Optional, Union
+from .ogmios_client import OgmiosClient
+from .chain_sync import ChainFollower
+
+logger = logging.getLogger(__name__)
+
+
+def to_cli_utxo_map(ogmios_utxos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Converts Ogmios UTxOs to the `cardano-cli query utxo --out-file` JSON shape
+    ("TxId#Index" -> {address, value: {lovelace, <policy>: {...}}, ...}).
+    Unlike transform_utxo_ogmios_to_hydra, native assets are kept so callers can
+    tell clean (ADA-only) UTxOs apart.
+    """
+    utxo_map = {}
+    for u in ogmios_utxos:
+        value = {}
+        for policy, assets in u['value'].items():
+            if policy == 'ada':
+                value['lovelace'] = assets['lovelace']
+            else:
+                value[policy] = assets
+        entry = {
+            "address": u['address'],
+            "value": value,
+            "inlineDatum": u.get("datum"),
+            "datumhash": u.get("datumHash"),
+            "referenceScript": u.get("script"),
+        }
+        utxo_map[f"{u['transaction']['id']}#{u['index']}"] = entry
+    return utxo_map
+
+
+class WalletState:
+    """
+    Shared L1 view of wallet UTxOs, built on one OgmiosClient.
+
+    Any number of addresses are fetched with a single queryLedgerState/utxo
+    call. While `start()` is following the chain, results are cached for the
+    current tip and dropped as soon as chain-sync reports a new block (or a
+    rollback); without a follower every lookup goes to Ogmios.
+    The follower is exposed as `wallet.follower` for confirmation waits.
+    """
+    def __init__(self, ogmios: OgmiosClient, follower: ChainFollower = None):
+        self.ogmios = ogmios
+        self.follower = follower or ChainFollower(ogmios)
+        self.follower.subscribe(self._on_block)
+        self._cache: Dict[str, List[Dict[str, Any]]] = {}
+        self._generation = 0  # bumped on every invalidation
+
+    @property
+    def following(self) -> bool:
+        return self.follower.running
+
+    @property
+    def tip(self) -> Optional[Dict[str, Any]]:
+        return self.follower.tip
+
+    def invalidate(self):
+        self._cache.clear()
+        self._generation += 1
+
+    def _on_block(self, result: Dict[str, Any]):
+        # Any block (or rollback) can spend or create our outputs
+        self.invalidate()
+
+    async def get_utxos(self, addresses: Union[str, List[str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Returns {address: [ogmios utxo, ...]}; uncached addresses are fetched in one call."""
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        if not self.following:
+            self.invalidate()
+
+        missing = [a for a in addresses if a not in self._cache]
+        if missing:
+            generation = self._generation
+            utxos = await self.ogmios.query_utxo(missing)
+            fetched = {a: [] for a in missing}
+            for u in utxos:
+                if u.get('address') in fetched:
+                    fetched[u['address']].append(u)
+            # Only cache if no block landed while the query was in flight
+            if self.following and generation == self._generation:
+                self._cache.update(fetched)
+            else:
+                return {a: self._cache.get(a, fetched.get(a, [])) for a in addresses}
+        return {a: self._cache[a] for a in addresses}
+
+    async def utxos_for(self, address: str) -> List[Dict[str, Any]]:
+        return (await self.get_utxos(address))[address]
+
+    async def start(self):
+        """Starts following the chain from the current tip to keep the cache fresh."""
+        await self.follower.start()
+
+    async def stop(self):
+        await self.follower.stop()
+        self.invalidate()
@@ -119,12 +119,17 @@ async def step_1_init():
 async def step_2_commit():
     step_banner(2, 5, "COMMIT FUNDS INTO HEAD")
     
-    logger.info("  Waiting 10s for Init tx L1 confirmation...")
-    time.sleep(10)
+    # Chain-sync: return as soon as the next L1 block lands instead of a fixed 10s sleep
+    logger.info("  Waiting for the next L1 block (Init tx confirmation)...")
+    from cli.chain_sync import wait_for_blocks
+    try:
+        await wait_for_blocks(1, timeout=120)
+    except asyncio.TimeoutError:
+        logger.warning("  No new block within 120s, continuing")
     
     # Query UTXOs via Ogmios
-    from cleanup_utxos import query_utxos
-    utxos = query_utxos(MY_ADDRESS)
+    from cleanup_utxos import query_utxos_async
+    utxos = await query_utxos_async(MY_ADDRESS) or {}
     
     # Find ~500 ADA UTXO for commit
     commit_utxo = None
@@ -368,8 +373,8 @@ async def main():
     # 0.5 Cleanup (ensure 500 ADA commit UTXO + fuel)
     step_banner("0.5", 5, "CLEANUP — Consolidate Funds & Create Fuel")
     logger.info("  Running cleanup_utxos to consolidate funds...")
-    from cleanup_utxos import cleanup_utxos as run_cleanup
-    run_cleanup()
+    from cleanup_utxos import cleanup_utxos_async as run_cleanup
+    await run_cleanup()
     logger.info("  ✓ Funds ready!")
     
     # 1. Init
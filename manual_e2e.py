@@ -180,7 +180,7 @@ async def step_0_5_cleanup():
     logger.info("  Running cleanup_utxos to consolidate funds...")
     try:
         # cleanup_utxos handles its own L1 confirmation polling and returns hash
-        cleanup_hash = cleanup_utxos.cleanup_utxos()
+        cleanup_hash = await cleanup_utxos.cleanup_utxos_async()
         if not cleanup_hash:
             logger.error("  Cleanup failed!")
             return False
@@ -201,9 +201,11 @@ async def step_3_fund():
     
     # Query UTXOs via Ogmios
     from cli.ogmios_client import OgmiosClient
+    from cli.wallet_state import WalletState
+    from cli.chain_sync import wait_for_blocks
     ogmios = OgmiosClient()
     await ogmios.connect()
-    utxos = await ogmios.query_utxo(MY_ADDRESS)
+    utxos = await WalletState(ogmios).utxos_for(MY_ADDRESS)
     await ogmios.close()
     
     if not utxos:
@@ -270,8 +272,12 @@ async def step_3_fund():
         error = resp.text[:500]
         if "NotEnoughFuel" in error:
             if attempt < MAX_COMMIT_RETRIES:
-                logger.warning(f"  ⚠ NotEnoughFuel (attempt {attempt}). Waiting 30s for node to sync...")
-                time.sleep(30)
+                # The node's fuel view only changes when a block lands; wait for one instead of a fixed 30s
+                logger.warning(f"  ⚠ NotEnoughFuel (attempt {attempt}). Waiting for the next L1 block...")
+                try:
+                    await wait_for_blocks(1, timeout=120)
+                except asyncio.TimeoutError:
+                    logger.warning("  No new block within 120s, retrying anyway")
             else:
                 logger.warning(f"  ⚠ NotEnoughFuel after {MAX_COMMIT_RETRIES} attempts. Trying empty commit...")
                 resp = requests.post(
@@ -17,7 +17,7 @@ SCALER_PID=$!
 sleep 5
 
 echo "Starting Load Test (2500 Txs)..."
-python tests/load_micropayments.py --count 2500 --concurrency 100 > load_test.log 2>&1
+python -m tests.load_micropayments --rate 250 --duration 10 > load_test.log 2>&1
 
 echo "Waiting for autoscaler to react..."
 sleep 5
@@ -1,24 +1,19 @@
 import asyncio
-import websockets
-import json
+from cli.hydra_client import HydraClient
 
 async def main():
-    uri = "ws://localhost:4001"
+    # Lean connection: the node skips history replay, so Greetings is the first message
+    client = HydraClient.lean("ws://localhost:4001")
     try:
-        async with websockets.connect(uri) as ws:
-            # Hydra node sends 'Greetings' message upon connection with current head status
-            msg = await ws.recv()
-            print(f"Received: {msg}")
-            data = json.loads(msg)
-            if data.get('tag') == 'Greetings':
-                #  head_status = data.get('headStatus', {}).get('tag', 'Unknown')
-                #  print(f"Head Status: {head_status}")
-                 head_status = data.get('headStatus', 'Unknown')
-                 print(f"Head Status: {head_status}")
-            else:
-                 print("Did not receive Greetings message first.")
+        greeting = await asyncio.wait_for(client.connect(greeting=True), timeout=10)
+        print(f"Received: {greeting.raw}")
+        print(f"Head Status: {greeting.head_status}")
+    except asyncio.TimeoutError:
+        print("Did not receive Greetings message.")
     except Exception as e:
         print(f"Error connecting to Hydra API: {e}")
+    finally:
+        await client.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -5,8 +5,8 @@ echo "Stopping all Micro-PaaS demo processes..."
 pkill -f "start_demo.sh" 2>/dev/null
 
 # Kill the traffic generator python scripts
-pkill -f "load_micropayments.py" 2>/dev/null
-pkill -f "stress_gaming.py" 2>/dev/null
+pkill -f "load_micropayments" 2>/dev/null
+pkill -f "stress_gaming" 2>/dev/null
 pkill -f "monitor.py" 2>/dev/null
 
 # Clean up any lingering uvicorn API instances
@@ -0,0 +1,194 @@
+"""
+A local stand-in for hydra-node: WebSocket API on / and HTTP GET /snapshot
+on one aiohttp server, with a real (if minimal) UTxO ledger behind NewTx.
+
+Transactions are decoded from their CBOR, so chained txs only validate if
+they spend outputs that exist: a double spend or a tx racing its parent
+comes back as TxInvalid just like on a real head. Latency, jitter and a
+TxInvalid failure rate are configurable, and drop_connections() cuts every
+socket to exercise client reconnects.
+
+    node = FakeHydraNode(utxo={"<txid>#0": {"address": addr, "value": {"lovelace": 100_000_000}}})
+    url = await node.start()          # ws://127.0.0.1:<port>
+    client = HydraClient(url)
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import random
+import time
+from typing import Dict, Any, List, Optional
+
+import cbor2
+import pycardano
+from aiohttp import web, WSMsgType
+
+logger = logging.getLogger(__name__)
+
+
+def decode_tx(transaction: Any):
+    """NewTx payload (TextEnvelope dict or CBOR hex) -> (txid, inputs, outputs as hydra UTxO JSON)."""
+    cbor_hex = transaction["cborHex"] if isinstance(transaction, dict) else transaction
+    raw = bytes.fromhex(cbor_hex)
+    stream = io.BytesIO(raw)
+    stream.seek(1)  # [body, witnesses, valid, aux]: hash the body exactly as it was serialized
+    body = cbor2.CBORDecoder(stream).decode()
+    txid = hashlib.blake2b(raw[1:stream.tell()], digest_size=32).hexdigest()
+
+    inputs = [f"{tx_id.hex()}#{index}" for tx_id, index in body[0]]
+    outputs = []
+    for out in body[1]:
+        address, value = out[0], out[1]  # legacy [addr, value] array or post-Babbage {0: addr, 1: value}
+        entry = {"lovelace": value} if isinstance(value, int) else {"lovelace": value[0]}
+        if not isinstance(value, int):
+            for policy, names in value[1].items():
+                entry[policy.hex()] = {name.hex(): qty for name, qty in names.items()}
+        outputs.append({"address": str(pycardano.Address.from_primitive(address)), "value": entry})
+    return txid, inputs, outputs
+
+
+class FakeHydraNode:
+    def __init__(self, utxo: Dict[str, Any] = None, latency: float = 0.0, jitter: float = 0.0,
+                 fail_rate: float = 0.0, snapshot_every: int = 1, head_status: str = "Open",
+                 head_id: str = "fake-head", seed: int = None):
+        self.utxo: Dict[str, Any] = dict(utxo or {})
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.snapshot_every = snapshot_every
+        self.head_status = head_status
+        self.head_id = head_id
+        self.url: Optional[str] = None
+
+        self.history: List[Dict[str, Any]] = []
+        self.snapshot_number = 0
+        self.confirmed: List[str] = []  # txids since the last snapshot
+        self.latencies: List[float] = []  # NewTx received -> TxValid/TxInvalid sent, seconds
+        self.valid = 0
+        self.invalid = 0
+
+        self._rng = random.Random(seed)
+        self._seq = 0
+        self._clients: set = set()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._ledger: Optional[asyncio.Task] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._last_due = 0.0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get("/", self._ws_handler)
+        app.router.add_get("/snapshot", self._snapshot_handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self._ledger = asyncio.create_task(self._run_ledger())
+        self.url = f"ws://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._ledger:
+            self._ledger.cancel()
+            try:
+                await self._ledger
+            except asyncio.CancelledError:
+                pass
+        await self.drop_connections()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def drop_connections(self):
+        """Closes every client socket (failure injection for reconnect logic)."""
+        for ws in list(self._clients):
+            await ws.close()
+        self._clients.clear()
+
+    # --- API ---
+
+    async def _ws_handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        if request.query.get("history", "yes") != "no":
+            for event in self.history:
+                await ws.send_json(event)
+        greeting = {"tag": "Greetings", "headStatus": self.head_status, "hydraHeadId": self.head_id,
+                    "me": {"vkey": "fake"}, "hydraNodeVersion": "fake"}
+        if request.query.get("snapshot-utxo", "yes") != "no":
+            greeting["snapshotUtxo"] = self.utxo
+        await ws.send_json(greeting)
+        self._clients.add(ws)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                command = msg.json()
+                if command.get("tag") == "NewTx":
+                    await self._queue.put((time.monotonic(), command.get("transaction")))
+                else:
+                    await self._emit({"tag": "CommandFailed", "clientInput": command})
+        finally:
+            self._clients.discard(ws)
+        return ws
+
+    async def _snapshot_handler(self, request: web.Request) -> web.Response:
+        return web.json_response({"tag": "ConfirmedSnapshot", "snapshot": {
+            "headId": self.head_id, "number": self.snapshot_number, "utxo": self.utxo}})
+
+    async def _emit(self, event: Dict[str, Any]):
+        self._seq += 1
+        event = {**event, "seq": self._seq, "timestamp": time.time()}
+        self.history.append(event)
+        for ws in list(self._clients):
+            try:
+                await ws.send_json(event)
+            except ConnectionError:
+                self._clients.discard(ws)
+
+    # --- ledger ---
+
+    async def _run_ledger(self):
+        while True:
+            received, transaction = await self._queue.get()
+            # Each tx is confirmed `latency` after it arrived, in arrival order
+            due = max(received + self.latency + self._rng.uniform(0, self.jitter), self._last_due)
+            self._last_due = due
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._apply(transaction)
+            self.latencies.append(time.monotonic() - received)
+
+    async def _apply(self, transaction: Any):
+        try:
+            txid, inputs, outputs = decode_tx(transaction)
+        except Exception as e:
+            return await self._reject(None, transaction, f"DecoderFailure: {e}")
+
+        missing = [i for i in inputs if i not in self.utxo]
+        if missing:
+            return await self._reject(txid, transaction, f"BadInputsUTxO {missing}")
+        if self.fail_rate and self._rng.random() < self.fail_rate:
+            return await self._reject(txid, transaction, "injected failure")
+
+        for tx_in in inputs:
+            del self.utxo[tx_in]
+        for index, output in enumerate(outputs):
+            self.utxo[f"{txid}#{index}"] = output
+        self.valid += 1
+        await self._emit({"tag": "TxValid", "headId": self.head_id, "transactionId": txid,
+                          "transaction": transaction})
+
+        self.confirmed.append(txid)
+        if len(self.confirmed) >= self.snapshot_every:
+            self.snapshot_number += 1
+            confirmed, self.confirmed = self.confirmed, []
+            await self._emit({"tag": "SnapshotConfirmed", "headId": self.head_id, "snapshot": {
+                "headId": self.head_id, "number": self.snapshot_number, "confirmed": confirmed}})
+
+    async def _reject(self, txid: Optional[str], transaction: Any, reason: str):
+        self.invalid += 1
+        await self._emit({"tag": "TxInvalid", "headId": self.head_id, "transactionId": txid,
+                          "transaction": transaction, "validationError": {"reason": reason}})
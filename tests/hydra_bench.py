@@ -0,0 +1,222 @@
+"""
+End-to-end benchmarks against the local hydra-node stand-in (tests/fake_hydra_node.py).
+
+Unlike tests/benchmark.py (needs a live head) and tests/performance_test.py
+(MockHydraClient that just sleeps), every transaction here goes over a real
+WebSocket, is checked against the fake node's UTxO set and is only counted
+once its TxValid comes back, so the numbers include the client's
+confirmation handling.
+
+Scenarios:
+  newtx_chains       K chains of in-process signed txs, interleaved fire-and-forget
+  mint_parallel      MintingEngine.mint_parallel    (needs the cardano-cli container)
+  mint_batch_unique  MintingEngine.mint_batch_unique (needs the cardano-cli container)
+  payments           PaymentEngine.process_microtransaction
+
+Usage:
+  python -m tests.hydra_bench --out hydra_bench.json --latency 0.005 --fail-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import subprocess
+import time
+from typing import Dict, Any, List, Sequence
+
+import pycardano
+from cli.hydra_client import HydraClient
+from cli.l1_tx import build_payment_tx
+from cli.protocol_params import fee_model
+from tests.fake_hydra_node import FakeHydraNode
+
+logger = logging.getLogger("hydra_bench")
+
+CARDANO_CONTAINER = "hydra-paas-cardano-node-1"
+GENESIS_LOVELACE = 100_000_000_000
+
+
+def percentiles(samples: Sequence[float], points=(50, 90, 99, 99.9)) -> Dict[str, float]:
+    """Nearest-rank percentiles in milliseconds, plus max; samples are seconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        result[f"p{p:g}"] = round(ordered[rank - 1] * 1000, 3)
+    result["max"] = round(ordered[-1] * 1000, 3)
+    return result
+
+
+def _result(count: int, duration: float, latencies: Sequence[float], **extra) -> Dict[str, Any]:
+    return {"count": count, "duration_s": round(duration, 3),
+            "throughput_tps": round(count / duration, 1) if duration > 0 else None,
+            "latency_ms": percentiles(latencies), **extra}
+
+
+def build_chains(inputs: Dict[str, Dict[str, Any]], depth: int, signing_key, address: str) -> List[List[tuple]]:
+    """One chain of `depth` (txid, cbor) self-payments per input; each tx spends the previous tx's change."""
+    fees = fee_model()
+    chains = []
+    for tx_in, entry in inputs.items():
+        chain, current = [], {tx_in: entry}
+        for _ in range(depth):
+            tx = build_payment_tx(current, [(address, 2_000_000)], address, signing_key, fees)
+            change = tx.transaction_body.outputs[-1]
+            current = {f"{tx.id}#{len(tx.transaction_body.outputs) - 1}":
+                       {"address": address, "value": {"lovelace": change.amount.coin}}}
+            chain.append((str(tx.id), tx.to_cbor_hex()))
+        chains.append(chain)
+    return chains
+
+
+async def bench_newtx_chains(node: FakeHydraNode, chains: int, depth: int, timeout: float) -> Dict[str, Any]:
+    signing_key = pycardano.PaymentSigningKey.generate()
+    address = str(pycardano.Address(signing_key.to_verification_key().hash(), network=pycardano.Network.TESTNET))
+    genesis = {f"{i:064x}#0": {"address": address, "value": {"lovelace": GENESIS_LOVELACE}}
+               for i in range(1, chains + 1)}
+    node.utxo.update(genesis)
+    built = build_chains(genesis, depth, signing_key, address)
+
+    client = HydraClient(node.url, history=False, snapshot_utxo=False)
+    await client.connect(greeting=True)
+    try:
+        sent_at: Dict[str, float] = {}
+        latencies, valid, invalid = [], 0, 0
+        start = time.monotonic()
+        # Same interleaving as mint_parallel: tx[0] of every chain, then tx[1], ...
+        for d in range(depth):
+            for chain in built:
+                txid, cbor = chain[d]
+                sent_at[txid] = time.monotonic()
+                await client.fire_and_forget_tx(cbor)
+        deadline = start + timeout
+        while valid + invalid < len(sent_at) and time.monotonic() < deadline:
+            event = await asyncio.wait_for(client.receive_event(), deadline - time.monotonic())
+            txid = event.get("transactionId")
+            if event.get("tag") == "TxValid":
+                valid += 1
+                latencies.append(time.monotonic() - sent_at.get(txid, start))
+            elif event.get("tag") == "TxInvalid":
+                invalid += 1
+        duration = time.monotonic() - start
+    finally:
+        await client.close()
+    return _result(valid, duration, latencies, submitted=len(sent_at), valid=valid, invalid=invalid)
+
+
+def _cardano_cli_available() -> bool:
+    try:
+        subprocess.run(["docker", "exec", CARDANO_CONTAINER, "cardano-cli", "--version"],
+                       check=True, capture_output=True, timeout=10)
+        return True
+    except Exception:
+        return False
+
+
+async def bench_mint(node: FakeHydraNode, mode: str, count: int, batch_size: int, workers: int) -> Dict[str, Any]:
+    """Runs the real MintingEngine (cardano-cli builds, fake node confirms) funded from keys/payment.addr."""
+    from cli.minting import MintingEngine
+    if not _cardano_cli_available():
+        return {"skipped": f"cardano-cli container {CARDANO_CONTAINER} not running"}
+
+    with open("keys/payment.addr") as f:
+        address = f.read().strip()
+    node.utxo[f"{'ee' * 32}#{len(node.utxo)}"] = {"address": address, "value": {"lovelace": GENESIS_LOVELACE}}
+    client = HydraClient(node.url, history=False)
+    await client.connect(greeting=True)
+    seen, valid_before = len(node.latencies), node.valid
+    try:
+        engine = MintingEngine(client)
+        start = time.monotonic()
+        if mode == "mint_parallel":
+            await engine.mint_parallel(f"Bench{int(time.time())}", count, batch_size, workers)
+        else:
+            await engine.mint_batch_unique(f"Bench{int(time.time())}", count, batch_size)
+        duration = time.monotonic() - start
+    finally:
+        await client.close()
+    valid = node.valid - valid_before
+    # Client-side timings are inside the engine; the node sees receipt -> confirmation per tx
+    return _result(valid, duration, node.latencies[seen:], nfts=valid * batch_size,
+                   nfts_per_s=round(valid * batch_size / duration, 1) if duration > 0 else None)
+
+
+async def bench_payments(count: int, concurrency: int) -> Dict[str, Any]:
+    from api.engine import PaymentEngine
+    from api.state import MemoryStateBackend
+    engine = PaymentEngine(MemoryStateBackend())
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def pay(i: int):
+        async with semaphore:
+            t0 = time.monotonic()
+            await engine.process_microtransaction(f"user{i % 100}", 1_000_000)
+            latencies.append(time.monotonic() - t0)
+
+    start = time.monotonic()
+    await asyncio.gather(*(pay(i) for i in range(count)))
+    return _result(count, time.monotonic() - start, latencies, concurrency=concurrency)
+
+
+async def run_suite(args) -> Dict[str, Any]:
+    node = FakeHydraNode(latency=args.latency, jitter=args.jitter, fail_rate=args.fail_rate,
+                         snapshot_every=args.snapshot_every, seed=args.seed)
+    await node.start()
+    results: Dict[str, Any] = {}
+    try:
+        for name in args.scenarios:
+            logger.info(f"Running {name}...")
+            if name == "newtx_chains":
+                results[name] = await bench_newtx_chains(node, args.chains, args.depth, args.timeout)
+            elif name in ("mint_parallel", "mint_batch_unique"):
+                results[name] = await bench_mint(node, name, args.mint_count, args.batch_size, args.chains)
+            elif name == "payments":
+                results[name] = await bench_payments(args.payments, args.concurrency)
+            logger.info(f"{name}: {json.dumps(results[name])}")
+    finally:
+        await node.stop()
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "node": {"latency_s": args.latency, "jitter_s": args.jitter, "fail_rate": args.fail_rate,
+                 "snapshot_every": args.snapshot_every, "seed": args.seed},
+        "results": results,
+    }
+
+
+SCENARIOS = ["newtx_chains", "mint_parallel", "mint_batch_unique", "payments"]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--out", default="hydra_bench.json", help="JSON results file")
+    parser.add_argument("--latency", type=float, default=0.005, help="fake node confirmation latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform latency (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of txs answered TxInvalid")
+    parser.add_argument("--snapshot-every", type=int, default=10, help="TxValid events per SnapshotConfirmed")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--chains", type=int, default=4, help="parallel chains / mint workers")
+    parser.add_argument("--depth", type=int, default=250, help="txs per chain (newtx_chains)")
+    parser.add_argument("--mint-count", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    report = asyncio.run(run_suite(args))
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Mergeable latency histogram for the load tools.
+
+Values are kept to 3 significant digits (<= 0.5% relative error) in sparse
+buckets, HDR-histogram style: memory stays small however many samples are
+recorded, and histograms from several workers or processes combine exactly
+with merge() or via to_dict()/from_dict().
+"""
+import math
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+SIGNIFICANT_DIGITS = 3
+DEFAULT_PERCENTILES = (50, 90, 99, 99.9, 99.99)
+
+
+def _bucket(micros: int) -> int:
+    if micros < 10 ** SIGNIFICANT_DIGITS:
+        return micros
+    scale = 10 ** (len(str(micros)) - SIGNIFICANT_DIGITS)
+    return (micros + scale // 2) // scale * scale
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts: Counter = Counter()  # bucket (microseconds) -> samples
+        self.total = 0
+        self.max_us = 0
+
+    def record(self, seconds: float):
+        micros = max(0, int(seconds * 1_000_000))
+        self.counts[_bucket(micros)] += 1
+        self.total += 1
+        self.max_us = max(self.max_us, micros)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Nearest-rank percentile in milliseconds (None when empty)."""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(p / 100 * self.total))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(bucket, self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self, points: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Optional[float]]:
+        result = {f"p{p:g}": self.percentile(p) for p in points}
+        result["max"] = self.max_us / 1000 if self.total else None
+        return result
+
+    def to_dict(self) -> Dict:
+        return {"counts": {str(k): v for k, v in self.counts.items()}, "total": self.total, "max_us": self.max_us}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        hist = cls()
+        hist.counts = Counter({int(k): v for k, v in data["counts"].items()})
+        hist.total = data["total"]
+        hist.max_us = data["max_us"]
+        return hist
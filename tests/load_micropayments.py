@@ -1,51 +1,204 @@
+"""
+Open-loop load generator for POST /api/v1/pay.
+
+Requests are issued on a fixed arrival schedule (constant rate or ramp
+stages), independent of how fast responses come back, and latency is
+measured from each request's *intended* send time. A slow server
+therefore shows up as latency instead of silently lowering the offered
+load (coordinated omission). Service time (from the actual send) is
+recorded alongside for comparison.
+
+    python -m tests.load_micropayments --rate 1000 --duration 30
+    python -m tests.load_micropayments --ramp 100-1000@20,1000@30 --http2 --json out.json --csv out.csv
+"""
+import argparse
 import asyncio
+import csv
+import json
+import math
 import time
+from typing import Dict, List, Tuple
+
 import httpx
-import argparse
+from tests.latency_histogram import LatencyHistogram
+
+Stage = Tuple[float, float, float]  # (start rate, end rate, seconds)
+
+
+def parse_stages(spec: str) -> List[Stage]:
+    """'100-1000@20,1000@30' -> linear ramp 100->1000 req/s over 20s, then 1000 req/s for 30s."""
+    stages = []
+    for item in spec.split(","):
+        rates, _, seconds = item.strip().partition("@")
+        start, _, end = rates.partition("-")
+        stages.append((float(start), float(end or start), float(seconds)))
+    return stages
+
+
+def schedule(stages: List[Stage]):
+    """Yields intended send offsets (seconds from start) for the arrival-rate stages."""
+    offset = 0.0
+    for start_rate, end_rate, seconds in stages:
+        slope = (end_rate - start_rate) / seconds if seconds else 0.0
+        n = 0
+        while True:
+            # The n-th arrival is where the integrated rate start*t + slope*t^2/2 reaches n
+            if slope:
+                t = (math.sqrt(max(start_rate ** 2 + 2 * slope * n, 0.0)) - start_rate) / slope
+            elif start_rate > 0:
+                t = n / start_rate
+            else:
+                break
+            if t >= seconds - 1e-9:
+                break
+            yield offset + t
+            n += 1
+        offset += seconds
+
+
+class SecondStats:
+    __slots__ = ("sent", "ok", "errors", "latency")
+
+    def __init__(self):
+        self.sent = 0
+        self.ok = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+
+class LoadGenerator:
+    def __init__(self, url: str, stages: List[Stage], connections: int = 200, http2: bool = False,
+                 users: int = 1000, action: str = "unlock_post", timeout: float = 30.0,
+                 transport: httpx.AsyncBaseTransport = None):
+        self.url = url
+        self.stages = stages
+        self.users = users
+        self.action = action
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        # Keep-alive pool; HTTP/2 multiplexes over fewer connections (needs the h2 package)
+        self.client = httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout, transport=transport)
+        self.http2 = http2
+
+        self.latency = LatencyHistogram()  # intended send -> response
+        self.service = LatencyHistogram()  # actual send -> response
+        self.errors: Dict[str, int] = {}
+        self.seconds: Dict[int, SecondStats] = {}
+        self.intended = 0
+
+    def _second(self, t: float) -> SecondStats:
+        return self.seconds.setdefault(int(t), SecondStats())
+
+    async def _request(self, n: int, start: float, intended: float):
+        sent = time.monotonic()
+        self._second(sent - start).sent += 1
+        try:
+            response = await self.client.post(self.url, json={"user_id": f"user_{n % self.users}",
+                                                              "action": self.action})
+            error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+        except Exception as e:
+            error = type(e).__name__
+        done = time.monotonic()
+        bucket = self._second(done - start)
+        if error:
+            bucket.errors += 1
+            self.errors[error] = self.errors.get(error, 0) + 1
+            return
+        bucket.ok += 1
+        latency = done - (start + intended)
+        bucket.latency.record(latency)
+        self.latency.record(latency)
+        self.service.record(done - sent)
+
+    async def run(self) -> Dict:
+        start = time.monotonic()
+        pending = set()
+        try:
+            for n, intended in enumerate(schedule(self.stages)):
+                delay = start + intended - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(self._request(n, start, intended))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                self.intended += 1
+            if pending:
+                await asyncio.wait(pending)
+        finally:
+            await self.client.aclose()
+        return self.report(time.monotonic() - start)
+
+    def report(self, elapsed: float) -> Dict:
+        ok = self.latency.total
+        failed = sum(self.errors.values())
+        scheduled = sum(s[2] for s in self.stages)
+        return {
+            "url": self.url,
+            "http2": self.http2,
+            "stages": [{"start_rate": a, "end_rate": b, "seconds": s} for a, b, s in self.stages],
+            "intended_requests": self.intended,
+            "target_rate": round(self.intended / scheduled, 1) if scheduled else None,
+            "ok": ok,
+            "errors": failed,
+            "error_rate": round(failed / self.intended, 5) if self.intended else 0.0,
+            "error_kinds": self.errors,
+            "elapsed_s": round(elapsed, 3),
+            "achieved_rate": round(ok / elapsed, 1) if elapsed > 0 else None,
+            "latency_ms": self.latency.summary(),
+            "service_time_ms": self.service.summary(),
+            "per_second": self.timeline(),
+        }
+
+    def timeline(self) -> List[Dict]:
+        rows = []
+        for second in sorted(self.seconds):
+            stats = self.seconds[second]
+            rows.append({"second": second, "sent": stats.sent, "ok": stats.ok, "errors": stats.errors,
+                         "p50_ms": stats.latency.percentile(50), "p99_ms": stats.latency.percentile(99)})
+        return rows
+
+
+def write_csv(path: str, rows: List[Dict]):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["second", "sent", "ok", "errors", "p50_ms", "p99_ms"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_report(report: Dict):
+    print("\n=== LOAD TEST RESULTS (open loop) ===")
+    print(f"Target Rate:        {report['target_rate']} req/s ({report['intended_requests']} requests)")
+    print(f"Achieved Rate:      {report['achieved_rate']} req/s")
+    print(f"Successful:         {report['ok']}")
+    print(f"Errors:             {report['errors']} ({report['error_rate'] * 100:.2f}%) {report['error_kinds'] or ''}")
+    for name, value in report["latency_ms"].items():
+        print(f"Latency {name:<8}    {value if value is not None else '-'} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop load test for /api/v1/pay")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api/v1/pay")
+    parser.add_argument("--rate", type=float, default=1000, help="constant arrival rate (req/s)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds at --rate")
+    parser.add_argument("--ramp", help="stages 'start[-end]@seconds,...', overrides --rate/--duration")
+    parser.add_argument("--connections", type=int, default=200, help="keep-alive pool size")
+    parser.add_argument("--http2", action="store_true", help="use HTTP/2 (requires the h2 package)")
+    parser.add_argument("--users", type=int, default=1000, help="distinct user_ids to cycle through")
+    parser.add_argument("--action", default="unlock_post")
+    parser.add_argument("--json", help="write the full report as JSON")
+    parser.add_argument("--csv", help="write the per-second timeline as CSV")
+    args = parser.parse_args(argv)
+
+    stages = parse_stages(args.ramp) if args.ramp else [(args.rate, args.rate, args.duration)]
+    generator = LoadGenerator(args.url, stages, connections=args.connections, http2=args.http2,
+                              users=args.users, action=args.action)
+    report = asyncio.run(generator.run())
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.csv:
+        write_csv(args.csv, report["per_second"])
 
-async def submit_payment(client, action="unlock_post"):
-    payload = {"user_id": "user_123", "action": action}
-    start = time.time()
-    try:
-        response = await client.post("http://127.0.0.1:8000/api/v1/pay", json=payload)
-        latency = time.time() - start
-        return response.status_code == 200, latency
-    except Exception:
-        return False, time.time() - start
-
-async def run_load_test(total_txs=1000, concurrency=50):
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        print(f"Starting load test: {total_txs} microtransactions at concurrency {concurrency}...")
-        start_time = time.time()
-        
-        sem = asyncio.Semaphore(concurrency)
-        
-        async def bounded_submit():
-            async with sem:
-                return await submit_payment(client)
-                
-        tasks = [bounded_submit() for _ in range(total_txs)]
-        results = await asyncio.gather(*tasks)
-        
-        end_time = time.time()
-        
-        success_count = sum(1 for r, _ in results if r)
-        latencies = [l for r, l in results if r]
-        avg_latency = sum(latencies) / len(latencies) if latencies else 0
-        total_time = end_time - start_time
-        tps = total_txs / total_time
-        
-        print("\n=== LOAD TEST RESULTS ===")
-        print(f"Total Transactions: {total_txs}")
-        print(f"Successful:         {success_count}")
-        print(f"Total Time:         {total_time:.2f}s")
-        print(f"Throughput:         {tps:.2f} TPS")
-        print(f"Avg Latency:        {avg_latency*1000:.2f} ms")
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Test API load")
-    parser.add_argument("--count", type=int, default=1000)
-    parser.add_argument("--concurrency", type=int, default=100)
-    args = parser.parse_args()
-    
-    asyncio.run(run_load_test(args.count, args.concurrency))
+    main()
@@ -1,95 +1,256 @@
+"""
+Gaming WebSocket stress test, sharded across processes.
+
+Players are split over --processes worker processes (each with its own
+event loop), so the load generator is not the first thing to saturate.
+Every player connects (staggered over --ramp-up), then sends actions
+drawn from --mix at --rate per second, open loop: the RTT is measured
+from the action's scheduled send time. With --churn, players drop and
+rejoin at that rate, and the reconnect time is measured. Each process
+records mergeable histograms, and the parent combines them into one
+p50/p99/max report.
+
+    python -m tests.stress_gaming --players 10000 --processes 8 --duration 60 \\
+        --mix move=0.8,micro_action=0.2 --rate 10 --churn 0.01 --protocol cbor
+"""
+import argparse
 import asyncio
-import time
 import json
 import logging
-import argparse
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import cbor2
 import websockets
-from websockets.exceptions import ConnectionClosed
+from websockets.exceptions import ConnectionClosed, InvalidHandshake
+from api.gaming_protocol import CBOR_SUBPROTOCOL, ACTION_CODES, quantize
+from tests.latency_histogram import LatencyHistogram
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 logger = logging.getLogger("stress_test")
 
-async def player_client(player_id: str, duration_sec: int, results: list):
-    uri = f"ws://127.0.0.1:8000/api/v1/ws/gaming/{player_id}"
-    msgs_sent = 0
-    total_latency = 0.0
-    disconnects = 0
-    
-    start_time = time.time()
-    
-    while time.time() - start_time < duration_sec:
+HISTOGRAMS = ("rtt", "connect", "reconnect")
+COUNTERS = ("actions", "errors", "disconnects", "churned", "connect_failures")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """'move=0.8,micro_action=0.2' -> normalized weights."""
+    weights = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in ACTION_CODES:
+            raise ValueError(f"Unknown action {name!r}; expected one of {sorted(ACTION_CODES)}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    return {name: w / total for name, w in weights.items()}
+
+
+def shard(players: int, processes: int, index: int) -> List[int]:
+    """Player numbers handled by process `index` (round-robin)."""
+    return list(range(index, players, processes))
+
+
+def encode_action(action: str, protocol: str, rng: random.Random, world: float):
+    if action == "move":
+        x, y = rng.uniform(0, world), rng.uniform(0, world)
+        if protocol == "cbor":
+            return cbor2.dumps([ACTION_CODES["move"], quantize(x), quantize(y)])
+        return json.dumps({"action": "move", "position": [x, y]})
+    if protocol == "cbor":
+        return cbor2.dumps([ACTION_CODES["micro_action"], 1])
+    return json.dumps({"action": "micro_action", "cost": 1})
+
+
+def _is_ack(frame, protocol: str) -> bool:
+    """Skips server-pushed state_sync frames that may interleave with acks."""
+    if protocol == "cbor":
+        return not isinstance(cbor2.loads(frame), cbor2.CBORTag)
+    return '"state_sync"' not in frame
+
+
+class ShardStats:
+    def __init__(self):
+        self.histograms = {name: LatencyHistogram() for name in HISTOGRAMS}
+        self.counters = {name: 0 for name in COUNTERS}
+
+    def to_dict(self) -> Dict:
+        return {"histograms": {k: h.to_dict() for k, h in self.histograms.items()}, "counters": self.counters}
+
+    @classmethod
+    def merge(cls, parts: List[Dict]) -> "ShardStats":
+        merged = cls()
+        for part in parts:
+            for name, data in part["histograms"].items():
+                merged.histograms[name].merge(LatencyHistogram.from_dict(data))
+            for name, value in part["counters"].items():
+                merged.counters[name] += value
+        return merged
+
+
+async def player_client(player_id: str, config: Dict, stats: ShardStats, start_delay: float):
+    uri = f"{config['url']}/{player_id}"
+    protocol = config["protocol"]
+    subprotocols = [CBOR_SUBPROTOCOL] if protocol == "cbor" else None
+    rng = random.Random(f"{config['seed']}:{player_id}")
+    actions, weights = zip(*config["mix"].items())
+    interval = 1.0 / config["rate"]
+    # Chance that a player leaves after any given action
+    churn_per_action = config["churn"] / config["rate"]
+
+    await asyncio.sleep(start_delay)
+    end = config["end"]
+    dropped_at = None
+    while time.monotonic() < end:
+        t0 = time.monotonic()
         try:
-            async with websockets.connect(uri) as websocket:
-                # Connected
-                while time.time() - start_time < duration_sec:
-                    # Ping action
-                    payload = json.dumps({"action": "micro_action", "cost": 1})
-                    msg_start = time.time()
-                    
-                    await websocket.send(payload)
-                    response = await websocket.recv() # Wait for ACK
-                    
-                    latency = (time.time() - msg_start) * 1000
-                    total_latency += latency
-                    msgs_sent += 1
-                    
-                    # Sleep to simulate human action (10 actions per second)
-                    await asyncio.sleep(0.1)
+            async with websockets.connect(uri, subprotocols=subprotocols, open_timeout=30) as ws:
+                connected = time.monotonic()
+                if dropped_at is None:
+                    stats.histograms["connect"].record(connected - t0)
+                else:
+                    stats.histograms["reconnect"].record(connected - dropped_at)
+                next_send = connected
+                while time.monotonic() < end:
+                    delay = next_send - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    action = rng.choices(actions, weights)[0]
+                    await ws.send(encode_action(action, protocol, rng, config["world"]))
+                    while not _is_ack(await ws.recv(), protocol):
+                        pass
+                    stats.histograms["rtt"].record(time.monotonic() - next_send)
+                    stats.counters["actions"] += 1
+                    next_send += interval
+                    if churn_per_action and rng.random() < churn_per_action:
+                        stats.counters["churned"] += 1
+                        break
+            dropped_at = time.monotonic()
         except ConnectionClosed:
-            disconnects += 1
-            await asyncio.sleep(1) # Wait before reconnect
+            stats.counters["disconnects"] += 1
+            dropped_at = time.monotonic()
+        except (OSError, asyncio.TimeoutError, InvalidHandshake) as e:
+            stats.counters["connect_failures"] += 1
+            logger.debug(f"Player {player_id} connect failed: {e}")
+            dropped_at = dropped_at or time.monotonic()
+            await asyncio.sleep(1)
         except Exception as e:
+            stats.counters["errors"] += 1
             logger.error(f"Player {player_id} error: {e}")
+            dropped_at = time.monotonic()
             await asyncio.sleep(1)
-            
-    # Record stats
-    avg_latency = total_latency / msgs_sent if msgs_sent > 0 else 0
-    results.append({
-        "player_id": player_id,
-        "msgs_sent": msgs_sent,
-        "avg_latency_ms": avg_latency,
-        "disconnects": disconnects
-    })
-
-async def run_stress_test(num_players: int, duration_sec: int):
-    logger.info(f"Starting {num_players}-player stress test for {duration_sec} seconds...")
-    results = []
-    
-    tasks = [
-        player_client(f"player_{i}", duration_sec, results)
-        for i in range(num_players)
-    ]
-    
-    await asyncio.gather(*tasks)
-    
-    # Analyze total result
-    total_msgs = sum(r["msgs_sent"] for r in results)
-    total_disconnects = sum(r["disconnects"] for r in results)
-    avg_ping = sum(r["avg_latency_ms"] for r in results) / len(results) if results else 0
-    
-    # Formatting output for PDF/log capture
-    report = (
+
+
+async def run_shard_async(players: List[int], config: Dict) -> Dict:
+    stats = ShardStats()
+    ramp = config["ramp_up"]
+    total = max(config["players"], 1)
+    await asyncio.gather(*(
+        player_client(f"player_{n}", config, stats, ramp * n / total) for n in players
+    ))
+    return stats.to_dict()
+
+
+def _raise_fd_limit():
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def run_shard(players: List[int], config: Dict) -> Dict:
+    """Process entry point: one event loop driving this shard's players."""
+    _raise_fd_limit()
+    logging.getLogger().setLevel(logging.WARNING)
+    return asyncio.run(run_shard_async(players, config))
+
+
+async def run_stress_test(num_players: int, duration_sec: float, protocol: str = "json",
+                          processes: int = None, mix: str = "micro_action=1", rate: float = 10.0,
+                          churn: float = 0.0, ramp_up: float = None, url: str = "ws://127.0.0.1:8000/api/v1/ws/gaming",
+                          world: float = 1000.0, seed: int = 1) -> Dict:
+    processes = max(1, min(processes or os.cpu_count() or 1, num_players))
+    ramp_up = min(10.0, num_players / 1000) if ramp_up is None else ramp_up
+    logger.info(f"Starting {num_players}-player stress test for {duration_sec}s over {processes} processes ({protocol})...")
+    started = time.time()
+    config = {
+        "url": url, "protocol": protocol, "mix": parse_mix(mix), "rate": rate, "churn": churn,
+        "ramp_up": ramp_up, "world": world, "seed": seed, "players": num_players,
+        # monotonic clocks are system-wide on Linux/macOS, so every process shares the deadline
+        "end": time.monotonic() + ramp_up + duration_sec,
+    }
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(pool, run_shard, shard(num_players, processes, i), config)
+            for i in range(processes)
+        ))
+    stats = ShardStats.merge(parts)
+    elapsed = time.time() - started
+    return {
+        "players": num_players, "processes": processes, "duration_s": duration_sec, "protocol": protocol,
+        "mix": config["mix"], "rate_per_player": rate, "churn_per_player_s": churn,
+        "elapsed_s": round(elapsed, 3),
+        "actions_per_s": round(stats.counters["actions"] / duration_sec, 1) if duration_sec else None,
+        **stats.counters,
+        "rtt_ms": stats.histograms["rtt"].summary(),
+        "connect_ms": stats.histograms["connect"].summary(),
+        "reconnect_ms": stats.histograms["reconnect"].summary(),
+    }
+
+
+def format_report(report: Dict) -> str:
+    rtt, reconnect = report["rtt_ms"], report["reconnect_ms"]
+    p99 = rtt.get("p99")
+    return (
         f"=======================================\n"
         f"Gaming WebSocket Stress Test Final Report\n"
         f"=======================================\n"
-        f"Total Concurrent Players: {num_players}\n"
-        f"Duration:                 {duration_sec} seconds\n"
-        f"Total Actions Processed:  {total_msgs}\n"
-        f"Total Disconnects:        {total_disconnects}\n"
-        f"Average Latency (RTT):    {avg_ping:.2f} ms\n"
-        f"Uptime proxy (success):   {100 - (total_disconnects / max(total_msgs, 1) * 100):.3f}%\n"
-        f"Latency Goal (<200ms):    {'PASS' if avg_ping < 200 else 'FAIL'}\n"
+        f"Total Concurrent Players: {report['players']} ({report['processes']} processes)\n"
+        f"Duration:                 {report['duration_s']} seconds\n"
+        f"Wire Protocol:            {report['protocol']}\n"
+        f"Action Mix:               {', '.join(f'{k}={v:.2f}' for k, v in report['mix'].items())}\n"
+        f"Total Actions Processed:  {report['actions']} ({report['actions_per_s']}/s)\n"
+        f"Total Disconnects:        {report['disconnects']} (+{report['churned']} churned, "
+        f"{report['connect_failures']} failed connects)\n"
+        f"Latency RTT p50/p99/max:  {rtt.get('p50')} / {p99} / {rtt.get('max')} ms\n"
+        f"Connect p50/p99:          {report['connect_ms'].get('p50')} / {report['connect_ms'].get('p99')} ms\n"
+        f"Reconnect p50/p99:        {reconnect.get('p50')} / {reconnect.get('p99')} ms\n"
+        f"Uptime proxy (success):   {100 - (report['disconnects'] / max(report['actions'], 1) * 100):.3f}%\n"
+        f"Latency Goal (p99<200ms): {'PASS' if p99 is not None and p99 < 200 else 'FAIL'}\n"
         f"=======================================\n"
     )
-    
-    print(report)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded gaming WebSocket stress test")
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)  # 10s default for quick testing
+    parser.add_argument("--protocol", choices=["json", "cbor"], default="json")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--mix", default="micro_action=1", help="action weights, e.g. move=0.8,micro_action=0.2")
+    parser.add_argument("--rate", type=float, default=10.0, help="actions per second per player")
+    parser.add_argument("--churn", type=float, default=0.0, help="disconnect/rejoin rate per player per second")
+    parser.add_argument("--ramp-up", type=float, default=None, help="seconds to stagger initial connects")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/api/v1/ws/gaming")
+    parser.add_argument("--json", help="write the merged report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_stress_test(args.players, args.duration, args.protocol, args.processes,
+                                         args.mix, args.rate, args.churn, args.ramp_up, args.url))
+    text = format_report(report)
+    print(text)
     with open("docs/stress_test_report.txt", "w") as f:
-        f.write(report)
+        f.write(text)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--players", type=int, default=50)
-    parser.add_argument("--duration", type=int, default=10) # 10s default for quick testing
-    args = parser.parse_args()
-    
-    asyncio.run(run_stress_test(args.players, args.duration))
+    main()
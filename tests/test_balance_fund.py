@@ -36,7 +36,17 @@ mock_tx.to_cbor_hex.return_value = "balanced_cbor_hex"
 
 mock_pycardano.Transaction.from_cbor.return_value = mock_tx
 
+# Bind the mock into cli.balance_utils only, then restore the real package so
+# the mock doesn't leak into other test modules (e.g. cli.l1_tx)
+_real_pycardano = sys.modules.get('pycardano')
 sys.modules['pycardano'] = mock_pycardano
+import importlib
+import cli.balance_utils
+importlib.reload(cli.balance_utils)
+if _real_pycardano is not None:
+    sys.modules['pycardano'] = _real_pycardano
+else:
+    del sys.modules['pycardano']
 
 
 class TestBalanceUtils(unittest.TestCase):
@@ -75,8 +85,8 @@ class TestBalanceUtils(unittest.TestCase):
         
         # Should return serialized CBOR
         self.assertEqual(result, "balanced_cbor_hex")
-        # Fee should be set
-        self.assertEqual(mock_body.fee, 300000)
+        # Fee should be set from the fee model (the mocked tx serializes to 0 bytes, plus the witness)
+        self.assertEqual(mock_body.fee, cli.balance_utils.fee_model().min_fee(cli.balance_utils.VKEY_WITNESS_SIZE))
         # Inputs should have the fee input appended
         self.assertIn(mock_tx_input_instance, mock_body.inputs)
         # Collateral should be set
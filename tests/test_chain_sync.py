@@ -0,0 +1,90 @@
+"""Tests for the Ogmios chain-sync follower used for L1 confirmations."""
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from cli.chain_sync import ChainFollower
+
+
+def _forward(slot, txs):
+    return {
+        "direction": "forward",
+        "block": {"slot": slot, "id": f"block{slot}", "height": slot, "transactions": txs},
+        "tip": {"slot": slot, "id": f"block{slot}"}
+    }
+
+
+class FakeChainSync:
+    def __init__(self):
+        self.blocks = asyncio.Queue()
+        self.query_tip = AsyncMock(return_value={"slot": 0, "id": "genesis"})
+        self.find_intersection = AsyncMock(return_value={})
+
+    async def next_block(self):
+        result = await self.blocks.get()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class TestChainFollower(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.ogmios = FakeChainSync()
+        self.follower = ChainFollower(self.ogmios)
+        await self.follower.start()
+
+    async def asyncTearDown(self):
+        await self.follower.stop()
+
+    async def test_starts_at_tip(self):
+        self.ogmios.find_intersection.assert_called_once_with([{"slot": 0, "id": "genesis"}])
+        self.assertTrue(self.follower.running)
+
+    async def test_wait_for_tx_resolves_on_block(self):
+        waiter = asyncio.create_task(self.follower.wait_for_tx("abc", timeout=1))
+        await asyncio.sleep(0)
+        await self.ogmios.blocks.put(_forward(5, [{"id": "other"}, {"id": "abc"}]))
+        point = await waiter
+        self.assertEqual(point["slot"], 5)
+        self.assertEqual(self.follower.tip["slot"], 5)
+
+    async def test_wait_for_tx_already_seen(self):
+        await self.ogmios.blocks.put(_forward(3, [{"id": "early"}]))
+        await self.follower.wait_for_next_block(timeout=1)
+        point = await self.follower.wait_for_tx("early", timeout=0.1)
+        self.assertEqual(point["id"], "block3")
+
+    async def test_wait_for_tx_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.follower.wait_for_tx("never", timeout=0.01)
+        self.assertEqual(self.follower._tx_waiters, {})
+
+    async def test_wait_for_output_with_predicate(self):
+        waiter = asyncio.create_task(self.follower.wait_for_output(
+            "addr1", predicate=lambda o: o["value"]["ada"]["lovelace"] >= 10, timeout=1))
+        await asyncio.sleep(0)
+        await self.ogmios.blocks.put(_forward(7, [{
+            "id": "tx7",
+            "outputs": [
+                {"address": "addr1", "value": {"ada": {"lovelace": 5}}},
+                {"address": "addr1", "value": {"ada": {"lovelace": 50}}},
+            ]
+        }]))
+        utxo = await waiter
+        self.assertEqual(utxo["transaction"]["id"], "tx7")
+        self.assertEqual(utxo["index"], 1)
+
+    async def test_subscribers_see_rollbacks(self):
+        seen = []
+        self.follower.subscribe(lambda result: seen.append(result["direction"]))
+        await self.ogmios.blocks.put({"direction": "backward", "point": {"slot": 0}, "tip": {"slot": 0}})
+        await self.ogmios.blocks.put(_forward(1, []))
+        await self.follower.wait_for_next_block(timeout=1)
+        self.assertEqual(seen, ["backward", "forward"])
+
+    async def test_follower_error_fails_waiters(self):
+        waiter = asyncio.create_task(self.follower.wait_for_tx("abc", timeout=1))
+        await asyncio.sleep(0)
+        await self.ogmios.blocks.put(ConnectionError("ogmios went away"))
+        with self.assertRaises(ConnectionError):
+            await waiter
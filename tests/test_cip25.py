@@ -0,0 +1,107 @@
+"""Tests for template-based CIP-25 metadata encoding and streamed manifests."""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import cbor2
+from cli.cip25 import MetadataTemplate, batched, encode_value, read_manifest
+from cli.minting import POLICY_ID, MintingEngine
+
+
+class TestMetadataTemplate(unittest.TestCase):
+
+    def test_batch_matches_dict_encoding(self):
+        template = MetadataTemplate({"name": "{name}", "image": "ipfs://{cid}", "mediaType": "image/png",
+                                     "attributes": {"rarity": "{rarity}", "edition": 1}})
+        assets = [("Cat_1", {"cid": "QmA", "rarity": "rare"}), ("Cat_2", {"cid": "QmB", "rarity": "common"})]
+        encoded = template.encode_batch(POLICY_ID, assets)
+
+        expected = {721: {POLICY_ID: {name: template.render(name, fields) for name, fields in assets}}}
+        self.assertEqual(cbor2.loads(encoded), expected)
+        self.assertEqual(expected[721][POLICY_ID]["Cat_2"]["attributes"], {"rarity": "common", "edition": 1})
+
+    def test_long_strings_are_chunked(self):
+        description = "é" * 50  # 100 bytes: must split without cutting a character
+        decoded = cbor2.loads(encode_value(description))
+        self.assertIsInstance(decoded, list)
+        self.assertTrue(all(len(piece.encode()) <= 64 for piece in decoded))
+        self.assertEqual("".join(decoded), description)
+
+    def test_default_template_matches_generate_metadata(self):
+        engine = MintingEngine(AsyncMock())
+        metadata = engine._generate_metadata(["A", "B"])
+        encoded = cbor2.loads(MetadataTemplate().encode_batch(POLICY_ID, [("A", {}), ("B", {})]))
+        self.assertEqual(encoded[721], metadata["721"])
+
+    def test_missing_placeholder(self):
+        with self.assertRaisesRegex(ValueError, "cid"):
+            MetadataTemplate({"image": "ipfs://{cid}"}).encode_asset("Cat_1", {})
+
+    def test_explicit_empty_template_is_kept(self):
+        self.assertEqual(cbor2.loads(MetadataTemplate({}).encode_asset("Cat_1")), {})
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_csv_and_jsonl_stream_in_batches(self):
+        csv_path = os.path.join(self.tmp.name, "drop.csv")
+        with open(csv_path, "w") as f:
+            f.write("name,cid\n" + "".join(f"Cat_{i},Qm{i}\n" for i in range(5)))
+        jsonl_path = os.path.join(self.tmp.name, "drop.jsonl")
+        with open(jsonl_path, "w") as f:
+            f.write("".join(json.dumps({"name": f"Cat_{i}", "cid": f"Qm{i}"}) + "\n" for i in range(5)))
+
+        for path in (csv_path, jsonl_path):
+            batches = list(batched(read_manifest(path), 2))
+            self.assertEqual([len(b) for b in batches], [2, 2, 1])
+            self.assertEqual(batches[2][0], ("Cat_4", {"name": "Cat_4", "cid": "Qm4"}))
+
+    def test_mint_from_manifest_pipes_metadata(self):
+        path = os.path.join(self.tmp.name, "drop.jsonl")
+        with open(path, "w") as f:
+            f.write("".join(json.dumps({"name": f"Cat_{i}", "cid": f"Qm{i}"}) + "\n" for i in range(3)))
+        client = AsyncMock()
+        client.get_utxos.return_value = {"tx#0": {"address": "addr", "value": {"lovelace": 500_000_000}}}
+        engine = MintingEngine(client)
+        engine._get_tx_id = MagicMock(return_value="txid")
+        template = MetadataTemplate({"name": "{name}", "image": "ipfs://{cid}"})
+
+        with patch("cli.minting.subprocess.run") as run:
+            run.return_value.stdout = '{"type": "Tx", "cborHex": "00"}'
+            asyncio.run(engine.mint_batch_unique("unused", None, 2, manifest=path, template=template))
+
+        builds = [c for c in run.call_args_list if "build-raw" in c.args[0]]
+        self.assertEqual(len(builds), 2)
+        self.assertIn("/dev/stdin", builds[0].args[0])
+        metadata = cbor2.loads(builds[1].kwargs["input"])
+        self.assertEqual(metadata[721][POLICY_ID], {"Cat_2": {"name": "Cat_2", "image": "ipfs://Qm2"}})
+        self.assertEqual(client.new_tx.call_count, 2)
+
+    def test_bad_manifest_rows_are_rejected_before_minting(self):
+        path = os.path.join(self.tmp.name, "drop.jsonl")
+        rows = [{"name": "Cat_0", "cid": "Qm0"}, {"name": "Cat_1"}, {"cid": "Qm2"}, {"name": "Cat_3", "cid": "Qm3"}]
+        with open(path, "w") as f:
+            f.write("".join(json.dumps(r) + "\n" for r in rows))
+        client = AsyncMock()
+        client.get_utxos.return_value = {"tx#0": {"address": "addr", "value": {"lovelace": 500_000_000}}}
+        engine = MintingEngine(client)
+        engine._get_tx_id = MagicMock(return_value="txid")
+        template = MetadataTemplate({"name": "{name}", "image": "ipfs://{cid}"})
+
+        with patch("cli.minting.subprocess.run") as run:
+            run.return_value.stdout = '{"type": "Tx", "cborHex": "00"}'
+            asyncio.run(engine.mint_batch_unique("unused", None, 10, manifest=path, template=template))
+
+        builds = [c for c in run.call_args_list if "build-raw" in c.args[0]]
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(sorted(cbor2.loads(builds[0].kwargs["input"])[721][POLICY_ID]), ["Cat_0", "Cat_3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
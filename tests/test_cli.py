@@ -3,23 +3,30 @@ import asyncio
 from click.testing import CliRunner
 from unittest.mock import patch, AsyncMock, MagicMock
 from cli.main import cli
+from cli.head_supervisor import INITIALIZING, CLOSED
 
 @pytest.fixture
 def runner():
     return CliRunner()
 
+def mock_supervisor():
+    head = MagicMock()
+    head.start = AsyncMock()
+    head.stop = AsyncMock()
+    head.ready.wait = AsyncMock()
+    head.command = AsyncMock()
+    return head
+
 def test_init_command(runner):
-    with patch('cli.hydra_client.HydraClient.connect', new_callable=AsyncMock) as mock_connect, \
-         patch('cli.hydra_client.HydraClient.init_head', new_callable=AsyncMock) as mock_init, \
-         patch('cli.hydra_client.HydraClient.close', new_callable=AsyncMock) as mock_close:
+    head = mock_supervisor()
+    with patch('cli.main.HeadSupervisor', return_value=head):
         
         result = runner.invoke(cli, ['init', '--network', 'preview'])
         
         assert result.exit_code == 0
         assert "Initializing Hydra Head on preview..." in result.output
-        mock_connect.assert_called_once()
-        mock_init.assert_called_once()
-        mock_close.assert_called_once()
+        head.command.assert_called_once_with("Init", until=INITIALIZING, timeout=120)
+        head.stop.assert_called_once()
 
 def test_fund_command(runner):
     with patch('cli.hydra_client.HydraClient.connect', new_callable=AsyncMock) as mock_connect, \
@@ -57,14 +64,12 @@ def test_mint_command(runner):
         mock_mint.assert_called_once()
 
 def test_close_command(runner):
-    with patch('cli.hydra_client.HydraClient.connect', new_callable=AsyncMock) as mock_connect, \
-         patch('cli.hydra_client.HydraClient.close_head', new_callable=AsyncMock) as mock_close_head, \
-         patch('cli.hydra_client.HydraClient.close', new_callable=AsyncMock) as mock_close:
+    head = mock_supervisor()
+    with patch('cli.main.HeadSupervisor', return_value=head):
         
         result = runner.invoke(cli, ['close'])
         
         assert result.exit_code == 0
         assert "Closing Hydra Head..." in result.output
-        mock_connect.assert_called_once()
-        mock_close_head.assert_called_once()
-        mock_close.assert_called_once()
+        head.command.assert_called_once_with("Close", until=CLOSED, timeout=120)
+        head.stop.assert_called_once()
@@ -4,7 +4,6 @@ from unittest.mock import MagicMock, patch, AsyncMock
 from click.testing import CliRunner
 from click.testing import CliRunner
 from cli.main import cli, init, fund, close, abort, mint, transform_utxo_ogmios_to_hydra
-from subprocess import CalledProcessError
 
 class TestCliUtils(unittest.TestCase):
     """
@@ -44,25 +43,30 @@ class TestCliUtils(unittest.TestCase):
     def setUp(self):
         self.runner = CliRunner()
 
+    def _supervisor(self, MockHeadSupervisor, command=None):
+        head = MockHeadSupervisor.return_value
+        head.start = AsyncMock()
+        head.stop = AsyncMock()
+        head.ready.wait = AsyncMock()
+        head.command = command or AsyncMock()
+        return head
+
     @patch("cli.main.HydraClient")
-    def test_init_success(self, MockHydraClient):
-        # Setup mock
-        mock_client = MockHydraClient.return_value
-        mock_client.connect = AsyncMock()
-        mock_client.init_head = AsyncMock()
-        mock_client.close = AsyncMock()
+    @patch("cli.main.HeadSupervisor")
+    def test_init_success(self, MockHeadSupervisor, MockHydraClient):
+        head = self._supervisor(MockHeadSupervisor)
 
         result = self.runner.invoke(cli, ['init'])
         self.assertEqual(result.exit_code, 0)
         self.assertIn("Initializing Hydra Head", result.output)
-        mock_client.init_head.assert_called_once()
+        MockHeadSupervisor.assert_called_once_with(client=MockHydraClient.lean.return_value,
+                                                   auto_collect=False, auto_fanout=False)
+        self.assertEqual(head.command.call_args.args, ("Init",))
 
     @patch("cli.main.HydraClient")
-    def test_init_failure(self, MockHydraClient):
-        mock_client = MockHydraClient.return_value
-        mock_client.connect = AsyncMock()
-        mock_client.init_head = AsyncMock(side_effect=Exception(" Init Failed"))
-        mock_client.close = AsyncMock()
+    @patch("cli.main.HeadSupervisor")
+    def test_init_failure(self, MockHeadSupervisor, MockHydraClient):
+        self._supervisor(MockHeadSupervisor, AsyncMock(side_effect=Exception(" Init Failed")))
 
         # Capture logs to verify error logging
         with self.assertLogs('cli.main', level='ERROR') as cm:
@@ -84,18 +88,19 @@ class TestCliUtils(unittest.TestCase):
             {"transaction": {"id": "tx1"}, "index": 0, "address": "addr1", "value": {"ada": {"lovelace": 10000000}}},
             {"transaction": {"id": "tx2"}, "index": 0, "address": "addr1", "value": {"ada": {"lovelace": 100000000}}}
         ])
+        mock_ogmios.submit_transaction = AsyncMock(return_value="txid")
         mock_ogmios.close = AsyncMock()
         
-        with patch("cli.main.subprocess.run") as mock_run, \
+        with patch("cli.main.sign_tx_cbor", return_value=("signed_cbor", "txid")) as mock_sign, \
              patch("requests.post") as mock_post, \
              patch("cli.balance_utils.balance_commit_tx", return_value="balanced_cbor"):
-            mock_run.return_value.returncode = 0
-            mock_run.return_value.stdout = b"signed_cbor"
             mock_post.return_value.status_code = 200
             mock_post.return_value.json.return_value = {"cborHex": "draft_cbor"}
             result = self.runner.invoke(cli, ['fund', 'addr1'])
             self.assertEqual(result.exit_code, 0, f"Exit code != 0. Output: {result.output}")
             self.assertNotIn("Need at least 2 UTXOs", result.output)
+            mock_sign.assert_called_once_with("balanced_cbor")
+            mock_ogmios.submit_transaction.assert_awaited_once_with("signed_cbor")
 
     @patch("cli.main.HydraClient")
     @patch("cli.main.OgmiosClient")
@@ -156,8 +161,8 @@ class TestCliUtils(unittest.TestCase):
 
     @patch("cli.main.HydraClient")
     @patch("cli.main.OgmiosClient")
-    def test_fund_subprocess_error(self, MockOgmiosClient, MockHydraClient):
-        """Test that subprocess failures during sign/submit are handled."""
+    def test_fund_submit_error(self, MockOgmiosClient, MockHydraClient):
+        """Test that an Ogmios submit rejection is handled and logged."""
         mock_hydra = MockHydraClient.return_value
         mock_hydra.connect = AsyncMock()
         mock_hydra.close = AsyncMock()
@@ -168,46 +173,43 @@ class TestCliUtils(unittest.TestCase):
              {"transaction": {"id": "tx1"}, "index": 0, "address": "addr1", "value": {"ada": {"lovelace": 10000000}}},
              {"transaction": {"id": "tx2"}, "index": 0, "address": "addr1", "value": {"ada": {"lovelace": 100000000}}}
         ])
+        mock_ogmios.submit_transaction = AsyncMock(side_effect=Exception("ValueNotConserved"))
         mock_ogmios.close = AsyncMock()
         
         with patch("requests.post") as mock_post, \
              patch("cli.balance_utils.balance_commit_tx", return_value="balanced_cbor"), \
-             patch("cli.main.subprocess.run", side_effect=CalledProcessError(1, "cmd")):
+             patch("cli.main.sign_tx_cbor", return_value=("signed_cbor", "txid")):
             mock_post.return_value.status_code = 200
             mock_post.return_value.json.return_value = {"cborHex": "draft_cbor"}
-            # The subprocess error should be caught and logged
-            result = self.runner.invoke(cli, ['fund', 'addr1'])
-            self.assertEqual(result.exit_code, 0)
+            # The submit error should be caught and logged
+            with self.assertLogs('cli.main', level='ERROR') as cm:
+                result = self.runner.invoke(cli, ['fund', 'addr1'])
+                self.assertEqual(result.exit_code, 0)
+                self.assertTrue(any("Submit failed" in log for log in cm.output))
 
     @patch("cli.main.HydraClient")
-    def test_close_success(self, MockHydraClient):
-        mock_client = MockHydraClient.return_value
-        mock_client.connect = AsyncMock()
-        mock_client.close_head = AsyncMock()
-        mock_client.close = AsyncMock()
+    @patch("cli.main.HeadSupervisor")
+    def test_close_success(self, MockHeadSupervisor, MockHydraClient):
+        head = self._supervisor(MockHeadSupervisor)
 
         result = self.runner.invoke(cli, ['close'])
         self.assertEqual(result.exit_code, 0)
-        mock_client.close_head.assert_called()
+        self.assertEqual(head.command.call_args.args, ("Close",))
 
     @patch("cli.main.HydraClient")
-    def test_abort_success(self, MockHydraClient):
-        mock_client = MockHydraClient.return_value
-        mock_client.connect = AsyncMock()
-        mock_client.send_command = AsyncMock()
-        mock_client.wait_for_event = AsyncMock(return_value={"tag": "HeadIsAborted"})
-        mock_client.close = AsyncMock()
+    @patch("cli.main.HeadSupervisor")
+    def test_abort_success(self, MockHeadSupervisor, MockHydraClient):
+        head = self._supervisor(MockHeadSupervisor)
 
         result = self.runner.invoke(cli, ['abort'])
         self.assertEqual(result.exit_code, 0)
         self.assertIn("Aborting Hydra Head...", result.output)
+        self.assertEqual(head.command.call_args.kwargs["until"], "Final")
 
     @patch("cli.main.HydraClient")
-    def test_abort_failure(self, MockHydraClient):
-        mock_client = MockHydraClient.return_value
-        mock_client.connect = AsyncMock()
-        mock_client.send_command = AsyncMock(side_effect=Exception("Abort fail"))
-        mock_client.close = AsyncMock()
+    @patch("cli.main.HeadSupervisor")
+    def test_abort_failure(self, MockHeadSupervisor, MockHydraClient):
+        self._supervisor(MockHeadSupervisor, AsyncMock(side_effect=Exception("Abort fail")))
 
         with self.assertLogs('cli.main', level='ERROR') as cm:
             result = self.runner.invoke(cli, ['abort'])
@@ -0,0 +1,140 @@
+"""Tests for concurrent multi-head commits."""
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from cli.commit_orchestrator import CommitOrchestrator, select_commit_sets
+
+
+def _utxo(txid, lovelace, index=0):
+    return {"transaction": {"id": txid}, "index": index, "address": "addr1",
+            "value": {"ada": {"lovelace": lovelace}}}
+
+
+class FakeHead:
+    """Single-party hydra-node: Greetings, then Committed after submit, HeadIsOpen after CollectCom."""
+    instances = {}
+
+    def __init__(self, url, head_status="Initializing"):
+        self.url = url
+        self.head_status = head_status
+        self.events = asyncio.Queue()
+        self.commands = []
+        self.drafted = []
+        FakeHead.instances[url] = self
+
+    async def connect(self):
+        await self.events.put({"tag": "HeadIsInitializing", "parties": [{"vkey": "me"}]})
+        await self.events.put({"tag": "Greetings", "headStatus": self.head_status})
+
+    async def close(self):
+        pass
+
+    async def receive_event(self):
+        return await self.events.get()
+
+    async def commit_funds(self, utxo):
+        self.drafted.append(utxo)
+        return f"draft-{self.url}"
+
+    async def send_command(self, command):
+        self.commands.append(command)
+        if command["tag"] == "CollectCom":
+            await self.events.put({"tag": "HeadIsOpen"})
+
+
+class TestSelectCommitSets(unittest.TestCase):
+
+    def test_pairs_are_disjoint(self):
+        utxos = [_utxo("a", 20_000_000), _utxo("b", 30_000_000), _utxo("c", 500_000_000),
+                 _utxo("d", 400_000_000), _utxo("e", 1_000_000)]
+        pairs = select_commit_sets(utxos, 2)
+        refs = [u["transaction"]["id"] for pair in pairs for u in pair]
+        self.assertEqual(len(set(refs)), 4)
+        self.assertEqual([c["transaction"]["id"] for c, _ in pairs], ["a", "b"])
+
+    def test_skips_utxos_with_assets(self):
+        token = _utxo("t", 20_000_000)
+        token["value"]["policy"] = {"name": 1}
+        with self.assertRaises(Exception) as ctx:
+            select_commit_sets([token, _utxo("c", 500_000_000)], 1)
+        self.assertIn("Need 1 commit", str(ctx.exception))
+
+
+class TestCommitOrchestrator(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        FakeHead.instances = {}
+        self.wallet = MagicMock()
+        self.wallet.utxos_for = AsyncMock(return_value=[
+            _utxo("c1", 20_000_000), _utxo("c2", 25_000_000), _utxo("c3", 30_000_000),
+            _utxo("f1", 200_000_000), _utxo("f2", 300_000_000), _utxo("f3", 400_000_000),
+        ])
+        patches = [
+            patch("cli.commit_orchestrator.HydraClient", side_effect=lambda url: FakeHead(url)),
+            patch("cli.commit_orchestrator.balance_commit_tx", side_effect=lambda d, f, c, a: f"bal-{d}"),
+            patch("cli.commit_orchestrator.sign_tx_cbor", side_effect=lambda c: (f"signed-{c}", "txid")),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def test_commits_all_heads_concurrently(self):
+        heads = ["ws://h1", "ws://h2", "ws://h3"]
+        arrived = []
+        all_here = asyncio.Event()
+
+        async def submit(cbor):
+            # Only returns once every head has submitted: a sequential orchestrator would hang here
+            arrived.append(cbor)
+            if len(arrived) == len(heads):
+                all_here.set()
+            await all_here.wait()
+            url = cbor.split("draft-")[1]
+            await FakeHead.instances[url].events.put({"tag": "Committed", "party": {"vkey": "me"}})
+            return f"tx-{url}"
+
+        ogmios = MagicMock()
+        ogmios.submit_transaction = AsyncMock(side_effect=submit)
+        orchestrator = CommitOrchestrator(ogmios, heads, "addr1", wallet=self.wallet, open_timeout=2)
+        results = await asyncio.wait_for(orchestrator.run(), 5)
+
+        self.assertEqual([r.status for r in results], ["open"] * 3)
+        self.assertEqual([r.txid for r in results], [f"tx-{h}" for h in heads])
+        self.wallet.utxos_for.assert_awaited_once_with("addr1")
+        committed = [next(iter(FakeHead.instances[h].drafted[0])) for h in heads]
+        self.assertEqual(len(set(committed)), 3)
+        for h in heads:
+            self.assertEqual(FakeHead.instances[h].commands, [{"tag": "CollectCom"}])
+
+    async def test_one_failing_head_does_not_block_others(self):
+        async def submit(cbor):
+            url = cbor.split("draft-")[1]
+            if url == "ws://bad":
+                raise Exception("BadInputsUTxO")
+            await FakeHead.instances[url].events.put({"tag": "Committed", "party": {"vkey": "me"}})
+            return "tx"
+
+        ogmios = MagicMock()
+        ogmios.submit_transaction = AsyncMock(side_effect=submit)
+        orchestrator = CommitOrchestrator(ogmios, ["ws://good", "ws://bad"], "addr1",
+                                          wallet=self.wallet, open_timeout=2)
+        good, bad = await orchestrator.run()
+        self.assertEqual(good.status, "open")
+        self.assertEqual(bad.status, "failed")
+        self.assertIn("BadInputsUTxO", bad.error)
+
+    async def test_already_open_head_is_skipped(self):
+        ogmios = MagicMock()
+        ogmios.submit_transaction = AsyncMock()
+        with patch("cli.commit_orchestrator.HydraClient", side_effect=lambda url: FakeHead(url, "Open")):
+            result, = await CommitOrchestrator(ogmios, ["ws://h1"], "addr1", wallet=self.wallet).run()
+        self.assertEqual(result.status, "open")
+        ogmios.submit_transaction.assert_not_called()
+
+    async def test_open_timeout(self):
+        ogmios = MagicMock()
+        ogmios.submit_transaction = AsyncMock(return_value="tx")  # never observed as Committed
+        orchestrator = CommitOrchestrator(ogmios, ["ws://h1"], "addr1", wallet=self.wallet, open_timeout=0.05)
+        result, = await orchestrator.run()
+        self.assertEqual(result.status, "failed")
+        self.assertEqual(result.error, "timed out while submitted")
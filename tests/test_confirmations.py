@@ -0,0 +1,109 @@
+"""Tests for the payment confirmation hub and its SSE / WebSocket endpoints."""
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+from starlette.testclient import TestClient
+from api.confirmations import ConfirmationHub
+from api.engine import PaymentEngine
+from api.main import app
+from api.routes import confirmations
+from api.routes.payments import engine
+from api.state import MemoryStateBackend
+from cli.head_supervisor import HeadSupervisor
+
+
+class TestConfirmationHub(unittest.IsolatedAsyncioTestCase):
+
+    async def test_fan_out_by_user_and_tx(self):
+        hub = ConfirmationHub()
+        by_user = hub.subscribe(user_id="alice")
+        by_tx = hub.subscribe(tx_ids=["tx1"])
+        other = hub.subscribe(user_id="bob")
+
+        hub.publish("tx1", {"user_id": "alice", "amount_lovelace": 5})
+        event = await by_user.next(1)
+        self.assertEqual(event, {"type": "confirmed", "tx_id": "tx1", "user_id": "alice", "amount_lovelace": 5})
+        self.assertEqual(await by_tx.next(1), event)
+        self.assertTrue(other.queue.empty())
+
+        # tx interest is one-shot; closing drops the user index entry
+        self.assertEqual(by_tx.tx_ids, set())
+        by_user.close()
+        by_tx.close()
+        other.close()
+        self.assertEqual(hub.subscribers, 0)
+
+    async def test_slow_subscriber_drops_instead_of_blocking(self):
+        hub = ConfirmationHub(queue_size=2)
+        subscription = hub.subscribe(user_id="alice")
+        for n in range(5):
+            hub.publish(f"tx{n}", {"user_id": "alice"})
+        self.assertEqual((subscription.queue.qsize(), subscription.dropped), (2, 3))
+
+    async def test_snapshot_confirmed_from_head_supervisor(self):
+        hub = ConfirmationHub()
+        subscription = hub.subscribe(tx_ids=["abc", "def"])
+        head = HeadSupervisor("ws://unused", name="main")
+        head.listeners.append(hub.on_head_event)
+        head.apply({"tag": "Greetings", "headStatus": "Open"})
+        head.apply({"tag": "SnapshotConfirmed",
+                    "snapshot": {"number": 7, "confirmed": ["abc", {"txId": "def"}]}})
+
+        events = [await subscription.next(1), await subscription.next(1)]
+        self.assertEqual({e["tx_id"] for e in events}, {"abc", "def"})
+        self.assertEqual({(e["head"], e["snapshot"]) for e in events}, {("main", 7)})
+
+    async def test_engine_publishes_settled_payments(self):
+        hub = ConfirmationHub()
+        subscription = hub.subscribe(user_id="carol")
+        payment_engine = PaymentEngine(state=MemoryStateBackend(), hub=hub)
+        with patch("api.engine.asyncio.sleep"):
+            tx_id = await payment_engine.process_microtransaction("carol", 10)
+            batch = await payment_engine.process_batch([("carol", 1), ("dave", 2)])
+        received = [(await subscription.next(1))["tx_id"] for _ in range(2)]
+        self.assertEqual(received, [tx_id, batch[0]])
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_sse_catches_up_on_already_settled_tx(self):
+        with patch("api.engine.asyncio.sleep"):
+            tx_id = await engine.process_microtransaction("erin", 3)
+        response = await confirmations.confirmation_stream(user_id=None, tx_id=[tx_id])
+        self.assertEqual(response.media_type, "text/event-stream")
+        chunk = await asyncio.wait_for(response.body_iterator.__anext__(), 2)
+        await response.body_iterator.aclose()
+
+        self.assertTrue(chunk.startswith("event: confirmed\ndata: "))
+        event = json.loads(chunk.split("data: ", 1)[1])
+        self.assertEqual((event["tx_id"], event["user_id"]), (tx_id, "erin"))
+        self.assertEqual(engine.hub.subscribers, 0)
+
+
+class TestConfirmationSocket(unittest.TestCase):
+
+    def test_push_instead_of_polling(self):
+        action = next(iter(app.state.pricing.amounts))
+        # Zero settle delay; patching asyncio.sleep would spin the app's background watchers
+        with patch("api.engine.random.uniform", return_value=0), TestClient(app) as client:
+            with client.websocket_connect("/api/v1/ws/confirmations?user_id=frank") as ws:
+                paid = client.post("/api/v1/pay", json={"user_id": "frank", "action": action}).json()
+                event = ws.receive_json()
+                self.assertEqual((event["type"], event["tx_id"]), ("confirmed", paid["tx_id"]))
+
+                # A tx paid by someone else, watched after the fact
+                other = client.post("/api/v1/pay", json={"user_id": "grace", "action": action}).json()
+                ws.send_json({"tx_ids": [other["tx_id"]]})
+                self.assertEqual(ws.receive_json()["tx_id"], other["tx_id"])
+
+                ws.send_json({"tx_ids": "nope"})
+                self.assertEqual(ws.receive_json()["type"], "error")
+
+                # A frame that isn't JSON gets an error reply and the socket keeps reading
+                ws.send_text("{not json")
+                self.assertEqual(ws.receive_json(), {"type": "error", "error": "invalid JSON"})
+                ws.send_json({"tx_ids": [paid["tx_id"]]})
+                self.assertEqual(ws.receive_json()["tx_id"], paid["tx_id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Tests for the hydra-node stand-in and the benchmark suite built on it."""
+import asyncio
+import unittest
+import pycardano
+from cli.hydra_client import HydraClient
+from tests.fake_hydra_node import FakeHydraNode, decode_tx
+from tests.hydra_bench import build_chains, bench_newtx_chains, percentiles
+
+
+class TestFakeHydraNode(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.sk = pycardano.PaymentSigningKey.generate()
+        self.address = str(pycardano.Address(self.sk.to_verification_key().hash(),
+                                             network=pycardano.Network.TESTNET))
+        self.genesis = {f"{'ab' * 32}#0": {"address": self.address, "value": {"lovelace": 100_000_000}}}
+        self.node = FakeHydraNode(utxo=self.genesis, snapshot_every=2)
+        await self.node.start()
+        self.addAsyncCleanup(self.node.stop)
+        self.client = HydraClient(self.node.url, backoff=0)
+        self.addAsyncCleanup(self.client.close)
+
+    async def _next(self, tag):
+        while True:
+            event = await asyncio.wait_for(self.client.receive_event(), 2)
+            if event["tag"] == tag:
+                return event
+
+    async def test_greeting_honours_lean_options(self):
+        full = HydraClient(self.node.url)
+        self.addAsyncCleanup(full.close)
+        greeting = await full.connect(greeting=True)
+        self.assertEqual(greeting.snapshot_utxo, self.genesis)
+        lean = HydraClient.lean(self.node.url)
+        self.addAsyncCleanup(lean.close)
+        greeting = await lean.connect(greeting=True)
+        self.assertEqual(greeting.head_status, "Open")
+        self.assertIsNone(greeting.snapshot_utxo)
+
+    async def test_chain_validates_and_double_spend_is_rejected(self):
+        (first, tx1), (second, tx2) = build_chains(self.genesis, 2, self.sk, self.address)[0]
+        self.assertEqual(decode_tx(tx1)[0], first)
+        await self.client.connect(greeting=True)
+
+        await self.client.fire_and_forget_tx(tx1)
+        await self.client.fire_and_forget_tx({"type": "Tx ConwayEra", "cborHex": tx2})
+        self.assertEqual((await self._next("TxValid"))["transactionId"], first)
+        self.assertEqual((await self._next("TxValid"))["transactionId"], second)
+        snapshot = await self._next("SnapshotConfirmed")
+        self.assertEqual(snapshot["snapshot"]["confirmed"], [first, second])
+
+        await self.client.fire_and_forget_tx(tx1)
+        invalid = await self._next("TxInvalid")
+        self.assertIn("BadInputsUTxO", invalid["validationError"]["reason"])
+        # /snapshot reflects the ledger: genesis spent, outputs of both txs present
+        utxo = await self.client.get_utxos()
+        self.assertNotIn(f"{'ab' * 32}#0", utxo)
+        self.assertEqual(set(utxo), {f"{first}#0", f"{second}#0", f"{second}#1"})
+
+    async def test_failure_injection(self):
+        self.node.fail_rate = 1.0
+        (_, tx1), = build_chains(self.genesis, 1, self.sk, self.address)[0]
+        await self.client.connect(greeting=True)
+        await self.client.fire_and_forget_tx(tx1)
+        self.assertEqual((await self._next("TxInvalid"))["validationError"]["reason"], "injected failure")
+        self.assertIn(f"{'ab' * 32}#0", self.node.utxo)
+
+    async def test_client_resumes_after_drop(self):
+        chain = build_chains(self.genesis, 2, self.sk, self.address)[0]
+        await self.client.connect(greeting=True)
+        await self.client.fire_and_forget_tx(chain[0][1])
+        await self._next("TxValid")
+        await self.node.drop_connections()
+        await self.client.fire_and_forget_tx(chain[1][1])
+        # The replayed history must not hand the first TxValid out again
+        self.assertEqual((await self._next("TxValid"))["transactionId"], chain[1][0])
+        self.assertEqual(self.client.reconnects, 1)
+
+
+class TestHydraBench(unittest.IsolatedAsyncioTestCase):
+
+    def test_percentiles(self):
+        samples = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentiles(samples, (50, 99)), {"p50": 50.0, "p99": 99.0, "max": 100.0})
+        self.assertEqual(percentiles([]), {})
+
+    async def test_newtx_chains_scenario(self):
+        node = FakeHydraNode(snapshot_every=5)
+        await node.start()
+        self.addAsyncCleanup(node.stop)
+        result = await bench_newtx_chains(node, chains=2, depth=5, timeout=5)
+        self.assertEqual((result["submitted"], result["valid"], result["invalid"]), (10, 10, 0))
+        self.assertEqual(set(result["latency_ms"]), {"p50", "p90", "p99", "p99.9", "max"})
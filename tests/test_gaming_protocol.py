@@ -0,0 +1,85 @@
+"""Tests for the gaming WebSocket wire codecs (JSON default, CBOR subprotocol)."""
+import json
+import unittest
+from unittest.mock import AsyncMock
+import cbor2
+from api.gaming_protocol import (
+    CBOR_CODEC, JSON_CODEC, CBOR_SUBPROTOCOL, ACTION_CODES, STATE_SYNC_TAG, negotiate
+)
+from api.routes.gaming import ConnectionManager
+
+
+class TestNegotiation(unittest.TestCase):
+
+    def test_defaults_to_json(self):
+        self.assertIs(negotiate([]), JSON_CODEC)
+        self.assertIs(negotiate(None), JSON_CODEC)
+        self.assertIs(negotiate(["some-other-proto"]), JSON_CODEC)
+
+    def test_picks_cbor_when_offered(self):
+        self.assertIs(negotiate(["x", CBOR_SUBPROTOCOL]), CBOR_CODEC)
+
+
+class TestCborCodec(unittest.TestCase):
+
+    def test_decode_move_dequantizes(self):
+        data = CBOR_CODEC.decode(cbor2.dumps([ACTION_CODES["move"], 1250, -300]))
+        self.assertEqual(data, {"action": "move", "position": [12.5, -3.0]})
+
+    def test_decode_micro_action(self):
+        data = CBOR_CODEC.decode(cbor2.dumps([ACTION_CODES["micro_action"], 7]))
+        self.assertEqual(data, {"action": "micro_action", "cost": 7})
+
+    def test_decode_malformed(self):
+        with self.assertRaises(ValueError):
+            CBOR_CODEC.decode(cbor2.dumps({"action": "move"}))
+
+    def test_ack_is_smaller_than_json(self):
+        response = {"status": "ok", "ack_action": "micro_action", "balance": 990}
+        binary = CBOR_CODEC.encode_ack(response)
+        self.assertEqual(cbor2.loads(binary), [0, ACTION_CODES["micro_action"], 990])
+        self.assertLess(len(binary), len(JSON_CODEC.encode_ack(response)))
+
+    def test_error_ack(self):
+        binary = CBOR_CODEC.encode_ack({"status": "error", "error": "boom"})
+        self.assertEqual(cbor2.loads(binary), [1, "boom"])
+
+    def test_state_sync_is_tagged(self):
+        frame = cbor2.loads(CBOR_CODEC.encode_state([("p1", 1000, 1.5, 2.0)]))
+        self.assertEqual(frame.tag, STATE_SYNC_TAG)
+        self.assertEqual([list(p) for p in frame.value], [["p1", 1000, 150, 200]])
+
+
+class TestManagerWithCodecs(unittest.IsolatedAsyncioTestCase):
+
+    async def test_json_message_unchanged(self):
+        manager = ConnectionManager()
+        manager.players.add("p1")
+        response = await manager.process_message("p1", json.dumps({"action": "micro_action", "cost": 10}))
+        self.assertEqual(response, {"status": "ok", "ack_action": "micro_action", "balance": 990})
+
+    async def test_cbor_move(self):
+        manager = ConnectionManager()
+        manager.players.add("p1")
+        frame = cbor2.dumps([ACTION_CODES["move"], 500, 250])
+        response = await manager.process_message("p1", frame, CBOR_CODEC)
+        self.assertEqual(response["status"], "ok")
+        self.assertEqual(manager.players.position("p1"), (5.0, 2.5))
+
+    async def test_connect_accepts_negotiated_subprotocol(self):
+        manager = ConnectionManager()
+        ws = AsyncMock()
+        await manager.connect("p1", ws, CBOR_CODEC)
+        ws.accept.assert_called_once_with(subprotocol=CBOR_SUBPROTOCOL)
+
+    async def test_broadcast_per_codec(self):
+        manager = ConnectionManager()
+        json_ws, cbor_ws = AsyncMock(), AsyncMock()
+        await manager.connect("a", json_ws)
+        await manager.connect("b", cbor_ws, CBOR_CODEC)
+        await manager.broadcast_state()
+        json_ws.send_text.assert_called_once()
+        cbor_ws.send_bytes.assert_called_once()
+        payload = json.loads(json_ws.send_text.call_args[0][0])
+        self.assertEqual(payload["type"], "state_sync")
+        self.assertIn("b", payload["players"])
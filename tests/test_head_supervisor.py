@@ -0,0 +1,166 @@
+"""Tests for the event-sourced Hydra head supervisor."""
+import asyncio
+import unittest
+from types import SimpleNamespace
+from cli.head_supervisor import (HeadSupervisor, parse_heads, IDLE, INITIALIZING, OPEN,
+                                 CLOSED, FANOUT_POSSIBLE, FINAL)
+from api.routes import heads as heads_routes
+
+
+class FakeNode:
+    """Hydra client double: events are fed through a queue, commands are recorded."""
+    def __init__(self, replay=(), status=IDLE):
+        self.url = "ws://fake:4001"
+        self.replay = list(replay)
+        self.status = status
+        self.events = asyncio.Queue()
+        self.commands = []
+        self.connects = 0
+
+    async def connect(self):
+        self.connects += 1
+        for event in self.replay:
+            await self.events.put(event)
+        await self.events.put({"tag": "Greetings", "headStatus": self.status})
+
+    async def close(self):
+        pass
+
+    async def receive_event(self):
+        event = await self.events.get()
+        if isinstance(event, Exception):
+            raise event
+        return event
+
+    async def send_command(self, command):
+        self.commands.append(command["tag"])
+
+    async def emit(self, *events):
+        for event in events:
+            await self.events.put(event)
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+
+class TestHeadSupervisor(unittest.IsolatedAsyncioTestCase):
+
+    async def _start(self, node, **kwargs):
+        head = HeadSupervisor(client=node, reconnect_delay=0.01, retry_delay=0.01, **kwargs)
+        await head.start()
+        await asyncio.wait_for(head.ready.wait(), 1)
+        self.addAsyncCleanup(head.stop)
+        return head
+
+    async def test_replayed_history_settles_on_greeting(self):
+        node = FakeNode(replay=[
+            {"tag": "HeadIsInitializing", "headId": "h1", "parties": [{"vkey": "a"}]},
+            {"tag": "HeadIsOpen"}, {"tag": "HeadIsClosed"}, {"tag": "HeadIsFinalized"},
+            {"tag": "HeadIsInitializing", "headId": "h2", "parties": [{"vkey": "a"}]},
+        ], status=INITIALIZING)
+        head = await self._start(node)
+        self.assertEqual(head.state, INITIALIZING)
+        self.assertEqual(head.head_id, "h2")
+        # Only the greeted state is recorded, not every replayed transition
+        self.assertEqual([h["state"] for h in head.history], [INITIALIZING])
+        self.assertEqual(node.commands, [])
+
+    async def test_full_lifecycle_with_auto_collect_and_fanout(self):
+        node = FakeNode()
+        head = await self._start(node)
+        await node.emit({"tag": "HeadIsInitializing", "parties": [{"vkey": "a"}, {"vkey": "b"}]},
+                        {"tag": "Committed", "party": {"vkey": "a"}})
+        self.assertEqual(node.commands, [])
+        await node.emit({"tag": "Committed", "party": {"vkey": "b"}})
+        self.assertEqual(node.commands, ["CollectCom"])
+
+        await node.emit({"tag": "HeadIsOpen"},
+                        {"tag": "HeadIsClosed", "contestationDeadline": "2026-10-19T12:00:00Z"})
+        self.assertEqual(head.state, CLOSED)
+        self.assertEqual(head.snapshot()["contestationDeadline"], "2026-10-19T12:00:00Z")
+
+        await node.emit({"tag": "ReadyToFanout"})
+        self.assertEqual(node.commands, ["CollectCom", "Fanout"])
+        await node.emit({"tag": "ReadyToFanout"}, {"tag": "HeadIsFinalized"})
+        self.assertEqual(node.commands, ["CollectCom", "Fanout"])
+        self.assertEqual([h["state"] for h in head.history],
+                         [IDLE, INITIALIZING, OPEN, CLOSED, FANOUT_POSSIBLE, FINAL])
+
+    async def test_auto_actions_can_be_disabled(self):
+        node = FakeNode()
+        await self._start(node, auto_collect=False, auto_fanout=False)
+        await node.emit({"tag": "HeadIsInitializing", "parties": [{"vkey": "a"}]},
+                        {"tag": "Committed", "party": {"vkey": "a"}}, {"tag": "ReadyToFanout"})
+        self.assertEqual(node.commands, [])
+
+    async def test_wait_for_and_command(self):
+        node = FakeNode(status=OPEN)
+        head = await self._start(node)
+        self.assertEqual(await head.wait_for(OPEN, timeout=0.01), OPEN)
+
+        closing = asyncio.create_task(head.command("Close", until=CLOSED, timeout=1))
+        await node.emit({"tag": "HeadIsClosed"})
+        self.assertEqual(await closing, CLOSED)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await head.wait_for(FINAL, timeout=0.01)
+
+    async def test_rejected_auto_command_is_retried(self):
+        node = FakeNode(status=FANOUT_POSSIBLE)
+        head = await self._start(node)
+        await node.emit({"tag": "ReadyToFanout"})
+        self.assertEqual(node.commands, ["Fanout"])
+        await node.emit({"tag": "CommandFailed", "clientInput": {"tag": "Fanout"}})
+        self.assertEqual(node.commands, ["Fanout"])  # not in the same breath
+        await asyncio.sleep(0.05)
+        self.assertEqual(node.commands, ["Fanout", "Fanout"])
+        await node.emit({"tag": "HeadIsFinalized"})
+        self.assertEqual(head.state, FINAL)
+
+    async def test_command_rejected(self):
+        node = FakeNode(status=OPEN)
+        head = await self._start(node)
+        fanout = asyncio.create_task(head.command("Fanout", until=FINAL, timeout=1))
+        await node.emit({"tag": "CommandFailed", "clientInput": {"tag": "Fanout"}})
+        with self.assertRaises(Exception) as ctx:
+            await fanout
+        self.assertIn("Fanout rejected", str(ctx.exception))
+
+    async def test_command_waits_for_a_new_transition(self):
+        # A head left Final by an earlier lifecycle: Abort must not succeed before the node answers
+        node = FakeNode(status=FINAL)
+        head = await self._start(node)
+        abort = asyncio.create_task(head.command("Abort", until=FINAL, timeout=1))
+        await node.emit()
+        self.assertFalse(abort.done())
+        await node.emit({"tag": "CommandFailed", "clientInput": {"tag": "Abort"}})
+        with self.assertRaisesRegex(Exception, "Abort rejected"):
+            await abort
+
+    async def test_reconnects_after_drop(self):
+        node = FakeNode(status=OPEN)
+        head = await self._start(node)
+        await node.emit(ConnectionError("socket closed"))
+        self.assertFalse(head.ready.is_set())
+        await asyncio.wait_for(head.ready.wait(), 1)
+        self.assertEqual(node.connects, 2)
+        self.assertTrue(head.connected)
+
+
+class TestHeadsApi(unittest.IsolatedAsyncioTestCase):
+
+    def test_parse_heads(self):
+        self.assertEqual(parse_heads("main=ws://a:4001, ws://b:4001?history=no"),
+                         {"main": "ws://a:4001", "head1": "ws://b:4001?history=no"})
+        self.assertEqual(parse_heads(""), {})
+
+    async def test_routes_read_supervisor_state(self):
+        head = HeadSupervisor(client=FakeNode(), name="main")
+        head.apply({"tag": "Greetings", "headStatus": OPEN})
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(heads={"main": head})))
+
+        listed = await heads_routes.list_heads(request)
+        self.assertEqual([h["state"] for h in listed], [OPEN])
+        self.assertEqual((await heads_routes.get_head(request, "main"))["name"], "main")
+        with self.assertRaises(Exception) as ctx:
+            await heads_routes.get_head(request, "missing")
+        self.assertEqual(ctx.exception.status_code, 404)
@@ -68,3 +68,35 @@ async def test_receive_event_not_connected():
         await client.receive_event()
     
     assert "Not connected to Hydra API" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_lean_connect_returns_greeting():
+    conn = AsyncMock()
+    conn.recv.return_value = json.dumps({"tag": "Greetings", "headStatus": "Open", "hydraHeadId": "abc"})
+    with patch('websockets.connect', AsyncMock(return_value=conn)) as mock_connect:
+        client = HydraClient.lean('ws://localhost:4001')
+        greeting = await client.connect(greeting=True)
+
+    mock_connect.assert_called_once_with('ws://localhost:4001?history=no&snapshot-utxo=no')
+    assert greeting.head_status == "Open"
+    assert greeting.head_id == "abc"
+    assert greeting.snapshot_utxo is None
+    assert client.greeting is greeting
+
+
+@pytest.mark.asyncio
+async def test_head_utxo_prefers_greeting_then_snapshot():
+    client = HydraClient()
+    client.connection = AsyncMock()
+    client.connection.recv.return_value = json.dumps(
+        {"tag": "Greetings", "headStatus": "Open", "snapshotUtxo": {"a#0": {}}})
+    await client.receive_event()
+    client.get_utxos = AsyncMock(return_value={"b#0": {}})
+
+    assert await client.head_utxo() == {"a#0": {}}
+    client.get_utxos.assert_not_called()
+    assert await client.head_utxo(fresh=True) == {"b#0": {}}
+
+    client.greeting.snapshot_utxo = None
+    assert await client.head_utxo() == {"b#0": {}}
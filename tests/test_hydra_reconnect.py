@@ -0,0 +1,72 @@
+"""Tests for HydraClient reconnect with history replay."""
+import json
+import unittest
+from unittest.mock import AsyncMock, patch
+from websockets.exceptions import ConnectionClosed, ConnectionClosedError
+from cli.hydra_client import HydraClient
+
+
+def _socket(*messages):
+    """A connection whose recv yields `messages` (dicts are JSON-encoded, exceptions raised)."""
+    conn = AsyncMock()
+    conn.recv.side_effect = [m if isinstance(m, Exception) else json.dumps(m) for m in messages]
+    return conn
+
+
+def _dropped():
+    return ConnectionClosedError(None, None)
+
+
+class TestHydraReconnect(unittest.IsolatedAsyncioTestCase):
+
+    async def test_replay_skips_already_delivered_events(self):
+        client = HydraClient("ws://node:4001", backoff=0)
+        client.connection = _socket({"tag": "TxValid", "seq": 1}, {"tag": "TxValid", "seq": 2}, _dropped())
+        replay = _socket({"tag": "Greetings", "headStatus": "Open"},
+                         {"tag": "TxValid", "seq": 1}, {"tag": "TxValid", "seq": 2},
+                         {"tag": "SnapshotConfirmed", "seq": 3})
+
+        with patch("websockets.connect", AsyncMock(return_value=replay)) as connect:
+            events = [await client.receive_event() for _ in range(4)]
+
+        connect.assert_awaited_once_with("ws://node:4001?history=yes")
+        self.assertEqual([e.get("seq") for e in events], [1, 2, None, 3])
+        self.assertEqual(client.last_seq, 3)
+        self.assertEqual(client.reconnects, 1)
+
+    async def test_replay_url_keeps_existing_query(self):
+        client = HydraClient("ws://node:4001?snapshot-utxo=no")
+        self.assertEqual(client._replay_url(), "ws://node:4001?snapshot-utxo=no&history=yes")
+
+    async def test_backoff_then_give_up(self):
+        client = HydraClient("ws://node:4001", max_retries=4, backoff=1, max_backoff=3)
+        client.connection = _socket(_dropped())
+
+        with patch("websockets.connect", AsyncMock(side_effect=OSError("refused"))), \
+             patch("cli.hydra_client.asyncio.sleep", AsyncMock()) as sleep:
+            with self.assertRaises(Exception) as ctx:
+                await client.receive_event()
+
+        self.assertIn("unreachable after 4", str(ctx.exception))
+        self.assertEqual([c.args[0] for c in sleep.await_args_list], [1, 2, 3, 3])
+
+    async def test_send_retries_on_new_connection(self):
+        client = HydraClient("ws://node:4001", backoff=0)
+        client.connection = AsyncMock()
+        client.connection.send.side_effect = _dropped()
+        fresh = AsyncMock()
+
+        with patch("websockets.connect", AsyncMock(return_value=fresh)):
+            await client.send_command({"tag": "NewTx"})
+
+        fresh.send.assert_awaited_once_with(json.dumps({"tag": "NewTx"}))
+
+    async def test_no_reconnect_after_close_or_when_disabled(self):
+        for client in (HydraClient(reconnect=False), HydraClient()):
+            client.connection = _socket(_dropped())
+            if client.reconnect:
+                await client.close()
+            with patch("websockets.connect", AsyncMock()) as connect:
+                with self.assertRaises(ConnectionClosed):
+                    await client.receive_event()
+            connect.assert_not_called()
@@ -0,0 +1,112 @@
+"""Tests for Idempotency-Key coalescing and replay on /pay."""
+import asyncio
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException, Response
+from api.idempotency import IdempotencyCache, IdempotencyConflict
+from api.routes import payments
+
+
+class TestIdempotencyCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_retries_share_one_call(self):
+        cache = IdempotencyCache()
+        calls = 0
+
+        async def pay():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"tx_id": "tx1"}
+
+        results = await asyncio.gather(*(cache.run("k", "fp", pay) for _ in range(20)))
+        self.assertEqual(calls, 1)
+        self.assertEqual({r["tx_id"] for r, _ in results}, {"tx1"})
+        self.assertEqual(sum(not replayed for _, replayed in results), 1)
+        self.assertEqual(await cache.run("k", "fp", pay), ({"tx_id": "tx1"}, True))
+        self.assertEqual(calls, 1)
+
+    async def test_conflict_and_failures_are_not_cached(self):
+        cache = IdempotencyCache()
+        failing = AsyncMock(side_effect=[Exception("head down"), {"tx_id": "tx2"}])
+        with self.assertRaises(Exception):
+            await cache.run("k", "fp", failing)
+        self.assertEqual(await cache.run("k", "fp", failing), ({"tx_id": "tx2"}, False))
+        with self.assertRaises(IdempotencyConflict):
+            await cache.run("k", "other body", failing)
+
+    async def test_first_caller_cancelled_others_still_get_the_result(self):
+        cache = IdempotencyCache()
+        release = asyncio.Event()
+
+        async def pay():
+            await release.wait()
+            return {"tx_id": "tx1"}
+
+        first = asyncio.ensure_future(cache.run("k", "fp", pay))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.run("k", "fp", pay))
+        await asyncio.sleep(0)
+        first.cancel()  # the client that started the payment disconnects
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await second, ({"tx_id": "tx1"}, True))
+        self.assertTrue(first.cancelled())
+        self.assertEqual(await cache.run("k", "fp", pay), ({"tx_id": "tx1"}, True))
+
+    async def test_bounded_and_expiring(self):
+        cache = IdempotencyCache(max_entries=2, ttl=60)
+        for key in "abc":
+            await cache.run(key, "fp", AsyncMock(return_value={"k": key}))
+        self.assertEqual(list(cache._done), ["b", "c"])
+        cache.ttl = -1
+        fresh = AsyncMock(return_value={"k": "new"})
+        self.assertEqual(await cache.run("c", "fp", fresh), ({"k": "new"}, False))
+
+    async def test_sqlite_shared_between_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "idem.sqlite")
+            worker1, worker2 = IdempotencyCache(path=path), IdempotencyCache(path=path)
+            await worker1.run("k", "fp", AsyncMock(return_value={"tx_id": "tx1"}))
+            engine = AsyncMock()
+            self.assertEqual(await worker2.run("k", "fp", engine), ({"tx_id": "tx1"}, True))
+            engine.assert_not_called()
+            worker1.close()
+            worker2.close()
+
+
+class TestPayRoute(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(
+            pricing=SimpleNamespace(amounts={"unlock_post": 1_000_000}))))
+        patches = [patch.object(payments, "idempotency", IdempotencyCache()),
+                   patch.object(payments.engine, "process_microtransaction",
+                                AsyncMock(side_effect=["tx1", "tx2", "tx3"]))]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def _pay(self, key=None, user="u1"):
+        response = Response()
+        body = payments.PaymentRequest(user_id=user, action="unlock_post")
+        result = await payments.process_payment(self.request, response, body, idempotency_key=key)
+        return result, response.headers.get("Idempotent-Replayed")
+
+    async def test_retry_with_key_replays(self):
+        first, replayed = await self._pay("abc")
+        self.assertIsNone(replayed)
+        again, replayed = await self._pay("abc")
+        self.assertEqual((again["tx_id"], replayed), (first["tx_id"], "true"))
+        self.assertEqual(payments.engine.process_microtransaction.await_count, 1)
+        # Without a key every call is a new payment
+        self.assertEqual((await self._pay())[0]["tx_id"], "tx2")
+
+    async def test_key_reuse_with_other_body_is_rejected(self):
+        await self._pay("abc")
+        with self.assertRaises(HTTPException) as ctx:
+            await self._pay("abc", user="u2")
+        self.assertEqual(ctx.exception.status_code, 422)
@@ -0,0 +1,86 @@
+"""Tests for the in-process L1 build/sign/submit path."""
+import asyncio
+import json
+import unittest
+import pycardano
+from cli.l1_tx import build_payment_tx, sign_tx_cbor
+from cli.protocol_params import ProtocolParamsProvider
+from cli.ogmios_client import OgmiosClient
+
+
+class TestL1Tx(unittest.TestCase):
+
+    def setUp(self):
+        self.sk = pycardano.PaymentSigningKey.generate()
+        self.vk = self.sk.to_verification_key()
+        self.address = str(pycardano.Address(self.vk.hash(), network=pycardano.Network.TESTNET))
+        self.fees = ProtocolParamsProvider().fee_model
+        self.inputs = {
+            f"{'ab' * 32}#0": {"address": self.address,
+                               "value": {"lovelace": 100_000_000, "cc" * 28: {"74657374": 5}}},
+            f"{'cd' * 32}#1": {"address": self.address, "value": {"lovelace": 50_000_000}},
+        }
+
+    def test_build_balances_exactly(self):
+        tx = build_payment_tx(self.inputs, [(self.address, 30_000_000)] * 3, self.address,
+                              self.sk, self.fees)
+        body = tx.transaction_body
+        self.assertEqual(len(body.inputs), 2)
+        self.assertEqual(sum(o.amount.coin for o in body.outputs) + body.fee, 150_000_000)
+        self.assertEqual(body.fee, self.fees.min_fee(len(tx.to_cbor())))
+        # Native assets ride along in the change output
+        self.assertEqual(body.outputs[-1].amount.multi_asset.count(lambda p, n, q: q == 5), 1)
+
+    def test_build_is_signed(self):
+        tx = build_payment_tx(self.inputs, [(self.address, 10_000_000)], self.address,
+                              self.sk, self.fees)
+        witness, = tx.transaction_witness_set.vkey_witnesses
+        self.assertEqual(witness.vkey, self.vk)
+        self.assertEqual(witness.signature, self.sk.sign(tx.transaction_body.hash()))
+
+    def test_build_insufficient_funds(self):
+        with self.assertRaises(Exception) as ctx:
+            build_payment_tx(self.inputs, [(self.address, 149_900_000)], self.address,
+                             self.sk, self.fees)
+        self.assertIn("Insufficient funds", str(ctx.exception))
+
+    def test_sign_keeps_existing_witnesses(self):
+        other = pycardano.PaymentSigningKey.generate()
+        tx = build_payment_tx(self.inputs, [(self.address, 10_000_000)], self.address,
+                              other, self.fees)
+        signed, txid = sign_tx_cbor(tx.to_cbor_hex(), self.sk)
+        witnesses = pycardano.Transaction.from_cbor(signed).transaction_witness_set.vkey_witnesses
+        self.assertEqual(len(witnesses), 2)
+        self.assertEqual(txid, str(tx.id))
+
+
+class FakeSubmitConnection:
+    def __init__(self, reply):
+        self.reply = reply
+        self.sent = []
+        self.outbox = asyncio.Queue()
+
+    async def send(self, message):
+        request = json.loads(message)
+        self.sent.append(request)
+        await self.outbox.put(json.dumps({"jsonrpc": "2.0", "id": request["id"], **self.reply}))
+
+    async def recv(self):
+        return await self.outbox.get()
+
+
+class TestSubmitTransaction(unittest.IsolatedAsyncioTestCase):
+
+    async def test_submit_returns_txid(self):
+        client = OgmiosClient()
+        client.connection = FakeSubmitConnection({"result": {"transaction": {"id": "ff" * 32}}})
+        txid = await client.submit_transaction("84a300")
+        self.assertEqual(txid, "ff" * 32)
+        self.assertEqual(client.connection.sent[0]["params"], {"transaction": {"cbor": "84a300"}})
+
+    async def test_submit_error_raises(self):
+        client = OgmiosClient()
+        client.connection = FakeSubmitConnection({"error": {"code": 3117, "message": "ValueNotConserved"}})
+        with self.assertRaises(Exception) as ctx:
+            await client.submit_transaction("84a300")
+        self.assertIn("ValueNotConserved", str(ctx.exception))
@@ -0,0 +1,162 @@
+"""Tests for the prepaid user-credit ledger and its use by the payment engine."""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import httpx
+from api.engine import PaymentEngine
+from api.ledger import JOURNAL_FILE, SNAPSHOT_FILE, InsufficientFunds, Ledger
+from api.main import app
+from api.routes import payments
+from api.routes.gaming import ConnectionManager
+from api.state import MemoryStateBackend
+
+
+class TestLedger(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    async def test_concurrent_debits_cannot_overspend(self):
+        ledger = Ledger(self.tmp.name)
+        await ledger.open()
+        await ledger.credit("alice", 500)
+        with patch.object(Ledger, "_write", autospec=True, side_effect=Ledger._write) as write:
+            results = await asyncio.gather(*(ledger.debit("alice", 10) for _ in range(100)),
+                                           return_exceptions=True)
+        self.assertEqual(sum(not isinstance(r, InsufficientFunds) for r in results), 50)
+        self.assertEqual(ledger.balance("alice"), 0)
+        # Debits that arrive together share a journal write
+        self.assertLessEqual(write.call_count, 2)
+        await ledger.close()
+
+    async def test_restart_from_snapshot_and_journal_tail(self):
+        ledger = Ledger(self.tmp.name, snapshot_every=3)
+        await ledger.open()
+        await ledger.credit("alice", 100)
+        await ledger.credit("bob", 50)
+        await ledger.debit("alice", 30)  # third entry: snapshot, journal truncated
+        await ledger._flusher  # the snapshot runs after the debit is acknowledged
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, SNAPSHOT_FILE)))
+        await ledger.debit("bob", 20)
+        self.assertEqual(await ledger.debit_many([("alice", 5), ("bob", 100)]), [True, False])
+        await ledger.close()
+        with open(os.path.join(self.tmp.name, JOURNAL_FILE)) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        with open(os.path.join(self.tmp.name, JOURNAL_FILE), "a") as f:
+            f.write('[99,"alice"')  # torn write from a crash
+        restarted = Ledger(self.tmp.name, snapshot_every=3)
+        await restarted.open()
+        self.assertEqual(restarted.balances, {"alice": 65, "bob": 30})
+        self.assertEqual(restarted.seq, 5)
+        await restarted.close()
+
+    async def test_failed_journal_write_refunds_reservation(self):
+        ledger = Ledger(self.tmp.name)
+        await ledger.open()
+        await ledger.credit("alice", 10)
+        with patch.object(Ledger, "_write", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                await ledger.debit("alice", 10)
+            with self.assertRaises(OSError):
+                await ledger.credit("alice", 5)
+        self.assertEqual(ledger.balance("alice"), 10)
+        await ledger.close()
+
+    async def test_failed_snapshot_keeps_journaled_changes(self):
+        ledger = Ledger(self.tmp.name, snapshot_every=2)
+        await ledger.open()
+        with patch.object(Ledger, "_write_snapshot", side_effect=OSError("disk full")) as snapshot:
+            await ledger.credit("alice", 100)
+            self.assertEqual(await ledger.debit("alice", 40), 60)
+            await ledger._flusher
+            self.assertEqual(snapshot.call_count, 1)
+            await ledger.debit("alice", 1)
+            await ledger._flusher
+            self.assertEqual(snapshot.call_count, 1)  # retried only at the next threshold
+            await ledger.debit("alice", 1)
+            await ledger._flusher
+            self.assertEqual(snapshot.call_count, 2)
+        self.assertEqual(ledger.balance("alice"), 58)
+        await ledger.close()
+
+        restarted = Ledger(self.tmp.name)
+        await restarted.open()
+        self.assertEqual(restarted.balance("alice"), 58)
+        await restarted.close()
+
+
+class TestEngineWithLedger(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.ledger = Ledger()
+        await self.ledger.credit("alice", 25)
+        self.engine = PaymentEngine(state=MemoryStateBackend(), ledger=self.ledger)
+        sleep = patch("api.engine.asyncio.sleep")
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+    async def test_debits_before_settling(self):
+        await self.engine.process_microtransaction("alice", 20)
+        with self.assertRaises(InsufficientFunds):
+            await self.engine.process_microtransaction("alice", 20)
+        self.assertEqual(self.ledger.balance("alice"), 5)
+
+        tx_ids = await self.engine.process_batch([("alice", 5), ("bob", 1), ("alice", 1)])
+        self.assertIsNotNone(tx_ids[0])
+        self.assertEqual(tx_ids[1:], [None, None])
+        self.assertTrue(await self.engine.verify_transaction(tx_ids[0]))
+
+    async def test_refunds_when_settlement_fails(self):
+        with patch.object(self.engine.state, "record_payment", side_effect=ConnectionError("store down")):
+            with self.assertRaises(ConnectionError):
+                await self.engine.process_microtransaction("alice", 20)
+        self.assertEqual(self.ledger.balance("alice"), 25)
+
+    async def test_pay_route_returns_402(self):
+        action, amount = next(iter(app.state.pricing.amounts.items()))
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.addAsyncCleanup(client.aclose)
+        with patch.object(payments.engine, "ledger", Ledger()), patch.dict(os.environ, {"HYDRA_ADMIN_TOKEN": "s3cret"}):
+            self.assertEqual((await client.post("/api/v1/pay", json={"user_id": "zoe", "action": action})).status_code, 402)
+            credited = await client.post("/api/v1/credit", json={"user_id": "zoe", "amount_lovelace": amount},
+                                         headers={"X-Admin-Token": "s3cret"})
+            self.assertEqual(credited.json()["balance_lovelace"], amount)
+            self.assertEqual((await client.post("/api/v1/pay", json={"user_id": "zoe", "action": action})).status_code, 200)
+            self.assertEqual((await client.get("/api/v1/balance/zoe")).json()["balance_lovelace"], 0)
+        self.assertEqual((await client.get("/api/v1/balance/zoe")).status_code, 404)
+
+    async def test_credit_requires_operator_token(self):
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.addAsyncCleanup(client.aclose)
+        body = {"user_id": "mallory", "amount_lovelace": 10 ** 12}
+        with patch.object(payments.engine, "ledger", Ledger()) as ledger:
+            with patch.dict(os.environ, {"HYDRA_ADMIN_TOKEN": ""}):
+                self.assertEqual((await client.post("/api/v1/credit", json=body)).status_code, 403)
+            with patch.dict(os.environ, {"HYDRA_ADMIN_TOKEN": "s3cret"}):
+                self.assertEqual((await client.post("/api/v1/credit", json=body)).status_code, 401)
+                wrong = await client.post("/api/v1/credit", json=body, headers={"X-Admin-Token": "guess"})
+                self.assertEqual(wrong.status_code, 401)
+            self.assertEqual(ledger.balance("mallory"), 0)
+
+
+class TestGamingWithLedger(unittest.IsolatedAsyncioTestCase):
+
+    async def test_micro_action_cost_must_be_positive_int(self):
+        ledger = Ledger()
+        await ledger.credit("p1", 100)
+        manager = ConnectionManager(ledger=ledger)
+        manager.players.add("p1", balance=100)
+        for cost in (-50, 0, 2.5, "10", True):
+            response = await manager.process_message("p1", json.dumps({"action": "micro_action", "cost": cost}))
+            self.assertEqual(response["status"], "error")
+        self.assertEqual(ledger.balance("p1"), 100)
+        response = await manager.process_message("p1", json.dumps({"action": "micro_action", "cost": 30}))
+        self.assertEqual(response["balance"], 70)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests for the open-loop payments load generator and its histogram."""
+import asyncio
+import unittest
+import httpx
+from tests.latency_histogram import LatencyHistogram
+from tests.load_micropayments import LoadGenerator, parse_stages, schedule
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_within_precision(self):
+        hist = LatencyHistogram()
+        for i in range(1, 10_001):
+            hist.record(i / 10_000)  # 0.1ms .. 1s
+        self.assertAlmostEqual(hist.percentile(50), 500, delta=500 * 0.005)
+        self.assertAlmostEqual(hist.percentile(99.99), 999.9, delta=999.9 * 0.005)
+        self.assertEqual(hist.summary()["max"], 1000)
+
+    def test_merge_and_roundtrip(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        for _ in range(99):
+            a.record(0.001)
+        b.record(2.0)
+        merged = LatencyHistogram.from_dict(a.to_dict()).merge(LatencyHistogram.from_dict(b.to_dict()))
+        self.assertEqual(merged.total, 100)
+        self.assertEqual(merged.percentile(99), 1.0)
+        self.assertEqual(merged.percentile(100), 2000)
+        self.assertIsNone(LatencyHistogram().percentile(50))
+
+
+class TestLoadGenerator(unittest.IsolatedAsyncioTestCase):
+
+    def test_schedule(self):
+        self.assertEqual(parse_stages("100-1000@20, 50@5"), [(100, 1000, 20), (50, 50, 5)])
+        self.assertEqual(len(list(schedule([(10, 10, 2)]))), 20)
+        offsets = list(schedule([(0, 100, 1)]))
+        # Ramp: arrivals get denser towards the end of the stage
+        self.assertLess(offsets[-1] - offsets[-2], offsets[1] - offsets[0])
+
+    async def test_latency_includes_queueing_delay(self):
+        serial = asyncio.Lock()
+
+        async def handler(request):
+            # A server that handles one request at a time, 50ms each
+            async with serial:
+                await asyncio.sleep(0.05)
+            if b"user_3" in request.content:
+                return httpx.Response(500)
+            return httpx.Response(200, json={"status": "success"})
+
+        generator = LoadGenerator("http://test/api/v1/pay", [(100, 100, 0.1)], users=10,
+                                  transport=httpx.MockTransport(handler))
+        report = await generator.run()
+
+        self.assertEqual(report["intended_requests"], 10)
+        self.assertEqual((report["ok"], report["errors"]), (9, 1))
+        self.assertEqual(report["error_kinds"], {"HTTP 500": 1})
+        # Requests queue behind each other: the last one waits ~0.5s from its intended send time
+        self.assertGreater(report["latency_ms"]["max"], 300)
+        self.assertGreater(report["latency_ms"]["max"], report["service_time_ms"]["p50"])
+        self.assertEqual(sum(r["sent"] for r in report["per_second"]), 10)
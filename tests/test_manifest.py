@@ -0,0 +1,212 @@
+"""Tests for manifest ingestion (validation, on-disk dedup, partitioning) and manifest turbo mints."""
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+import cbor2
+import pycardano
+from cli.cip25 import MetadataTemplate
+from cli.manifest import ManifestIndex, partition, validate_row
+from cli.minting import POLICY_ID, MintingEngine, mint_costs, pack_batches, plan_mint
+from cli.signer import TxSigner, tx_id
+
+RECIPIENT = "addr_test1vqkz9fr0w6eaqvr6et68uk564y50x9qfwyn2t7tmnthw8qg6kjdgv"
+OTHER = "addr_test1vqn78rgwr835xn3nl0gqr5l7qj6mwemrlz9v6cj7p4mskscud5urh"
+# What the mocked `build-raw --out-file /dev/stdout` prints: an unsigned tx envelope
+UNSIGNED_TX = cbor2.dumps([{0: [[b"\xab" * 32, 0]], 1: [], 2: 200_000}, {}, True, None])
+BUILD_RAW_STDOUT = json.dumps({"type": "Unwitnessed Tx ConwayEra", "cborHex": UNSIGNED_TX.hex()})
+
+
+class TestManifestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_validate_row(self):
+        self.assertIsNone(validate_row({"name": "Cat_1", "recipient": RECIPIENT})[0])
+        self.assertIn("32 bytes", validate_row({"name": "x" * 33})[0])
+        self.assertIn("recipient", validate_row({"name": "Cat_1", "recipient": "addr_nope"})[0])
+        self.assertIn("attributes", validate_row({"name": "Cat_1", "attributes": "{bad"})[0])
+        self.assertEqual(validate_row({"name": "Cat_1", "attributes": '{"eyes": "blue"}'})[1]["attributes"],
+                         {"eyes": "blue"})
+        self.assertEqual(validate_row("nope")[0], "not a JSON object")
+
+    def test_validate_row_against_the_mint_template(self):
+        template = MetadataTemplate({"name": "{name}", "image": "ipfs://{cid}"})
+        self.assertIn("'cid'", validate_row({"name": "b"}, template)[0])
+        self.assertIsNone(validate_row({"name": "b", "cid": "Qm1"}, template)[0])
+
+    def test_ingest_dedups_on_disk_and_streams_slices(self):
+        rows = [{"name": f"Cat_{i}", "image": f"ipfs://Qm{i}"} for i in range(10)]
+        lines = [json.dumps(r) for r in rows]
+        lines.insert(3, json.dumps({"name": "Cat_1", "image": "ipfs://dupe"}))
+        lines.insert(5, "{not json")
+        path = self._write("drop.jsonl", "\n".join(lines) + "\n")
+
+        index = ManifestIndex(os.path.join(self.tmp.name, "drop.sqlite"))
+        stats = index.ingest(path)
+        self.assertEqual((stats.rows, stats.accepted, stats.duplicates, stats.invalid), (12, 10, 1, 1))
+        self.assertEqual(len(index), 10)
+        self.assertEqual([name for name, _ in index.rows(4, 6)], ["Cat_4", "Cat_5"])
+        self.assertEqual(next(index.rows(1, 2))[1]["image"], "ipfs://Qm1")  # first occurrence wins
+
+        # Re-ingesting rebuilds the index rather than flagging everything as a duplicate
+        self.assertEqual(index.ingest(path).accepted, 10)
+
+    def test_ingest_rejects_rows_the_template_cannot_encode(self):
+        path = self._write("drop.jsonl", '{"name": "a", "cid": "Qm1"}\n{"name": "b"}\n')
+        index = ManifestIndex(os.path.join(self.tmp.name, "drop.sqlite"))
+        stats = index.ingest(path, MetadataTemplate({"image": "ipfs://{cid}"}))
+        self.assertEqual((stats.accepted, stats.invalid), (1, 1))
+        self.assertIn("row 2", stats.errors[0])
+
+    def test_partition_on_batch_boundaries(self):
+        self.assertEqual(partition(10, 3, 2), [(0, 2), (2, 6), (6, 10)])
+        self.assertEqual(partition(3, 4, 2), [(0, 0), (0, 2), (2, 2), (2, 3)])
+        ranges = partition(100_001, 8, 50)
+        self.assertEqual(sum(stop - start for start, stop in ranges), 100_001)
+        self.assertTrue(all(start % 50 == 0 for start, _ in ranges))
+
+
+class TestDistribution(unittest.TestCase):
+
+    def test_plan_groups_by_recipient(self):
+        batch = [("A", {"recipient": RECIPIENT}), ("B", {}), ("C", {"recipient": RECIPIENT}), ("D", {"recipient": OTHER})]
+        outputs, fee, metadata = plan_mint(batch, "addr_self", fee_floor=1_000_000, min_utxo_floor=10_000_000)
+        self.assertEqual([(addr, names) for addr, _, names in outputs],
+                         [(RECIPIENT, ["A", "C"]), ("addr_self", ["B"]), (OTHER, ["D"])])
+        self.assertEqual(outputs[1][1], 10_000_000)  # only our own output keeps the floor
+        self.assertLess(outputs[0][1], 10_000_000)
+        self.assertEqual(metadata, b"")
+
+    def test_plan_without_recipients_matches_mint_costs(self):
+        names = [f"Cat_{i}" for i in range(50)]
+        outputs, fee, _ = plan_mint([(n, {}) for n in names], "addr", fee_floor=1_000_000, min_utxo_floor=10_000_000)
+        self.assertEqual((fee, outputs[0][1]), mint_costs(names, fee_floor=1_000_000, min_utxo_floor=10_000_000))
+
+    def test_pack_respects_max_tx_size(self):
+        assets = [(f"Cat_{i}", {"recipient": RECIPIENT if i % 2 else OTHER}) for i in range(10)]
+        self.assertEqual([len(b) for b in pack_batches(assets, 4)], [4, 4, 2])
+        # A tight size limit closes txs before batch_size
+        batches = list(pack_batches(assets, 10, max_tx_size=1024 + 400 + 67 + 3 * 116))
+        self.assertEqual(sum(len(b) for b in batches), 10)
+        self.assertTrue(all(len(b) < 10 for b in batches))
+
+
+class TestManifestMint(unittest.IsolatedAsyncioTestCase):
+
+    async def test_workers_mint_their_slice_with_row_metadata(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "drop.csv")
+        with open(path, "w") as f:
+            f.write("name,image,attributes\n")
+            f.write("".join(f'Cat_{i},ipfs://Qm{i},"{{""n"": {i}}}"\n' for i in range(7)))
+
+        client = AsyncMock()
+        client.receive_event.return_value = {"tag": "TxValid"}
+        engine = MintingEngine(client, TxSigner(pycardano.PaymentSigningKey.generate()))
+        engine._split_utxo = AsyncMock(return_value=[
+            {"tx_id": "aa" * 32, "index": w, "lovelace": 500_000_000, "address": "addr"} for w in range(2)])
+
+        with patch("cli.minting.subprocess.run") as run:
+            run.return_value.stdout = BUILD_RAW_STDOUT
+            valid, _ = await engine.mint_parallel("unused", batch_size=2, workers=2, manifest=path)
+
+        builds = [c for c in run.call_args_list if "build-raw" in c.args[0]]
+        self.assertEqual(len(builds), 4)  # 7 rows in batches of 2: worker 0 gets 2 batches, worker 1 gets 2
+        minted = {}
+        for call in builds:
+            minted.update(cbor2.loads(call.kwargs["input"])[721][POLICY_ID])
+        self.assertEqual(sorted(minted), sorted(f"Cat_{i}" for i in range(7)))
+        self.assertEqual(minted["Cat_6"], {"name": "Cat_6", "image": "ipfs://Qm6", "attributes": {"n": 6}})
+        self.assertEqual(valid, 4)
+        self.assertTrue(os.path.exists(path + ".index.sqlite"))
+
+    async def test_assets_go_straight_to_recipients(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "drop.jsonl")
+        rows = [{"name": "Cat_0", "recipient": RECIPIENT}, {"name": "Cat_1", "recipient": OTHER},
+                {"name": "Cat_2", "recipient": RECIPIENT}, {"name": "Cat_3"}]
+        with open(path, "w") as f:
+            f.write("".join(json.dumps(r) + "\n" for r in rows))
+
+        client = AsyncMock()
+        client.receive_event.return_value = {"tag": "TxValid"}
+        engine = MintingEngine(client, TxSigner(pycardano.PaymentSigningKey.generate()))
+        engine._split_utxo = AsyncMock(return_value=[
+            {"tx_id": "aa" * 32, "index": 0, "lovelace": 500_000_000, "address": "addr_self"}])
+
+        with patch("cli.minting.subprocess.run") as run:
+            run.return_value.stdout = BUILD_RAW_STDOUT
+            await engine.mint_parallel("unused", batch_size=2, workers=1, manifest=path)
+
+        builds = [c.args[0] for c in run.call_args_list if "build-raw" in c.args[0]]
+        self.assertEqual(len(builds), 2)
+        outs = [arg for i, arg in enumerate(builds[0]) if builds[0][i - 1] == "--tx-out"]
+        self.assertEqual([out.split("+")[0] for out in outs], [RECIPIENT, OTHER, "addr_self"])
+        cat0 = f"1 {POLICY_ID}.{'Cat_0'.encode().hex()}"
+        self.assertTrue(outs[0].endswith(cat0))
+        # The next tx spends the fuel change, which follows the two asset outputs, by body hash
+        self.assertEqual(builds[1][builds[1].index("--tx-in") + 1], f"{tx_id(UNSIGNED_TX)}#2")
+        # Only build-raw runs per tx; signing and txids happen in-process
+        self.assertEqual(run.call_count, 2)
+        signed = [c.args[0]["transaction"] for c in client.send_command.call_args_list]
+        self.assertEqual(signed[0]["type"], "Witnessed Tx ConwayEra")
+        self.assertIn(0, cbor2.loads(bytes.fromhex(signed[0]["cborHex"]))[1])
+
+    async def test_nft_count_follows_the_confirmed_txs(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "drop.jsonl")
+        with open(path, "w") as f:
+            f.write("".join(json.dumps({"name": f"Cat_{i}"}) + "\n" for i in range(5)))
+
+        client = AsyncMock()
+        engine = MintingEngine(client, TxSigner(pycardano.PaymentSigningKey.generate()))
+        engine._split_utxo = AsyncMock(return_value=[
+            {"tx_id": "aa" * 32, "index": 0, "lovelace": 500_000_000, "address": "addr"}])
+
+        builds = []
+
+        def build(cmd, **kwargs):
+            # A distinct body per tx, so each has its own txid
+            tx = cbor2.dumps([{0: [[b"\xab" * 32, 0]], 1: [], 2: int(cmd[cmd.index("--fee") + 1]) + len(builds)},
+                              {}, True, None])
+            builds.append(tx)
+            return SimpleNamespace(stdout=json.dumps({"type": "Unwitnessed Tx ConwayEra", "cborHex": tx.hex()}))
+
+        # Batches of 2, 2 and 1 NFTs; the last tx is rejected
+        verdicts = enumerate(["TxValid", "TxValid", "TxInvalid"])
+
+        def confirm():
+            i, tag = next(verdicts)
+            return {"tag": tag, "transactionId": tx_id(builds[i])}
+        client.receive_event.side_effect = confirm
+        with patch("cli.minting.subprocess.run", side_effect=build), self.assertLogs("cli.minting") as logs:
+            valid, _ = await engine.mint_parallel("unused", batch_size=2, workers=1, manifest=path)
+        self.assertEqual(valid, 2)
+        self.assertIn("NFTs:      4", "\n".join(logs.output))
+
+    def test_unencodable_row_fails_only_its_chain(self):
+        engine = MintingEngine(AsyncMock(), TxSigner(pycardano.PaymentSigningKey.generate()))
+        utxo = {"tx_id": "aa" * 32, "index": 0, "lovelace": 500_000_000, "address": "addr"}
+        assets = [("a", {"cid": "Qm1"}), ("b", {})]
+        with patch("cli.minting.subprocess.run") as run:
+            run.return_value.stdout = BUILD_RAW_STDOUT
+            chain = engine._build_chain(0, utxo, "unused", 2, 1, assets, MetadataTemplate({"image": "ipfs://{cid}"}))
+        self.assertEqual(chain, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
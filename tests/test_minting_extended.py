@@ -51,8 +51,7 @@ class TestMintingExtended(unittest.TestCase):
 
     @patch("cli.minting.subprocess.run")
     @patch("cli.minting.open", new_callable=mock_open)
-    @patch("cli.minting.os.path.abspath")
-    def test_mint_batch_unique_insufficient_funds(self, mock_abspath, mock_file, mock_run):
+    def test_mint_batch_unique_insufficient_funds(self, mock_file, mock_run):
         # Mock UTXO with very low funds, less than fee+min_utxo (23 ADA)
         self.mock_client.get_utxos.return_value = {
             "tx#0": {"address": "addr", "value": {"lovelace": 500}}
@@ -65,13 +64,11 @@ class TestMintingExtended(unittest.TestCase):
 
     @patch("cli.minting.subprocess.run")
     @patch("cli.minting.open", new_callable=mock_open)
-    @patch("cli.minting.os.path.abspath")
-    def test_mint_batch_unique_subprocess_error(self, mock_abspath, mock_file, mock_run):
-        # Mock UTXO
+    def test_mint_batch_unique_subprocess_error(self, mock_file, mock_run):
+        # Mock UTXO with enough fuel (fee+min_utxo = 23 ADA) to reach build-raw
         self.mock_client.get_utxos.return_value = {
-            "tx#0": {"address": "addr", "value": {"lovelace": 5000000}}
+            "tx#0": {"address": "addr", "value": {"lovelace": 50000000}}
         }
-        mock_abspath.return_value = "/tmp/meta.json"
         
         # Mock subprocess failing
         mock_run.side_effect = subprocess.CalledProcessError(1, "cmd", stderr=b"Build failed")
@@ -82,8 +79,7 @@ class TestMintingExtended(unittest.TestCase):
 
     @patch("cli.minting.subprocess.run")
     @patch("cli.minting.open", new_callable=mock_open)
-    @patch("cli.minting.os.path.abspath")
-    def test_mint_nft_legacy(self, mock_abspath, mock_file, mock_run):
+    def test_mint_nft_legacy(self, mock_file, mock_run):
          # Test the old mint_nft method
          self.mock_client.get_utxos.return_value = {
             "tx#0": {"address": "addr", "value": {"lovelace": 5000000}}
@@ -159,8 +155,7 @@ class TestMintingExtended(unittest.TestCase):
 
     @patch("cli.minting.subprocess.run")
     @patch("cli.minting.open", new_callable=mock_open)
-    @patch("cli.minting.os.path.abspath")
-    def test_mint_batch_remainder_distribution(self, mock_abspath, mock_file, mock_run):
+    def test_mint_batch_remainder_distribution(self, mock_file, mock_run):
         """
         Verifies the 2-output chaining model: each batch produces
         output 0 (minted assets + min_utxo) and output 1 (fuel/change).
@@ -213,8 +208,7 @@ class TestMintingExtended(unittest.TestCase):
 
     @patch("cli.minting.subprocess.run")
     @patch("cli.minting.open", new_callable=mock_open)
-    @patch("cli.minting.os.path.abspath")
-    def test_mint_batch_txid_fail(self, mock_abspath, mock_file, mock_run):
+    def test_mint_batch_txid_fail(self, mock_file, mock_run):
         # Need enough lovelace for fee+min_utxo (23 ADA)
         self.mock_client.get_utxos.return_value = {
             "tx#0": {"address": "addr", "value": {"lovelace": 50000000}}
@@ -231,8 +225,7 @@ class TestMintingExtended(unittest.TestCase):
 
     @patch("cli.minting.subprocess.run")
     @patch("cli.minting.open", new_callable=mock_open)
-    @patch("cli.minting.os.path.abspath")
-    def test_mint_batch_subprocess_stderr(self, mock_abspath, mock_file, mock_run):
+    def test_mint_batch_subprocess_stderr(self, mock_file, mock_run):
         # Need enough lovelace for fee+min_utxo (23 ADA)
         self.mock_client.get_utxos.return_value = {
             "tx#0": {"address": "addr", "value": {"lovelace": 50000000}}
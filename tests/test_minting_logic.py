@@ -2,7 +2,7 @@ import unittest
 from unittest.mock import MagicMock, patch, AsyncMock
 import asyncio
 import json
-from cli.minting import MintingEngine
+from cli.minting import MintingEngine, mint_costs
 
 class TestMintingLogic(unittest.TestCase):
     def setUp(self):
@@ -18,11 +18,7 @@ class TestMintingLogic(unittest.TestCase):
 
     @patch("cli.minting.subprocess.run")
     @patch("cli.minting.open") # Mock file opening
-    @patch("cli.minting.os.path.abspath")
-    def test_mint_batch_unique_fragmentation(self, mock_abspath, mock_open, mock_run):
-        # Setup mocks
-        mock_abspath.return_value = "/tmp/metadata.json"
-        
+    def test_mint_batch_unique_fragmentation(self, mock_open, mock_run):
         # Mock subprocess to avoid actual execution
         mock_run.return_value.stdout = b'{"txId": "mock_tx_id"}'
         mock_run.return_value.returncode = 0
@@ -45,7 +41,10 @@ class TestMintingLogic(unittest.TestCase):
         tx_out_count = args.count("--tx-out")
         self.assertEqual(tx_out_count, 2, f"Should have 2 outputs (asset + fuel), got {tx_out_count}")
         
-        # Check that the asset output has min_utxo (15 ADA)
+        # Asset output carries the min-UTxO for 500 assets: the fee model's
+        # figure, which is above the 15 ADA floor at this batch size
+        _, expected_min_utxo = mint_costs([f"TestNFT_{i}" for i in range(500)], min_utxo_floor=15_000_000)
+        self.assertGreater(expected_min_utxo, 15_000_000)
         iter_args = iter(args)
         lovelaces = []
         for arg in iter_args:
@@ -55,7 +54,7 @@ class TestMintingLogic(unittest.TestCase):
                 if len(parts) >= 2:
                     lovelaces.append(int(parts[1]))
         
-        self.assertEqual(lovelaces[0], 15000000, "Asset output should have 15 ADA min_utxo")
+        self.assertEqual(lovelaces[0], expected_min_utxo, "Asset output should carry the model min_utxo")
         self.assertTrue(lovelaces[1] > 0, "Fuel output should have positive lovelace")
 
         # Check mint string — should contain all 500 assets
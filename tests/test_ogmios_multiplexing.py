@@ -0,0 +1,66 @@
+"""Tests for JSON-RPC request multiplexing in OgmiosClient."""
+import asyncio
+import json
+import unittest
+from cli.ogmios_client import OgmiosClient
+
+
+class FakeOgmiosConnection:
+    """Answers queued requests in reverse order to prove responses are routed by id."""
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.sent = []
+        self.outbox = asyncio.Queue()
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+        if len(self.sent) % self.batch_size == 0:
+            for req in reversed(self.sent[-self.batch_size:]):
+                address = req["params"]["addresses"][0] if "params" in req else None
+                await self.outbox.put(json.dumps({
+                    "jsonrpc": "2.0", "id": req["id"],
+                    "result": [{"address": address}] if address else {"minFeeCoefficient": 44}
+                }))
+
+    async def recv(self):
+        return await self.outbox.get()
+
+    async def close(self):
+        pass
+
+
+class TestOgmiosMultiplexing(unittest.IsolatedAsyncioTestCase):
+
+    async def test_out_of_order_responses_resolve_correct_requests(self):
+        client = OgmiosClient()
+        client.connection = FakeOgmiosConnection(batch_size=3)
+        addresses = ["addr_a", "addr_b", "addr_c"]
+        results = await asyncio.gather(*(client.query_utxo(a) for a in addresses))
+        for address, utxos in zip(addresses, results):
+            self.assertEqual(utxos, [{"address": address}])
+
+    async def test_request_ids_are_unique(self):
+        client = OgmiosClient()
+        client.connection = FakeOgmiosConnection(batch_size=2)
+        await asyncio.gather(client.query_utxo("a"), client.query_protocol_parameters())
+        ids = [r["id"] for r in client.connection.sent]
+        self.assertEqual(len(set(ids)), 2)
+        self.assertEqual(client._pending, {})
+
+    async def test_reader_failure_fails_pending_requests(self):
+        client = OgmiosClient()
+
+        class BrokenConnection(FakeOgmiosConnection):
+            async def recv(self):
+                raise ConnectionError("socket dropped")
+
+        client.connection = BrokenConnection(batch_size=100)
+        with self.assertRaises(ConnectionError):
+            await client.query_utxo("a")
+
+    async def test_unknown_ids_are_ignored(self):
+        client = OgmiosClient()
+        client.connection = FakeOgmiosConnection(batch_size=1)
+        await client.connection.outbox.put(json.dumps({"jsonrpc": "2.0", "id": "stale-1", "result": []}))
+        utxos = await client.query_utxo("addr_a")
+        self.assertEqual(utxos, [{"address": "addr_a"}])
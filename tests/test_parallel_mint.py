@@ -21,7 +21,7 @@ class TestParallelMint(unittest.IsolatedAsyncioTestCase):
         # Since _build_chain is run in executor, we need to mock it effectively.
         # However, it's a sync method called via run_in_executor.
         # We can mock it on the instance.
-        engine._build_chain = MagicMock(return_value=[{"cborHex": "tx_a"}, {"cborHex": "tx_b"}])
+        engine._build_chain = MagicMock(return_value=[({"cborHex": "tx_a"}, "a", 2), ({"cborHex": "tx_b"}, "b", 2)])
         
         # Mock client.new_tx to succeed
         mock_client.new_tx.return_value = True
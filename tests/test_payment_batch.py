@@ -0,0 +1,83 @@
+"""Tests for the bulk /pay/batch and NDJSON /pay/batch/stream endpoints."""
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+import httpx
+from api.main import app
+from api.routes import payments
+
+
+class TestPaymentBatch(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.addAsyncCleanup(self.client.aclose)
+        sleep = patch("api.engine.asyncio.sleep")
+        sleep.start()
+        self.addCleanup(sleep.stop)
+        self.action = next(iter(app.state.pricing.amounts))
+
+    async def test_batch_validates_and_settles_in_one_engine_call(self):
+        items = [{"user_id": f"u{i}", "action": self.action} for i in range(50)]
+        items[3] = {"user_id": "u3", "action": "no_such_action"}
+        items[7] = {"user_id": 7}
+        with patch.object(payments.engine, "process_batch", wraps=payments.engine.process_batch) as batch:
+            response = await self.client.post("/api/v1/pay/batch", json={"items": items})
+        self.assertEqual(batch.call_count, 1)
+        self.assertEqual(len(batch.call_args.args[0]), 48)
+
+        body = response.json()
+        self.assertEqual((body["succeeded"], body["failed"]), (48, 2))
+        self.assertEqual([r["index"] for r in body["results"]], list(range(50)))
+        self.assertIn("Invalid action", body["results"][3]["error"])
+        tx_id = body["results"][0]["tx_id"]
+        self.assertEqual((await self.client.get(f"/api/v1/verify/{tx_id}")).status_code, 200)
+
+    async def test_batch_limits(self):
+        self.assertEqual((await self.client.post("/api/v1/pay/batch", json={"items": 1})).status_code, 422)
+        with patch.object(payments, "BATCH_MAX_ITEMS", 2):
+            response = await self.client.post("/api/v1/pay/batch", json=[{}] * 3)
+        self.assertEqual(response.status_code, 413)
+
+    async def test_ndjson_stream_in_chunks(self):
+        lines = [json.dumps({"user_id": f"u{i}", "action": self.action}) for i in range(5)]
+        lines.insert(2, "{not json")
+        with patch.object(payments, "BATCH_CHUNK", 2), \
+             patch.object(payments.engine, "process_batch", wraps=payments.engine.process_batch) as batch:
+            response = await self.client.post("/api/v1/pay/batch/stream", content="\n".join(lines) + "\n",
+                                              headers={"Content-Type": "application/x-ndjson"})
+        results = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        self.assertEqual([r["index"] for r in results], list(range(6)))
+        self.assertEqual([r["status"] for r in results].count("error"), 1)
+        self.assertEqual(results[2]["status"], "error")
+        self.assertEqual(batch.call_count, 3)
+
+    async def test_ndjson_results_stream_before_the_upload_ends(self):
+        # Drives the ASGI app directly, so the second half of the body is only sent after the first results
+        upload, sent = asyncio.Queue(), asyncio.Queue()
+        lines = [json.dumps({"user_id": f"u{i}", "action": self.action}) + "\n" for i in range(4)]
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+                 "scheme": "http", "path": "/api/v1/pay/batch/stream", "raw_path": b"/api/v1/pay/batch/stream",
+                 "query_string": b"", "root_path": "", "server": ("test", 80), "client": ("test", 1234),
+                 "headers": [(b"content-type", b"application/x-ndjson")]}
+        await upload.put({"type": "http.request", "body": "".join(lines[:2]).encode(), "more_body": True})
+
+        with patch.object(payments, "BATCH_CHUNK", 2):
+            call = asyncio.create_task(app(scope, upload.get, sent.put))
+            self.assertEqual((await asyncio.wait_for(sent.get(), 1))["type"], "http.response.start")
+            first = [json.loads((await asyncio.wait_for(sent.get(), 1))["body"]) for _ in range(2)]
+            self.assertEqual([r["index"] for r in first], [0, 1])
+
+            await upload.put({"type": "http.request", "body": "".join(lines[2:]).encode(), "more_body": False})
+            rest = []
+            while True:
+                message = await asyncio.wait_for(sent.get(), 1)
+                if message["body"]:
+                    rest.append(json.loads(message["body"]))
+                if not message.get("more_body"):
+                    break
+            await call
+        self.assertEqual([r["index"] for r in rest], [2, 3])
+        self.assertTrue(all(r["status"] == "success" for r in first + rest))
@@ -0,0 +1,56 @@
+"""Tests for the columnar PlayerStore behind the gaming ConnectionManager."""
+import unittest
+from api.player_store import PlayerStore
+
+
+class TestPlayerStore(unittest.TestCase):
+
+    def test_add_defaults(self):
+        store = PlayerStore(default_balance=1000)
+        store.add("p1")
+        self.assertIn("p1", store)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.get("p1"), {"balance": 1000, "position": [0.0, 0.0]})
+
+    def test_debit_respects_balance(self):
+        store = PlayerStore()
+        store.add("p1", balance=15)
+        self.assertTrue(store.debit("p1", 10))
+        self.assertFalse(store.debit("p1", 10))
+        self.assertEqual(store.balance("p1"), 5)
+
+    def test_position(self):
+        store = PlayerStore()
+        store.add("p1")
+        store.set_position("p1", 3, -4.5)
+        self.assertEqual(store.position("p1"), (3.0, -4.5))
+
+    def test_unknown_player_raises(self):
+        store = PlayerStore()
+        with self.assertRaises(KeyError):
+            store.balance("ghost")
+        self.assertIsNone(store.get("ghost"))
+        self.assertFalse(store.remove("ghost"))
+
+    def test_freed_slots_are_reused(self):
+        store = PlayerStore(capacity=4)
+        slot_a = store.add("a")
+        store.add("b")
+        store.remove("a")
+        self.assertEqual(store.add("c"), slot_a)
+        self.assertEqual(store.balance("c"), store.default_balance)
+        self.assertEqual(store.capacity, 4)
+
+    def test_grows_past_capacity(self):
+        store = PlayerStore(capacity=2)
+        for i in range(5):
+            store.add(f"p{i}", balance=i)
+        self.assertGreaterEqual(store.capacity, 5)
+        self.assertEqual([b for _, b, _, _ in store.rows()], [0, 1, 2, 3, 4])
+
+    def test_rows_skip_free_slots(self):
+        store = PlayerStore()
+        store.add("a", x=1.0, y=2.0)
+        store.add("b")
+        store.remove("b")
+        self.assertEqual(list(store.rows()), [("a", 1000, 1.0, 2.0)])
@@ -0,0 +1,65 @@
+"""Tests for the compiled pricing table and its hot reload."""
+import asyncio
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from api.pricing import PricingTable, load_pricing, watch_pricing, DEFAULT_PRICING_FILE
+
+
+class TestPricingTable(unittest.TestCase):
+
+    def test_compiles_tiers(self):
+        table = PricingTable.from_config({
+            "tiers": {"a": 1000, "b": 5000},
+            "policies": {"min_payment": 1000, "max_payment": 10000}
+        })
+        self.assertEqual(table.amounts, {"a": 1000, "b": 5000})
+
+    def test_rejects_tier_outside_bounds(self):
+        with self.assertRaises(ValueError) as cm:
+            PricingTable.from_config({
+                "tiers": {"cheap": 10},
+                "policies": {"min_payment": 1000, "max_payment": 10000}
+            })
+        self.assertIn("cheap", str(cm.exception))
+
+    def test_rejects_non_integer_tier(self):
+        with self.assertRaises(ValueError):
+            PricingTable.from_config({"tiers": {"a": "1000"}})
+
+    def test_rejects_inverted_policy(self):
+        with self.assertRaises(ValueError):
+            PricingTable.from_config({"tiers": {}, "policies": {"min_payment": 10, "max_payment": 1}})
+
+    def test_repo_pricing_file_is_valid(self):
+        table = load_pricing(DEFAULT_PRICING_FILE)
+        self.assertEqual(table.amounts["unlock_post"], 10000)
+
+
+class TestPricingWatcher(unittest.IsolatedAsyncioTestCase):
+
+    def _write(self, path, tier_amount, mtime):
+        with open(path, "w") as f:
+            f.write(f"tiers:\n  unlock_post: {tier_amount}\npolicies:\n  min_payment: 1000\n  max_payment: 100000\n")
+        os.utime(path, (mtime, mtime))
+
+    async def test_hot_swaps_and_ignores_invalid(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pricing.yaml")
+            self._write(path, 10000, 1_000_000)
+            app = SimpleNamespace(state=SimpleNamespace(pricing=load_pricing(path)))
+            original = app.state.pricing
+            watcher = asyncio.create_task(watch_pricing(app, path, interval=0.01))
+            try:
+                self._write(path, 20000, 1_000_010)
+                await asyncio.sleep(0.05)
+                self.assertIsNot(app.state.pricing, original)
+                self.assertEqual(app.state.pricing.amounts["unlock_post"], 20000)
+
+                # Out-of-bounds tier: previous table stays live
+                self._write(path, 5, 1_000_020)
+                await asyncio.sleep(0.05)
+                self.assertEqual(app.state.pricing.amounts["unlock_post"], 20000)
+            finally:
+                watcher.cancel()
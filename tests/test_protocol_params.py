@@ -0,0 +1,97 @@
+"""Tests for the shared protocol parameter provider and fee model."""
+import json
+import os
+import tempfile
+import threading
+import unittest
+from fractions import Fraction
+from unittest.mock import AsyncMock
+from cli.protocol_params import FeeModel, ProtocolParamsProvider, get_provider
+from cli.minting import mint_costs
+
+OGMIOS_PARAMS = {
+    "minFeeCoefficient": 44,
+    "minFeeConstant": {"ada": {"lovelace": 155381}},
+    "minUtxoDepositCoefficient": 4310,
+    "maxTransactionSize": {"bytes": 16384},
+    "scriptExecutionPrices": {"memory": "577/10000", "cpu": "721/10000000"},
+    "collateralPercentage": 150,
+}
+
+
+class TestFeeModel(unittest.TestCase):
+
+    def test_cli_and_ogmios_shapes_agree(self):
+        with open("params/protocol-parameters.json") as f:
+            from_file = FeeModel.from_params(json.load(f))
+        from_ogmios = FeeModel.from_params(OGMIOS_PARAMS, epoch=7)
+        for field in ("fee_fixed", "fee_per_byte", "utxo_cost_per_byte", "max_tx_size",
+                      "price_memory", "price_steps"):
+            self.assertEqual(getattr(from_file, field), getattr(from_ogmios, field), field)
+        self.assertEqual(from_ogmios.epoch, 7)
+        self.assertEqual(from_ogmios.price_memory, Fraction(577, 10000))
+
+    def test_min_fee_and_min_lovelace(self):
+        model = FeeModel.from_params(OGMIOS_PARAMS)
+        self.assertEqual(model.min_fee(300), 155381 + 44 * 300)
+        # Script costs round up to the next lovelace
+        self.assertEqual(model.min_fee(0, memory=1, steps=0) - 155381, 1)
+        self.assertEqual(model.min_lovelace(67), (160 + 67) * 4310)
+
+    def test_mint_costs_floors_and_growth(self):
+        small = mint_costs(["nft_00001"], fee_floor=1_000_000, min_utxo_floor=10_000_000)
+        self.assertEqual(small, (1_000_000, 10_000_000))
+        names = [f"a_very_long_asset_name_{i:05d}" for i in range(400)]
+        fee, min_utxo = mint_costs(names, fee_floor=1_000_000, min_utxo_floor=10_000_000)
+        self.assertGreater(min_utxo, 10_000_000)
+
+
+class TestProtocolParamsProvider(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"txFeeFixed": 1, "txFeePerByte": 2, "utxoCostPerByte": 3, "maxTxSize": 4}, f)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    async def test_falls_back_to_file(self):
+        provider = ProtocolParamsProvider(self.path)
+        self.assertEqual(provider.fee_model.min_fee(10), 21)
+        self.assertIsNone(provider.fee_model.epoch)
+
+    async def test_refresh_only_on_new_epoch(self):
+        provider = ProtocolParamsProvider(self.path)
+        ogmios = AsyncMock()
+        ogmios.query_epoch.return_value = 100
+        ogmios.query_protocol_parameters.return_value = OGMIOS_PARAMS
+
+        self.assertTrue(await provider.refresh(ogmios))
+        model = provider.fee_model
+        self.assertEqual(model.epoch, 100)
+        self.assertFalse(await provider.refresh(ogmios))
+        self.assertIs(provider.fee_model, model)
+        self.assertEqual(ogmios.query_protocol_parameters.await_count, 1)
+
+        ogmios.query_epoch.return_value = 101
+        self.assertTrue(await provider.refresh(ogmios))
+        self.assertEqual(provider.fee_model.epoch, 101)
+
+    async def test_failed_fetch_keeps_current_model(self):
+        provider = ProtocolParamsProvider(self.path)
+        model = provider.fee_model
+        ogmios = AsyncMock()
+        ogmios.query_epoch.return_value = 5
+        ogmios.query_protocol_parameters.return_value = {}
+        self.assertFalse(await provider.refresh(ogmios))
+        self.assertIs(provider.fee_model, model)
+
+    def test_singleton_across_threads(self):
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(get_provider())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(all(p is seen[0] for p in seen))
@@ -0,0 +1,56 @@
+"""Tests for in-process signing of chained transactions."""
+import hashlib
+import unittest
+import cbor2
+import nacl.signing
+import pycardano
+from cli.signer import TxSigner, tx_id
+
+
+class TestTxSigner(unittest.TestCase):
+
+    def setUp(self):
+        self.sk = pycardano.PaymentSigningKey.generate()
+        self.vk = self.sk.to_verification_key()
+        self.signer = TxSigner(self.sk)
+        address = pycardano.Address(self.vk.hash(), network=pycardano.Network.TESTNET)
+        script = pycardano.ScriptPubkey(self.vk.hash())
+        body = pycardano.TransactionBody(
+            inputs=[pycardano.TransactionInput(pycardano.TransactionId(b"\xab" * 32), 0)],
+            outputs=[pycardano.TransactionOutput(address, 5_000_000)], fee=200_000)
+        # An unsigned mint as cardano-cli build-raw leaves it: the native script is already witnessed
+        self.tx = pycardano.Transaction(body, pycardano.TransactionWitnessSet(native_scripts=[script]))
+
+    def test_matches_pycardano(self):
+        signed, txid = self.signer.sign(self.tx.to_cbor())
+        self.assertEqual(txid, str(self.tx.id))
+        self.assertEqual(tx_id(self.tx.to_cbor()), txid)
+
+        decoded = pycardano.Transaction.from_cbor(signed)
+        self.assertEqual(decoded.transaction_body.hash(), self.tx.transaction_body.hash())
+        witness, = decoded.transaction_witness_set.vkey_witnesses
+        self.assertEqual(witness.vkey.payload, self.vk.payload)
+        self.assertEqual(witness.signature, self.sk.sign(bytes.fromhex(txid)))
+        self.assertEqual(len(decoded.transaction_witness_set.native_scripts), 1)
+
+    def test_hashes_body_bytes_as_serialized(self):
+        # An indefinite-length input list: a decode/re-encode would change the body and its hash
+        body = b"\xa3\x00\x9f\x82\x58\x20" + b"\xab" * 32 + b"\x00\xff\x01\x80\x02\x19\x03\xe8"
+        tx = b"\x84" + body + b"\xa0\xf5\xf6"
+        signed, txid = self.signer.sign(tx)
+        self.assertEqual(txid, hashlib.blake2b(body, digest_size=32).hexdigest())
+        self.assertTrue(signed.startswith(b"\x84" + body))
+        witnesses = cbor2.loads(signed)[1][0]
+        nacl.signing.VerifyKey(witnesses[0][0]).verify(bytes.fromhex(txid), witnesses[0][1])
+
+    def test_sign_many_and_refuses_double_witness(self):
+        results = self.signer.sign_many([self.tx.to_cbor()] * 3)
+        self.assertEqual(len({txid for _, txid in results}), 1)
+        with self.assertRaisesRegex(ValueError, "already has vkey witnesses"):
+            self.signer.sign(results[0][0])
+        with self.assertRaisesRegex(ValueError, "Not a serialized transaction"):
+            self.signer.sign(b"\x00")
+
+
+if __name__ == "__main__":
+    unittest.main()
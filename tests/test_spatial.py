@@ -0,0 +1,74 @@
+"""Tests for spatial interest management in the gaming state sync."""
+import json
+import unittest
+from unittest.mock import AsyncMock
+from api.spatial import SpatialGrid
+from api.routes.gaming import ConnectionManager
+
+
+class TestSpatialGrid(unittest.TestCase):
+
+    def test_candidates_cover_neighbouring_cells(self):
+        grid = SpatialGrid(cell_size=10)
+        grid.insert(1, 0, 0)
+        grid.insert(2, 9, 9)
+        grid.insert(3, 15, -5)
+        grid.insert(4, 100, 100)
+        self.assertEqual(set(grid.candidates(5, 5, 10)), {1, 2, 3})
+
+    def test_move_only_rebuckets_on_cell_change(self):
+        grid = SpatialGrid(cell_size=10)
+        grid.insert(1, 1, 1)
+        cells_before = dict(grid.cells)
+        grid.move(1, 2, 2)
+        self.assertEqual(grid.cells, cells_before)
+        grid.move(1, 55, 55)
+        self.assertEqual(grid.cell_of[1], (5, 5))
+        self.assertNotIn((0, 0), grid.cells)
+
+    def test_remove_drops_empty_cells(self):
+        grid = SpatialGrid(cell_size=10)
+        grid.insert(1, -3, -3)
+        grid.remove(1)
+        grid.remove(1)
+        self.assertEqual(grid.cells, {})
+
+    def test_rejects_bad_cell_size(self):
+        with self.assertRaises(ValueError):
+            SpatialGrid(0)
+
+
+class TestAreaOfInterest(unittest.IsolatedAsyncioTestCase):
+
+    async def _manager_with(self, positions):
+        manager = ConnectionManager(aoi_radius=10)
+        sockets = {}
+        for pid, (x, y) in positions.items():
+            sockets[pid] = AsyncMock()
+            await manager.connect(pid, sockets[pid])
+            await manager.process_message(pid, json.dumps({"action": "move", "position": [x, y]}))
+        return manager, sockets
+
+    async def test_reconnect_leaves_no_ghost_in_old_cell(self):
+        manager, _ = await self._manager_with({"a": (500, 500), "b": (505, 505)})
+        await manager.connect("a", AsyncMock())  # reconnect without a disconnect first
+        self.assertEqual({row[0] for row in manager.visible_rows("b")}, {"b"})
+        self.assertEqual(sum(len(members) for members in manager.grid.cells.values()), 2)
+
+    async def test_visible_rows_filters_by_distance(self):
+        manager, _ = await self._manager_with({"a": (0, 0), "b": (6, 6), "c": (9, 9), "d": (500, 0)})
+        visible = {row[0] for row in manager.visible_rows("a")}
+        self.assertEqual(visible, {"a", "b"})
+
+    async def test_broadcast_sends_only_nearby_players(self):
+        manager, sockets = await self._manager_with({"a": (0, 0), "b": (3, 4), "far": (1000, 1000)})
+        await manager.broadcast_state()
+        players = json.loads(sockets["a"].send_text.call_args[0][0])["players"]
+        self.assertEqual(set(players), {"a", "b"})
+        players = json.loads(sockets["far"].send_text.call_args[0][0])["players"]
+        self.assertEqual(set(players), {"far"})
+
+    async def test_disconnect_leaves_grid(self):
+        manager, _ = await self._manager_with({"a": (0, 0), "b": (1, 1)})
+        await manager.disconnect("b")
+        self.assertEqual({row[0] for row in manager.visible_rows("a")}, {"a"})
@@ -0,0 +1,189 @@
+"""Tests for the API shared-state backends (memory default, Redis for multi-worker)."""
+import asyncio
+import unittest
+from collections import defaultdict
+from unittest.mock import patch
+from api.state import MemoryStateBackend, RedisStateBackend, create_backend, TX_COUNT
+from api.confirmations import ConfirmationHub
+from api.engine import PaymentEngine
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the backend: hashes, pipelines and pub/sub."""
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+        self.pipelines_executed = 0
+        self.channels = defaultdict(list)  # channel -> subscriber queues
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        if field is not None:
+            self.hashes[key][field] = value
+        self.hashes[key].update(mapping or {})
+
+    async def hget(self, key, field):
+        return self.hashes[key].get(field)
+
+    async def hdel(self, key, field):
+        self.hashes[key].pop(field, None)
+
+    async def hlen(self, key):
+        return len(self.hashes[key])
+
+    async def hgetall(self, key):
+        return {k: str(v) for k, v in self.hashes[key].items()}
+
+    async def publish(self, channel, message):
+        for queue in self.channels[channel]:
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def hincrbyfloat(self, key, field, amount):
+        self.ops.append(("hincrbyfloat", key, field, amount))
+
+    def hset(self, key, mapping):
+        self.ops.append(("hset", key, mapping))
+
+    def publish(self, channel, message):
+        self.ops.append(("publish", channel, message))
+
+    async def execute(self):
+        self.redis.pipelines_executed += 1
+        for op, *args in self.ops:
+            if op == "hincrbyfloat":
+                key, field, amount = args
+                self.redis.hashes[key][field] = float(self.redis.hashes[key].get(field, 0)) + amount
+            elif op == "hset":
+                key, mapping = args
+                await self.redis.hset(key, mapping=mapping)
+            else:
+                await self.redis.publish(*args)
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.channels[channel].append(self.queue)
+        self.queue.put_nowait({"type": "subscribe", "channel": channel, "data": 1})
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        for queues in self.redis.channels.values():
+            if self.queue in queues:
+                queues.remove(self.queue)
+
+
+class TestMemoryBackend(unittest.IsolatedAsyncioTestCase):
+
+    async def test_counters_payments_sessions(self):
+        state = MemoryStateBackend()
+        await state.incr({"a": 1, "b": 2.5})
+        await state.incr({"a": 1})
+        self.assertEqual(await state.counters(), {"a": 2, "b": 2.5})
+
+        await state.record_payment("tx1", {"user_id": "u"})
+        self.assertEqual(await state.get_payment("tx1"), {"user_id": "u"})
+        self.assertIsNone(await state.get_payment("tx2"))
+
+        await state.set_session("p1", {"worker": 1})
+        self.assertEqual(await state.session_count(), 1)
+        await state.delete_session("p1")
+        self.assertEqual(await state.session_count(), 0)
+
+
+class TestRedisBackend(unittest.IsolatedAsyncioTestCase):
+
+    async def test_counter_increments_are_batched(self):
+        redis = FakeRedis()
+        state = RedisStateBackend("redis://fake", client=redis, flush_interval=0.01)
+        for _ in range(100):
+            await state.incr({TX_COUNT: 1})
+        await asyncio.sleep(0.05)
+        self.assertEqual(redis.pipelines_executed, 1)
+        self.assertEqual((await state.counters())[TX_COUNT], 100.0)
+
+    async def test_counters_include_unflushed(self):
+        state = RedisStateBackend("redis://fake", client=FakeRedis(), flush_interval=10)
+        await state.incr({TX_COUNT: 3})
+        self.assertEqual((await state.counters())[TX_COUNT], 3.0)
+
+    async def test_payments_visible_across_workers(self):
+        redis = FakeRedis()
+        worker_a = PaymentEngine(RedisStateBackend("redis://fake", client=redis))
+        worker_b = PaymentEngine(RedisStateBackend("redis://fake", client=redis))
+        with patch("api.engine.asyncio.sleep"):
+            tx_id = await worker_a.process_microtransaction("user_1", 10000)
+        self.assertTrue(await worker_b.verify_transaction(tx_id))
+        self.assertFalse(await worker_b.verify_transaction("tx_missing"))
+
+    async def test_payments_pushed_to_other_workers_hubs(self):
+        redis = FakeRedis()
+        state_a, state_b = (RedisStateBackend("redis://fake", client=redis) for _ in range(2))
+        hub_a, hub_b = ConfirmationHub(), ConfirmationHub()
+        watchers = [asyncio.create_task(state.watch_payments(hub.publish))
+                    for state, hub in ((state_a, hub_a), (state_b, hub_b))]
+        await asyncio.sleep(0)
+        on_a, on_b = hub_a.subscribe(user_id="user_1"), hub_b.subscribe(user_id="user_1")
+
+        worker_a = PaymentEngine(state_a, hub=hub_a)
+        with patch("api.engine.asyncio.sleep"):
+            tx_id = await worker_a.process_microtransaction("user_1", 10000)
+        self.assertEqual((await on_b.next(1))["tx_id"], tx_id)
+        # The settling worker publishes locally and skips its own message on the channel
+        self.assertEqual((await on_a.next(1))["tx_id"], tx_id)
+        await asyncio.sleep(0.01)
+        self.assertTrue(on_a.queue.empty())
+
+        for watcher in watchers:
+            watcher.cancel()
+        await asyncio.gather(*watchers, return_exceptions=True)
+        self.assertEqual(sum(map(len, redis.channels.values())), 0)
+
+    async def test_batch_is_one_write(self):
+        redis = FakeRedis()
+        state = RedisStateBackend("redis://fake", client=redis, flush_interval=10)
+        engine = PaymentEngine(state)
+        with patch("api.engine.asyncio.sleep"):
+            tx_ids = await engine.process_batch([("u1", 10), ("u2", 20), ("u3", 30)])
+        self.assertEqual(len(set(tx_ids)), 3)
+        self.assertEqual(len(redis.hashes["hydra:payments"]), 3)
+        self.assertEqual((await state.get_payment(tx_ids[1]))["user_id"], "u2")
+        self.assertEqual((await state.counters())[TX_COUNT], 3.0)
+
+    async def test_sessions(self):
+        state = RedisStateBackend("redis://fake", client=FakeRedis())
+        await state.set_session("p1", {"worker": 42})
+        self.assertEqual(await state.get_session("p1"), {"worker": 42})
+        self.assertEqual(await state.session_count(), 1)
+        await state.delete_session("p1")
+        self.assertIsNone(await state.get_session("p1"))
+
+
+class TestCreateBackend(unittest.TestCase):
+
+    def test_default_is_memory(self):
+        self.assertIsInstance(create_backend("memory://"), MemoryStateBackend)
+
+    def test_redis_url(self):
+        with patch.dict("sys.modules", {"redis": None, "redis.asyncio": None}):
+            with self.assertRaises(RuntimeError):
+                create_backend("redis://localhost:6379/0")
@@ -0,0 +1,59 @@
+"""Tests for the sharded gaming stress tester."""
+import json
+import unittest
+import cbor2
+import websockets
+from api.gaming_protocol import CBOR_SUBPROTOCOL, STATE_SYNC_TAG
+from tests.stress_gaming import ShardStats, parse_mix, run_stress_test, shard
+
+
+class TestStressHelpers(unittest.TestCase):
+
+    def test_parse_mix_and_shard(self):
+        self.assertEqual(parse_mix("move=3,micro_action=1"), {"move": 0.75, "micro_action": 0.25})
+        with self.assertRaises(ValueError):
+            parse_mix("jump=1")
+        shards = [shard(10, 3, i) for i in range(3)]
+        self.assertEqual(sorted(n for s in shards for n in s), list(range(10)))
+        self.assertEqual(shards[0], [0, 3, 6, 9])
+
+    def test_merge_shards(self):
+        parts = []
+        for latency in (0.001, 0.002):
+            stats = ShardStats()
+            stats.histograms["rtt"].record(latency)
+            stats.counters["actions"] = 1
+            parts.append(stats.to_dict())
+        merged = ShardStats.merge(parts)
+        self.assertEqual(merged.counters["actions"], 2)
+        self.assertEqual(merged.histograms["rtt"].summary((50,)), {"p50": 1.0, "max": 2.0})
+
+
+class TestStressRun(unittest.IsolatedAsyncioTestCase):
+
+    async def test_players_sharded_across_processes(self):
+        paths = set()
+
+        async def game(ws):
+            paths.add(ws.request.path)
+            async for frame in ws:
+                if ws.subprotocol == CBOR_SUBPROTOCOL:
+                    # A state push before every ack must be skipped by the client
+                    await ws.send(cbor2.dumps(cbor2.CBORTag(STATE_SYNC_TAG, [])))
+                    await ws.send(cbor2.dumps([0, cbor2.loads(frame)[0], 100]))
+                else:
+                    await ws.send(json.dumps({"status": "ok"}))
+
+        async with websockets.serve(game, "127.0.0.1", 0, subprotocols=[CBOR_SUBPROTOCOL]) as server:
+            port = server.sockets[0].getsockname()[1]
+            report = await run_stress_test(4, 1.0, "cbor", processes=2, mix="move=1,micro_action=1",
+                                           rate=20, churn=2.0, ramp_up=0,
+                                           url=f"ws://127.0.0.1:{port}/api/v1/ws/gaming")
+
+        self.assertEqual(report["processes"], 2)
+        self.assertEqual(paths, {f"/api/v1/ws/gaming/player_{i}" for i in range(4)})
+        self.assertGreater(report["actions"], 20)
+        self.assertEqual(report["errors"], 0)
+        self.assertGreater(report["churned"], 0)
+        self.assertIsNotNone(report["reconnect_ms"]["p50"])
+        self.assertIsNotNone(report["rtt_ms"]["p99"])
@@ -0,0 +1,73 @@
+"""Tests for the shared L1 WalletState service."""
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from cli.wallet_state import WalletState, to_cli_utxo_map
+
+
+def _utxo(tx, ix, address, lovelace, **extra):
+    u = {"transaction": {"id": tx}, "index": ix, "address": address, "value": {"ada": {"lovelace": lovelace}}}
+    u.update(extra)
+    return u
+
+
+class FakeChainOgmios:
+    """query_utxo + chain-sync stand-in; blocks are pushed through a queue."""
+    def __init__(self, utxos):
+        self.utxos = utxos
+        self.blocks = asyncio.Queue()
+        self.query_utxo = AsyncMock(side_effect=lambda addrs: [u for u in self.utxos if u["address"] in addrs])
+        self.query_tip = AsyncMock(return_value={"slot": 1, "id": "aa"})
+        self.find_intersection = AsyncMock(return_value={})
+
+    async def next_block(self):
+        return await self.blocks.get()
+
+
+class TestToCliUtxoMap(unittest.TestCase):
+
+    def test_keeps_assets_and_datum(self):
+        ogmios = [_utxo("tx1", 0, "addr1", 5_000_000, datum="d8799f"),
+                  _utxo("tx2", 1, "addr1", 2_000_000)]
+        ogmios[1]["value"]["policy"] = {"4e4654": 1}
+        result = to_cli_utxo_map(ogmios)
+        self.assertEqual(result["tx1#0"]["value"], {"lovelace": 5_000_000})
+        self.assertEqual(result["tx1#0"]["inlineDatum"], "d8799f")
+        self.assertEqual(result["tx2#1"]["value"], {"lovelace": 2_000_000, "policy": {"4e4654": 1}})
+
+
+class TestWalletState(unittest.IsolatedAsyncioTestCase):
+
+    async def test_many_addresses_in_one_query(self):
+        ogmios = FakeChainOgmios([_utxo("a", 0, "addr1", 1), _utxo("b", 0, "addr2", 2)])
+        wallet = WalletState(ogmios)
+        result = await wallet.get_utxos(["addr1", "addr2", "addr3"])
+        ogmios.query_utxo.assert_called_once_with(["addr1", "addr2", "addr3"])
+        self.assertEqual(len(result["addr1"]), 1)
+        self.assertEqual(result["addr3"], [])
+
+    async def test_no_cache_without_follower(self):
+        ogmios = FakeChainOgmios([_utxo("a", 0, "addr1", 1)])
+        wallet = WalletState(ogmios)
+        await wallet.utxos_for("addr1")
+        await wallet.utxos_for("addr1")
+        self.assertEqual(ogmios.query_utxo.call_count, 2)
+
+    async def test_cached_per_tip_and_invalidated_by_new_block(self):
+        ogmios = FakeChainOgmios([_utxo("a", 0, "addr1", 1)])
+        wallet = WalletState(ogmios)
+        await wallet.start()
+        try:
+            await wallet.utxos_for("addr1")
+            await wallet.utxos_for("addr1")
+            self.assertEqual(ogmios.query_utxo.call_count, 1)
+
+            ogmios.utxos.append(_utxo("b", 0, "addr1", 2))
+            await ogmios.blocks.put({"direction": "forward", "block": {"slot": 2}, "tip": {"slot": 2, "id": "bb"}})
+            await asyncio.sleep(0)
+            self.assertEqual(wallet.tip, {"slot": 2, "id": "bb"})
+            self.assertEqual(len(await wallet.utxos_for("addr1")), 2)
+            self.assertEqual(ogmios.query_utxo.call_count, 2)
+        finally:
+            await wallet.stop()
+        self.assertFalse(wallet.following)
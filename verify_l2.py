@@ -6,10 +6,11 @@ from cli.hydra_client import HydraClient
 logging.basicConfig(level=logging.ERROR)
 
 async def main():
-    client = HydraClient()
+    client = HydraClient(history=False)
     try:
-        await client.connect()
-        utxos = await client.get_utxos()
+        await client.connect(greeting=True)
+        # Taken from the greeting when the node includes it, /snapshot otherwise
+        utxos = await client.head_utxo()
         print(f"L2_UTXO_COUNT: {len(utxos)}")
         print(json.dumps(utxos, indent=2))
     except Exception as e: